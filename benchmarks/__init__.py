@@ -0,0 +1 @@
+"""Offline benchmarks for the voice pipeline (see voice_pipeline.py)"""
@@ -0,0 +1,129 @@
+"""
+Local stand-ins for the upstream providers used by the voice pipeline
+
+Implements just enough of the OpenAI (transcription, streaming chat
+completions, speech) and ElevenLabs (streaming text-to-speech) HTTP APIs for
+server.py to run unchanged against them, with configurable latency, token
+rate and audio throughput. Point the server at it with:
+
+    OPENAI_BASE_URL=http://127.0.0.1:<port>/v1
+    ELEVENLABS_BASE_URL=http://127.0.0.1:<port>
+"""
+import asyncio
+import io
+import json
+import time
+import wave
+from collections import Counter
+from dataclasses import dataclass
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+DEFAULT_TRANSCRIPT = "I think I'm ready to take on more responsibility on the team."
+DEFAULT_REPLY = (
+    "That's a bold claim. Walk me through what you've delivered in the last quarter. "
+    "I need numbers, not feelings. What did the team ship because of you? "
+    "And what would you stop doing if you took this role tomorrow?"
+)
+
+
+@dataclass
+class StubProfile:
+    """Latency and throughput knobs for the stand-in providers"""
+    stt_latency: float = 0.35            # Seconds from upload to transcript
+    llm_first_token_latency: float = 0.3  # Seconds to the first streamed token
+    llm_tokens_per_second: float = 50.0
+    tts_first_byte_latency: float = 0.25  # Seconds to the first audio byte
+    tts_bytes_per_second: int = 64000     # Streaming rate once audio starts
+    tts_chunk_size: int = 4096
+    audio_bytes_per_char: int = 1000      # ~16 kB/s of MP3 at ~16 characters per second
+    transcript: str = DEFAULT_TRANSCRIPT
+    reply: str = DEFAULT_REPLY
+
+
+def _tokenize(text: str) -> list:
+    """Split a reply into word-sized tokens the way a chat model streams them"""
+    words = text.split(" ")
+    return [words[0]] + [" " + word for word in words[1:]]
+
+
+def _chat_chunk(content=None, role=None, finish_reason=None) -> str:
+    delta = {}
+    if role:
+        delta["role"] = role
+    if content is not None:
+        delta["content"] = content
+    chunk = {
+        "id": "chatcmpl-bench",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": "gpt-4o-mini",
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+    }
+    return f"data: {json.dumps(chunk)}\n\n"
+
+
+def _silent_wav(num_bytes: int, sample_rate: int = 24000) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(bytes(num_bytes - num_bytes % 2))
+    return buffer.getvalue()
+
+
+def create_stub_app(profile: StubProfile) -> FastAPI:
+    """Build the stand-in provider app; ``app.state.requests`` counts calls per endpoint"""
+    app = FastAPI()
+    app.state.requests = Counter()
+
+    async def stream_audio(payload: bytes):
+        await asyncio.sleep(profile.tts_first_byte_latency)
+        chunk_delay = profile.tts_chunk_size / profile.tts_bytes_per_second
+        for offset in range(0, len(payload), profile.tts_chunk_size):
+            if offset:
+                await asyncio.sleep(chunk_delay)
+            yield payload[offset:offset + profile.tts_chunk_size]
+
+    @app.post("/v1/audio/transcriptions")
+    async def transcriptions(request: Request):
+        app.state.requests["stt"] += 1
+        await request.body()
+        await asyncio.sleep(profile.stt_latency)
+        return {"text": profile.transcript}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        app.state.requests["llm"] += 1
+        await request.json()
+
+        async def events():
+            await asyncio.sleep(profile.llm_first_token_latency)
+            yield _chat_chunk(role="assistant", content="")
+            delay = 1.0 / profile.llm_tokens_per_second
+            for i, token in enumerate(_tokenize(profile.reply)):
+                if i:
+                    await asyncio.sleep(delay)
+                yield _chat_chunk(content=token)
+            yield _chat_chunk(finish_reason="stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/v1/audio/speech")
+    async def openai_speech(request: Request):
+        app.state.requests["openai_tts"] += 1
+        body = await request.json()
+        payload = _silent_wav(len(body.get("input", "")) * profile.audio_bytes_per_char)
+        return StreamingResponse(stream_audio(payload), media_type="audio/wav")
+
+    @app.post("/v1/text-to-speech/{voice_id}/stream")
+    async def elevenlabs_stream(voice_id: str, request: Request):
+        app.state.requests["elevenlabs_tts"] += 1
+        body = await request.json()
+        payload = bytes(len(body.get("text", "")) * profile.audio_bytes_per_char)
+        return StreamingResponse(stream_audio(payload), media_type="audio/mpeg")
+
+    return app
@@ -0,0 +1,430 @@
+"""
+End-to-end benchmark for the voice pipeline
+
+Runs server.py in-process against the local stand-in providers from
+stub_providers.py and drives /ws/{client_id} with N simulated clients that
+send recorded PCM as binary frames. Reports turn throughput, time to
+transcript / first token / first audio percentiles, the event-loop lag of the
+server loop and the server's own per-stage timings.
+
+Run from the repository root:
+
+    python -m benchmarks.voice_pipeline --clients 20 --turns 5
+    python -m benchmarks.voice_pipeline --audio sample.wav --mode stream --vad
+    python -m benchmarks.voice_pipeline --llm-tokens-per-second 20 --json results.json
+
+Latencies are measured from the moment the client finished sending the
+utterance (the single utterance frame, or the end-of-utterance chunk in
+stream mode).
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+import wave
+from collections import Counter
+from contextlib import redirect_stdout
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+# Nothing from utils, core or server at module level: importing utils pulls in
+# core.database, which reads DATABASE_URL before configure_environment sets it
+from benchmarks.stub_providers import StubProfile, create_stub_app  # noqa: E402
+
+SAMPLE_RATE = 16000
+LAG_PROBE_INTERVAL = 0.01
+MILESTONES = ("processing", "transcript", "first_token", "first_audio", "done")
+
+
+# ----------------------------------------------------------------------
+# Audio input
+# ----------------------------------------------------------------------
+def load_pcm(path: str) -> bytes:
+    """Load 16 kHz mono int16 PCM from a .wav file or a headerless .pcm/.raw file"""
+    if not path.lower().endswith(".wav"):
+        with open(path, "rb") as f:
+            return f.read()
+
+    with wave.open(path, "rb") as wav_file:
+        if (wav_file.getframerate(), wav_file.getnchannels(), wav_file.getsampwidth()) != (SAMPLE_RATE, 1, 2):
+            raise SystemExit(f"{path}: expected 16 kHz mono 16-bit PCM WAV")
+        return wav_file.readframes(wav_file.getnframes())
+
+
+def synthetic_utterance(seconds: float = 2.5, trailing_silence: float = 0.3) -> bytes:
+    """
+    Voiced, syllable-modulated tone. Good enough for the energy endpointing
+    used when VAD is off; Silero will (rightly) not call it speech, so pass a
+    real recording with --audio when benchmarking with --vad.
+    """
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    f0 = 140 + 20 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = 0.5 * (1 - np.cos(2 * np.pi * 4 * t))
+    signal = 0.3 * voiced * envelope / np.max(np.abs(voiced))
+    silence = np.zeros(int(SAMPLE_RATE * trailing_silence))
+    return (np.concatenate((signal, silence)) * 32767).astype("<i2").tobytes()
+
+
+# ----------------------------------------------------------------------
+# In-process servers
+# ----------------------------------------------------------------------
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class ThreadedServer:
+    """Runs a uvicorn server on its own event loop in a background thread"""
+
+    def __init__(self, app, port: int, name: str):
+        import uvicorn
+
+        self.port = port
+        self.server = uvicorn.Server(uvicorn.Config(
+            app, host="127.0.0.1", port=port, log_level="warning", ws_max_size=64 * 1024 * 1024
+        ))
+        self.loop = None
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self.server.serve())
+
+    def start(self, timeout: float = 120.0):
+        self.thread.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if not self.thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError(f"{self.thread.name} failed to start")
+            time.sleep(0.05)
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join(timeout=30)
+
+
+class LoopLagProbe:
+    """Measures how late a periodic timer fires on a (server) event loop"""
+
+    def __init__(self, interval: float = LAG_PROBE_INTERVAL):
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while not self._stop.is_set():
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - expected))
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        self.samples.clear()
+        asyncio.run_coroutine_threadsafe(self.run(), loop)
+
+    def stop(self):
+        self._stop.set()
+
+
+def configure_environment(args, stub_port: int, workdir: str):
+    """Environment for server.py; must be set before it (or core.config) is imported"""
+    os.environ.update({
+        "ENVIRONMENT": "development",
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        "OPENAI_API_KEY": "sk-bench",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{stub_port}/v1",
+        "ELEVENLABS_API_KEY": "bench" if args.tts == "elevenlabs" else "",
+        "ELEVENLABS_BASE_URL": f"http://127.0.0.1:{stub_port}",
+        "TTS_PROVIDERS": {"elevenlabs": "elevenlabs,openai", "openai": "openai", "local": "local"}[args.tts],
+        "TTS_LAST_RESORT_PROVIDERS": "",
+        "ENABLE_RABBITMQ": "false",
+        # Opener warmup would add its own provider traffic to the measurements
+        "ENABLE_OPENERS": "false",
+        # Every turn sends the same utterance; a cached transcript would skip STT
+        "STT_CACHE_MAX_ENTRIES": "0",
+        "ENABLE_SPECULATIVE_LLM": str(args.speculative).lower(),
+        "AUDIO_EXECUTOR": args.executor,
+        "AUDIO_EXECUTOR_WORKERS": str(args.executor_workers),
+    })
+
+
+def create_bench_user() -> str:
+    """Create an active user in the benchmark database and return a token for it"""
+    from core import database, models
+    from utils.auth_utils import create_access_token
+
+    db = database.SessionLocal()
+    try:
+        user = models.User(
+            email=f"bench-{int(time.time() * 1000)}@example.com",
+            name="Benchmark",
+            user_type="premium",
+            trial_status="active"
+        )
+        db.add(user)
+        db.commit()
+        return create_access_token({"user_id": user.user_id, "email": user.email})
+    finally:
+        db.close()
+
+
+# ----------------------------------------------------------------------
+# Simulated clients
+# ----------------------------------------------------------------------
+def build_turn_frames(pcm: bytes, mode: str, chunk_ms: int) -> list:
+    from utils.audio_frames import build_frame, KIND_AUDIO_UTTERANCE, KIND_AUDIO_CHUNK, FLAG_END_OF_UTTERANCE
+
+    if mode == "utterance":
+        return [build_frame(KIND_AUDIO_UTTERANCE, pcm)]
+
+    chunk_bytes = SAMPLE_RATE * 2 * chunk_ms // 1000
+    offsets = range(0, len(pcm), chunk_bytes)
+    return [
+        build_frame(KIND_AUDIO_CHUNK, pcm[offset:offset + chunk_bytes], sequence=i,
+                    flags=FLAG_END_OF_UTTERANCE if offset + chunk_bytes >= len(pcm) else 0)
+        for i, offset in enumerate(offsets)
+    ]
+
+
+async def run_turn(ws, frames: list, args) -> dict:
+    # Stream chunks in real time, like a microphone would
+    for i, frame in enumerate(frames):
+        if i:
+            await asyncio.sleep(args.chunk_ms / 1000)
+        await ws.send(frame)
+    sent_at = time.perf_counter()
+
+    result = {"outcome": "timeout", "audio_bytes": 0}
+    deadline = sent_at + args.turn_timeout
+    while True:
+        try:
+            message = await asyncio.wait_for(ws.recv(), timeout=max(0.0, deadline - time.perf_counter()))
+        except asyncio.TimeoutError:
+            return result
+        elapsed = time.perf_counter() - sent_at
+
+        if isinstance(message, bytes):
+            result.setdefault("first_audio", elapsed)
+            result["audio_bytes"] += len(message)
+            continue
+
+        kind = json.loads(message).get("type")
+        if kind == "processing":
+            result.setdefault("processing", elapsed)
+        elif kind == "transcript":
+            result.setdefault("transcript", elapsed)
+        elif kind == "llm_response_token":
+            result.setdefault("first_token", elapsed)
+        elif kind == "tts_audio_chunk":
+            result.setdefault("first_audio", elapsed)
+            result["audio_bytes"] += len(message)
+        elif kind == "llm_response_end":
+            result["done"] = elapsed
+            result["outcome"] = "ok"
+            return result
+        elif kind == "error":
+            result["outcome"] = "error"
+            return result
+
+
+async def run_client(index: int, url: str, frames: list, args, results: list):
+    from websockets.asyncio.client import connect
+
+    await asyncio.sleep(args.ramp * index / max(1, args.clients))
+    try:
+        async with connect(url.format(client_id=f"bench-{index}"), max_size=None) as ws:
+            while json.loads(await ws.recv()).get("type") != "connected":
+                pass
+            for _ in range(args.turns):
+                results.append(await run_turn(ws, frames, args))
+                if args.think_time:
+                    await asyncio.sleep(args.think_time)
+    except Exception as e:
+        print(f"client {index}: {type(e).__name__}: {e}", file=sys.stderr)
+        results.append({"outcome": "connection_error"})
+
+
+# ----------------------------------------------------------------------
+# Reporting
+# ----------------------------------------------------------------------
+def distribution(values) -> dict:
+    if not values:
+        return {"count": 0}
+    ms = np.asarray(values) * 1000
+    return {
+        "count": len(values),
+        "p50": round(float(np.percentile(ms, 50)), 1),
+        "p90": round(float(np.percentile(ms, 90)), 1),
+        "p99": round(float(np.percentile(ms, 99)), 1),
+        "max": round(float(ms.max()), 1),
+    }
+
+
+def server_stage_means() -> dict:
+    """Mean duration per stage and milestone from the server's metrics registry"""
+    from utils.metrics import STAGE_SECONDS, MILESTONE_SECONDS
+
+    means = {}
+    for histogram in (STAGE_SECONDS, MILESTONE_SECONDS):
+        for key, counts in histogram.counts.items():
+            count = sum(counts)
+            if count:
+                means[key[0]] = round(histogram.sums[key] / count * 1000, 1)
+    return means
+
+
+def summarize(args, results: list, wall_seconds: float, lag_samples: list, provider_requests: dict) -> dict:
+    completed = [r for r in results if r["outcome"] == "ok"]
+    return {
+        "config": {
+            "clients": args.clients, "turns": args.turns, "mode": args.mode, "tts": args.tts,
+            "tts_transport": args.tts_transport, "tts_format": args.tts_format,
+            "vad": args.vad, "augmentation": args.augmentation, "speculative": args.speculative,
+            "executor": args.executor,
+        },
+        "turns": dict(Counter(r["outcome"] for r in results)),
+        "wall_seconds": round(wall_seconds, 2),
+        "throughput_turns_per_second": round(len(completed) / wall_seconds, 2) if wall_seconds else 0.0,
+        "latency_ms": {
+            milestone: distribution([r[milestone] for r in completed if milestone in r])
+            for milestone in MILESTONES
+        },
+        "event_loop_lag_ms": distribution(lag_samples),
+        "server_mean_ms": server_stage_means(),
+        "provider_requests": provider_requests,
+    }
+
+
+def print_report(summary: dict):
+    print("\n" + "=" * 72)
+    print("Voice pipeline benchmark")
+    print("=" * 72)
+    print(f"Config:      {json.dumps(summary['config'])}")
+    print(f"Turns:       {summary['turns']}")
+    print(f"Wall time:   {summary['wall_seconds']}s")
+    print(f"Throughput:  {summary['throughput_turns_per_second']} turns/s")
+    print(f"\n{'latency (ms)':<16}{'count':>8}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}")
+    rows = list(summary["latency_ms"].items()) + [("event_loop_lag", summary["event_loop_lag_ms"])]
+    for name, dist in rows:
+        if dist["count"]:
+            print(f"{name:<16}{dist['count']:>8}{dist['p50']:>10}{dist['p90']:>10}{dist['p99']:>10}{dist['max']:>10}")
+        else:
+            print(f"{name:<16}{0:>8}")
+    print("\nServer means (ms): " + ", ".join(f"{k}={v}" for k, v in summary["server_mean_ms"].items()))
+    print(f"Provider calls:    {summary['provider_requests']}")
+    print("=" * 72)
+
+
+# ----------------------------------------------------------------------
+# Entry point
+# ----------------------------------------------------------------------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark of the voice pipeline")
+    parser.add_argument("--clients", type=int, default=10, help="Concurrent simulated clients")
+    parser.add_argument("--turns", type=int, default=3, help="Turns per client")
+    parser.add_argument("--audio", help="16 kHz mono int16 .wav or raw .pcm utterance (default: synthetic)")
+    parser.add_argument("--mode", choices=("utterance", "stream"), default="utterance",
+                        help="Send one utterance frame per turn, or real-time PCM chunks")
+    parser.add_argument("--chunk-ms", type=int, default=40, help="Chunk size in stream mode")
+    parser.add_argument("--think-time", type=float, default=0.5, help="Pause between turns (s)")
+    parser.add_argument("--ramp", type=float, default=1.0, help="Spread client connects over this many seconds")
+    parser.add_argument("--turn-timeout", type=float, default=60.0)
+    parser.add_argument("--tts", choices=("elevenlabs", "openai", "local"), default="elevenlabs",
+                        help="TTS path to exercise (openai = the fallback path, local = Piper on this "
+                             "machine, needs piper-tts and voices in LOCAL_TTS_MODEL_DIR)")
+    parser.add_argument("--tts-transport", choices=("json", "binary"), default="binary",
+                        help="How the server delivers TTS audio to the clients")
+    parser.add_argument("--tts-format", choices=("opus", "mp3", "pcm"), default="mp3",
+                        help="TTS output format the clients negotiate")
+    parser.add_argument("--vad", action="store_true", help="Run Silero VAD (use with a real --audio recording)")
+    parser.add_argument("--augmentation", action="store_true", help="Augment every turn before STT (the ?augment=true opt-in)")
+    parser.add_argument("--speculative", action="store_true",
+                        help="Start replies speculatively on pauses (stream mode only)")
+    parser.add_argument("--executor", choices=("thread", "process"), default="thread")
+    parser.add_argument("--executor-workers", type=int, default=2)
+
+    stub = parser.add_argument_group("stand-in providers")
+    defaults = StubProfile()
+    stub.add_argument("--stt-latency", type=float, default=defaults.stt_latency)
+    stub.add_argument("--llm-first-token-latency", type=float, default=defaults.llm_first_token_latency)
+    stub.add_argument("--llm-tokens-per-second", type=float, default=defaults.llm_tokens_per_second)
+    stub.add_argument("--tts-first-byte-latency", type=float, default=defaults.tts_first_byte_latency)
+    stub.add_argument("--tts-bytes-per-second", type=int, default=defaults.tts_bytes_per_second)
+
+    parser.add_argument("--server-log", default=os.devnull, help="Where server.py's output goes")
+    parser.add_argument("--json", help="Also write the summary to this file")
+    return parser.parse_args(argv)
+
+
+async def drive_clients(url: str, frames: list, args) -> tuple:
+    results = []
+    started = time.perf_counter()
+    await asyncio.gather(*(run_client(i, url, frames, args, results) for i in range(args.clients)))
+    return results, time.perf_counter() - started
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    pcm = load_pcm(args.audio) if args.audio else synthetic_utterance()
+
+    profile = StubProfile(
+        stt_latency=args.stt_latency,
+        llm_first_token_latency=args.llm_first_token_latency,
+        llm_tokens_per_second=args.llm_tokens_per_second,
+        tts_first_byte_latency=args.tts_first_byte_latency,
+        tts_bytes_per_second=args.tts_bytes_per_second,
+    )
+    stub_app = create_stub_app(profile)
+    stub_server = ThreadedServer(stub_app, free_port(), "stub-providers")
+    stub_server.start()
+
+    workdir = tempfile.mkdtemp(prefix="voice-bench-")
+    configure_environment(args, stub_server.port, workdir)
+    os.chdir(REPO_ROOT)  # server.py mounts ./static relative to the working directory
+    frames = build_turn_frames(pcm, args.mode, args.chunk_ms)
+
+    with open(args.server_log, "w") as log, redirect_stdout(log):
+        import server
+
+        server.ENABLE_VAD = args.vad
+        server.ENABLE_AUGMENTATION = args.augmentation
+        token = create_bench_user()
+
+        voice_server = ThreadedServer(server.app, free_port(), "voice-server")
+        voice_server.start()
+        probe = LoopLagProbe()
+        probe.start(voice_server.loop)
+
+        url = (f"ws://127.0.0.1:{voice_server.port}/ws/{{client_id}}"
+               f"?token={token}&tts_transport={args.tts_transport}&tts_format={args.tts_format}"
+               f"&augment={str(args.augmentation).lower()}")
+        print(f"Driving {args.clients} client(s) x {args.turns} turn(s)...", file=sys.stderr)
+        try:
+            results, wall_seconds = asyncio.run(drive_clients(url, frames, args))
+        finally:
+            probe.stop()
+            voice_server.stop()
+            stub_server.stop()
+
+    summary = summarize(args, results, wall_seconds, probe.samples, dict(stub_app.state.requests))
+    print_report(summary)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+    return summary
+
+
+if __name__ == "__main__":
+    main()
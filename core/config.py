@@ -79,7 +79,86 @@ class Config:
     # Feature Flags
     ENABLE_SERVER_TTS = os.getenv("ENABLE_SERVER_TTS", "true").lower() == "true"
     ENABLE_VAD = os.getenv("ENABLE_VAD", "true").lower() == "true"
-    ENABLE_AUGMENTATION = os.getenv("ENABLE_AUGMENTATION", "true").lower() == "true"
+    # Loads the augmentation pipeline so clients can request it per session/turn;
+    # nothing is augmented unless they do (offline export: python -m services.augmentation)
+    ENABLE_AUGMENTATION = os.getenv("ENABLE_AUGMENTATION", "false").lower() == "true"
+    
+    # Voice Activity Detection
+    # "onnx" runs the bundled model with onnxruntime; "torch" loads it through torch.hub
+    VAD_BACKEND = os.getenv("VAD_BACKEND", "onnx").lower()
+    VAD_ONNX_MODEL_PATH = os.getenv(
+        "VAD_ONNX_MODEL_PATH",
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models", "silero_vad.onnx")
+    )
+    VAD_NUM_THREADS = int(os.getenv("VAD_NUM_THREADS", "1"))
+    
+    # Audio preprocessing executor (keeps PCM decode/VAD/augmentation/WAV off the event loop)
+    AUDIO_EXECUTOR = os.getenv("AUDIO_EXECUTOR", "thread").lower()  # "thread" or "process"
+    AUDIO_EXECUTOR_WORKERS = int(os.getenv("AUDIO_EXECUTOR_WORKERS", "2"))
+    AUDIO_EXECUTOR_MAX_QUEUE = int(os.getenv("AUDIO_EXECUTOR_MAX_QUEUE", "32"))
+    AUDIO_TORCH_THREADS = int(os.getenv("AUDIO_TORCH_THREADS", "1"))
+    
+    # Text-to-speech
+    TTS_MAX_IN_FLIGHT = int(os.getenv("TTS_MAX_IN_FLIGHT", "2"))  # Concurrent synthesis requests per session
+    TTS_OUTPUT_FORMAT = os.getenv("TTS_OUTPUT_FORMAT", "mp3").lower()  # Default for clients that don't pass tts_format
+    
+    # TTS provider routing (services/tts_router.py)
+    TTS_PROVIDERS = [p.strip() for p in os.getenv("TTS_PROVIDERS", "elevenlabs,openai").split(",") if p.strip()]
+    # Only used when every other provider failed, however fast they are
+    TTS_LAST_RESORT_PROVIDERS = [
+        p.strip() for p in os.getenv("TTS_LAST_RESORT_PROVIDERS", "local").split(",") if p.strip()
+    ]
+    TTS_HEDGE_AFTER_MS = float(os.getenv("TTS_HEDGE_AFTER_MS", "0"))  # 0 = never hedge
+    TTS_ROUTER_WINDOW = int(os.getenv("TTS_ROUTER_WINDOW", "100"))  # Requests kept per provider for p50/p95
+    TTS_PROVIDER_FAIL_MAX = int(os.getenv("TTS_PROVIDER_FAIL_MAX", "5"))  # Consecutive failures before cooldown
+    TTS_PROVIDER_MAX_ERROR_RATE = float(os.getenv("TTS_PROVIDER_MAX_ERROR_RATE", "0.5"))
+    TTS_PROVIDER_COOLDOWN_SECONDS = float(os.getenv("TTS_PROVIDER_COOLDOWN_SECONDS", "60"))
+    
+    # Local Piper engine ("local" provider); voices are <name>.onnx + <name>.onnx.json
+    LOCAL_TTS_MODEL_DIR = os.getenv(
+        "LOCAL_TTS_MODEL_DIR",
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models", "piper")
+    )
+    LOCAL_TTS_MAX_CONCURRENCY = int(os.getenv("LOCAL_TTS_MAX_CONCURRENCY", "2"))
+    
+    # Process-wide TTS connection pool (shared by all sessions)
+    TTS_HTTP2 = os.getenv("TTS_HTTP2", "true").lower() == "true"
+    TTS_HTTP_MAX_CONNECTIONS = int(os.getenv("TTS_HTTP_MAX_CONNECTIONS", "64"))
+    TTS_HTTP_MAX_KEEPALIVE = int(os.getenv("TTS_HTTP_MAX_KEEPALIVE", "16"))
+    TTS_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("TTS_HTTP_KEEPALIVE_EXPIRY", "60"))
+    HTTP_WARMUP_CONNECTIONS = int(os.getenv("HTTP_WARMUP_CONNECTIONS", "2"))  # Per provider host at startup
+    
+    # TTS audio cache: in-memory LRU (0 disables the cache) plus an optional on-disk tier
+    TTS_CACHE_MEMORY_MB = int(os.getenv("TTS_CACHE_MEMORY_MB", "64"))
+    TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "")  # Empty = memory only
+    TTS_CACHE_DISK_MB = int(os.getenv("TTS_CACHE_DISK_MB", "1024"))
+    TTS_CACHE_MAX_ENTRY_KB = int(os.getenv("TTS_CACHE_MAX_ENTRY_KB", "512"))
+    
+    # Transcripts of recent uploads, so a client retrying the same audio is not billed twice
+    # (0 for either disables the cache)
+    STT_CACHE_MAX_ENTRIES = int(os.getenv("STT_CACHE_MAX_ENTRIES", "1024"))
+    STT_CACHE_TTL_SECONDS = float(os.getenv("STT_CACHE_TTL_SECONDS", "300"))
+    
+    # LLM context per session: recent turns verbatim, older ones folded into a rolling summary
+    # once summary + history exceed the budget (0 = unbounded). The system prompt is not counted.
+    CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
+    CONTEXT_KEEP_TURNS = int(os.getenv("CONTEXT_KEEP_TURNS", "4"))
+    CONTEXT_SUMMARY_MAX_TOKENS = int(os.getenv("CONTEXT_SUMMARY_MAX_TOKENS", "300"))
+    
+    # Speculative replies (streamed audio only): when the user pauses for SPECULATIVE_PAUSE_MS,
+    # transcribe the speech so far and start the LLM; kept if the final transcript matches
+    # (word similarity >= SPECULATIVE_MATCH_THRESHOLD). Costs an extra STT/LLM call per false pause.
+    ENABLE_SPECULATIVE_LLM = os.getenv("ENABLE_SPECULATIVE_LLM", "false").lower() == "true"
+    SPECULATIVE_PAUSE_MS = int(os.getenv("SPECULATIVE_PAUSE_MS", "500"))
+    SPECULATIVE_MATCH_THRESHOLD = float(os.getenv("SPECULATIVE_MATCH_THRESHOLD", "0.9"))
+    
+    # Conversation openers, pre-synthesized at startup for every personality x scenario
+    ENABLE_OPENERS = os.getenv("ENABLE_OPENERS", "true").lower() == "true"
+    OPENER_CACHE_DIR = os.getenv(
+        "OPENER_CACHE_DIR",
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache", "openers")
+    )
+    OPENER_WARMUP_REQUESTS_PER_MINUTE = float(os.getenv("OPENER_WARMUP_REQUESTS_PER_MINUTE", "20"))
     
     @classmethod
     def validate(cls):
@@ -96,6 +175,37 @@ class Config:
             if not cls.ALLOWED_ORIGINS or cls.ALLOWED_ORIGINS == [""]:
                 errors.append("ALLOWED_ORIGINS must be set for production")
         
+        if cls.VAD_BACKEND not in ("onnx", "torch"):
+            errors.append("VAD_BACKEND must be 'onnx' or 'torch'")
+        
+        if cls.AUDIO_EXECUTOR not in ("thread", "process"):
+            errors.append("AUDIO_EXECUTOR must be 'thread' or 'process'")
+        
+        if cls.AUDIO_EXECUTOR_WORKERS < 1:
+            errors.append("AUDIO_EXECUTOR_WORKERS must be at least 1")
+        
+        if cls.AUDIO_EXECUTOR_MAX_QUEUE < 0:
+            errors.append("AUDIO_EXECUTOR_MAX_QUEUE must be at least 0")
+        
+        if cls.TTS_MAX_IN_FLIGHT < 1:
+            errors.append("TTS_MAX_IN_FLIGHT must be at least 1")
+        
+        if cls.TTS_OUTPUT_FORMAT not in ("opus", "mp3", "pcm"):
+            errors.append("TTS_OUTPUT_FORMAT must be 'opus', 'mp3' or 'pcm'")
+        
+        unknown_providers = set(cls.TTS_PROVIDERS) - {"elevenlabs", "openai", "local"}
+        if not cls.TTS_PROVIDERS or unknown_providers:
+            errors.append("TTS_PROVIDERS must list one or more of: elevenlabs, openai, local")
+        
+        if cls.CONTEXT_KEEP_TURNS < 1:
+            errors.append("CONTEXT_KEEP_TURNS must be at least 1")
+        
+        if not 0.0 < cls.SPECULATIVE_MATCH_THRESHOLD <= 1.0:
+            errors.append("SPECULATIVE_MATCH_THRESHOLD must be in (0, 1]")
+        
+        if cls.TTS_HTTP_MAX_KEEPALIVE > cls.TTS_HTTP_MAX_CONNECTIONS:
+            errors.append("TTS_HTTP_MAX_KEEPALIVE cannot exceed TTS_HTTP_MAX_CONNECTIONS")
+        
         if errors:
             raise RuntimeError("Configuration errors:\n" + "\n".join(f"  - {e}" for e in errors))
         
@@ -114,6 +224,23 @@ class Config:
         print(f"Redis: {'Configured' if cls.REDIS_URL else 'Not configured'}")
         print(f"OpenAI: {'Configured' if cls.OPENAI_API_KEY else 'Not configured'}")
         print(f"ElevenLabs: {'Configured' if cls.ELEVENLABS_API_KEY else 'Not configured'}")
+        print(f"VAD Backend: {cls.VAD_BACKEND} ({cls.VAD_NUM_THREADS} thread(s))")
+        print(f"Audio Executor: {cls.AUDIO_EXECUTOR} ({cls.AUDIO_EXECUTOR_WORKERS} worker(s))")
+        print(f"TTS Pipeline: {cls.TTS_MAX_IN_FLIGHT} request(s) in flight, {cls.TTS_OUTPUT_FORMAT} by default")
+        print(f"TTS Providers: {', '.join(cls.TTS_PROVIDERS)} "
+              f"(hedge {'after ' + str(int(cls.TTS_HEDGE_AFTER_MS)) + ' ms' if cls.TTS_HEDGE_AFTER_MS > 0 else 'off'})")
+        print(f"TTS HTTP Pool: {cls.TTS_HTTP_MAX_CONNECTIONS} connection(s), "
+              f"HTTP/2 {'on' if cls.TTS_HTTP2 else 'off'}")
+        print(f"TTS Cache: {cls.TTS_CACHE_MEMORY_MB} MB memory, "
+              f"{str(cls.TTS_CACHE_DISK_MB) + ' MB disk' if cls.TTS_CACHE_DIR else 'no disk tier'}")
+        print(f"STT Cache: {cls.STT_CACHE_MAX_ENTRIES} entries, {cls.STT_CACHE_TTL_SECONDS:.0f}s TTL")
+        print(f"LLM Context: "
+              f"{str(cls.CONTEXT_TOKEN_BUDGET) + ' token budget' if cls.CONTEXT_TOKEN_BUDGET > 0 else 'unbounded'}, "
+              f"last {cls.CONTEXT_KEEP_TURNS} turn(s) verbatim")
+        print(f"Speculative Replies: "
+              f"{'after ' + str(cls.SPECULATIVE_PAUSE_MS) + ' ms pauses' if cls.ENABLE_SPECULATIVE_LLM else 'Disabled'}")
+        print(f"Openers: {'Enabled' if cls.ENABLE_OPENERS else 'Disabled'}")
+        print(f"Live Augmentation: {'On request' if cls.ENABLE_AUGMENTATION else 'Disabled'}")
         print("="*60 + "\n")
 
 
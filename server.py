@@ -1,32 +1,55 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Query, status
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 # from fastapi.security import HTTPBearer, HTTPAuthCredentialsBearer
 import numpy as np
-import io
 import os
 import json
 import asyncio
 import base64
-from openai import OpenAI
+from openai import AsyncOpenAI, APITimeoutError
 from dotenv import load_dotenv
-from contextlib import asynccontextmanager
-import wave
+from contextlib import asynccontextmanager, nullcontext
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import httpx
+import importlib.util
+import functools
+from typing import Optional
 import re
 import torch
 import torchaudio
-from torch_audiomentations import Compose, AddColoredNoise, PitchShift, Gain
 import aio_pika
 import uuid
 from sqlalchemy.orm import Session
 from core import database, models, schemas
 from core.database import Base, engine
+from core.config import Config
 from routes import auth_routes
 from jose import jwt, JWTError
 from utils.auth_utils import SECRET_KEY, ALGORITHM
 from utils.token_blacklist import is_blacklisted
+from utils.audio_frames import (
+    parse_frame, build_frame, FrameError, KIND_AUDIO_UTTERANCE, KIND_AUDIO_CHUNK, KIND_TTS_AUDIO,
+    FLAG_END_OF_UTTERANCE, FLAG_END_OF_SEGMENT, CODEC_MP3, CODEC_OPUS, CODEC_PCM16_24K, CODEC_WAV, CODEC_NAMES,
+    check_input_codec
+)
+from utils.audio_buffer import (
+    PCM16, pcm16_to_float32, float32_to_pcm16, encode_wav
+)
+from utils.metrics import REGISTRY, TurnTrace
+from utils.tts_cache import TTSCache, make_key as make_tts_cache_key
+from utils.stt_cache import STTCache, audio_fingerprint, make_key as make_stt_cache_key
+from utils.text_segmenter import SegmentationPolicy, SentenceSegmenter
+from services.openers import OpenerStore, opener_fingerprint, warm_openers
+from services.tts_router import TTSRouter
+from services.local_tts import PiperTTS, resample_pcm16
+from services.augmentation import AudioAugmentation
+from services.vad import SileroVAD, StreamingAudioSession
+from services.speculation import SpeculativeReply, transcripts_match
+from services.conversation_context import ConversationContext
 
 load_dotenv()
 
@@ -35,41 +58,58 @@ models.Base.metadata.create_all(bind=database.engine)
 
 client = None
 ENABLE_VAD = True
-ENABLE_AUGMENTATION = True
+ENABLE_AUGMENTATION = Config.ENABLE_AUGMENTATION  # Lets clients opt in per connection/turn
 vad_model = None
 audio_augmentation = None
+audio_executor = None
+tts_http_client = None  # Shared by every StreamingTTSService; owned by lifespan
+tts_cache = None  # Content-addressed TTS audio cache (utils/tts_cache.py)
+stt_cache = None  # Transcripts of recently uploaded audio (utils/stt_cache.py)
+opener_store = None  # Pre-synthesized openers (services/openers.py)
+local_tts = None  # Piper engine, when "local" is one of TTS_PROVIDERS (services/local_tts.py)
 rabbitmq_connection = None
 rabbitmq_channel = None
 MAX_AUDIO_SIZE = 5 * 1024 * 1024  # 5MB
-# Voice assignments for personalities with ElevenLabs voices
+STT_MODEL = "gpt-4o-transcribe"
+STT_LANGUAGE = "en"
+# Voice per personality on every TTS provider: ElevenLabs voice + settings, and the
+# closest OpenAI and local Piper voices so a fallback keeps the same persona
 VOICE_ASSIGNMENTS = {
     "entj_commander": {
         "voice_id": "pGYsZruQzo8cpdFVZyJc",
         "model": "eleven_multilingual_v2",
         "stability": 1.0,
         "similarity_boost": 0.95,
-        "use_speaker_boost": False
+        "use_speaker_boost": False,
+        "openai_voice": "nova",
+        "local_voice": "en_US-lessac-medium"
     },
     "istj_operator": {
         "voice_id": "dFL9bzYmnpBkY6f0KZip",
         "model": "eleven_multilingual_v2",
         "stability": 1.0,
         "similarity_boost": 0.95,
-        "use_speaker_boost": False
+        "use_speaker_boost": False,
+        "openai_voice": "onyx",
+        "local_voice": "en_US-ryan-medium"
     },
     "enfp_visionary": {
         "voice_id": "XwkIUwRxNu9PpezCu4Vg",
         "model": "eleven_multilingual_v2",
         "stability": 1.0,
         "similarity_boost": 0.95,
-        "use_speaker_boost": False
+        "use_speaker_boost": False,
+        "openai_voice": "nova",
+        "local_voice": "en_US-amy-medium"
     },
     "esfj_caregiver": {
         "voice_id": "Sxk6njaoa7XLsAFT7WcN",
         "model": "eleven_multilingual_v2",
         "stability": 1.0,
         "similarity_boost": 0.95,
-        "use_speaker_boost": False
+        "use_speaker_boost": False,
+        "openai_voice": "onyx",
+        "local_voice": "en_US-hfc_male-medium"
     }
 }
 
@@ -309,153 +349,39 @@ PERSONALITY_PROFILES = {
         "title": "Strategic Director",
         "description": "Blunt, action-driven, no-nonsense manager who values speed, clarity, and accountability.",
         "voice": VOICE_ASSIGNMENTS["entj_commander"],
-        "prompt_template": BASIC_PERSONALITY_PROMPT
+        "prompt_template": BASIC_PERSONALITY_PROMPT,
+        # How replies are cut into TTS requests (utils/text_segmenter.py)
+        "segmentation": SegmentationPolicy(first_min_chars=10, first_max_chars=60, min_chars=50, max_chars=200)
     },
     "istj_operator": {
         "name": "Harish",
         "title": "Operations Manager",
         "description": "Calm, structured, steady manager who values process, clarity, and disciplined execution.",
         "voice": VOICE_ASSIGNMENTS["istj_operator"],
-        "prompt_template": BASIC_PERSONALITY_PROMPT
+        "prompt_template": BASIC_PERSONALITY_PROMPT,
+        # How replies are cut into TTS requests (utils/text_segmenter.py)
+        "segmentation": SegmentationPolicy(first_min_chars=16, first_max_chars=90, min_chars=80, max_chars=260,
+                                           first_clause_split=False)
     },
     "enfp_visionary": {
         "name": "Sunita",
         "title": "Innovation Lead",
         "description": "Warm, energetic, encouraging manager who leads with optimism, empathy, and motivation.",
         "voice": VOICE_ASSIGNMENTS["enfp_visionary"],
-        "prompt_template": BASIC_PERSONALITY_PROMPT
+        "prompt_template": BASIC_PERSONALITY_PROMPT,
+        # How replies are cut into TTS requests (utils/text_segmenter.py)
+        "segmentation": SegmentationPolicy(first_min_chars=12, first_max_chars=70, min_chars=60, max_chars=240)
     },
     "esfj_caregiver": {
         "name": "Ravi",
         "title": "People Manager",
         "description": "Caring, relational, emotionally supportive manager who prioritizes trust and team well-being.",
         "voice": VOICE_ASSIGNMENTS["esfj_caregiver"],
-        "prompt_template": BASIC_PERSONALITY_PROMPT
+        "prompt_template": BASIC_PERSONALITY_PROMPT,
+        # How replies are cut into TTS requests (utils/text_segmenter.py)
+        "segmentation": SegmentationPolicy(first_min_chars=16, first_max_chars=90, min_chars=70, max_chars=260)
     }
 }
-class SileroVAD:
-    """Silero VAD for voice activity detection"""
-    
-    def __init__(self):
-        self.model = None
-        self.sample_rate = 16000
-        self.threshold = 0.5
-        
-    def load_model(self):
-        """Load Silero VAD model"""
-        try:
-            print("🎤 Loading Silero VAD model...")
-            self.model, utils = torch.hub.load(
-                repo_or_dir='snakers4/silero-vad',
-                model='silero_vad',
-                force_reload=False,
-                onnx=False
-            )
-            self.get_speech_timestamps = utils[0]
-            print("✅ Silero VAD loaded successfully")
-            return True
-        except Exception as e:
-            print(f"❌ Failed to load Silero VAD: {e}")
-            return False
-    
-    def detect_speech(self, audio_tensor: torch.Tensor) -> list:
-        """Detect speech segments in audio"""
-        if self.model is None:
-            return []
-        
-        try:
-            speech_timestamps = self.get_speech_timestamps(
-                audio_tensor,
-                self.model,
-                sampling_rate=self.sample_rate,
-                threshold=self.threshold,
-                min_speech_duration_ms=600,
-                min_silence_duration_ms=1200,
-                window_size_samples=512,
-                speech_pad_ms=150
-            )
-            return speech_timestamps
-        except Exception as e:
-            print(f"❌ VAD detection error: {e}")
-            return []
-    
-    def extract_speech_segments(self, audio_tensor: torch.Tensor) -> torch.Tensor:
-        """Extract only speech segments from audio"""
-        speech_timestamps = self.detect_speech(audio_tensor)
-        
-        if not speech_timestamps:
-            print("⚠️ No speech detected in audio")
-            return torch.tensor([])
-        
-        speech_segments = []
-        for segment in speech_timestamps:
-            start = segment['start']
-            end = segment['end']
-            speech_segments.append(audio_tensor[start:end])
-        
-        if speech_segments:
-            concatenated = torch.cat(speech_segments)
-            print(f"✅ Extracted {len(speech_timestamps)} speech segments, "
-                  f"total duration: {len(concatenated)/self.sample_rate:.2f}s")
-            return concatenated
-        
-        return torch.tensor([])
-
-
-class AudioAugmentation:
-    """Audio augmentation pipeline using torch-audiomentations"""
-    
-    def __init__(self, sample_rate: int = 16000):
-        self.sample_rate = sample_rate
-        self.augmentation = None
-        
-    def create_pipeline(self):
-        """Create audio augmentation pipeline"""
-        try:
-            print("🎵 Creating audio augmentation pipeline...")
-            self.augmentation = Compose([
-                AddColoredNoise(
-                    min_snr_in_db=10.0,
-                    max_snr_in_db=30.0,
-                    min_f_decay=-2.0,
-                    max_f_decay=2.0,
-                    p=0.3,
-                    sample_rate=self.sample_rate
-                ),
-                PitchShift(
-                    min_transpose_semitones=-1.0,
-                    max_transpose_semitones=1.0,
-                    p=0.2,
-                    sample_rate=self.sample_rate
-                ),
-                Gain(
-                    min_gain_in_db=-6.0,
-                    max_gain_in_db=6.0,
-                    p=0.3
-                )
-            ])
-            print("✅ Audio augmentation pipeline created")
-            return True
-        except Exception as e:
-            print(f"❌ Failed to create augmentation pipeline: {e}")
-            return False
-    
-    def augment(self, audio_tensor: torch.Tensor) -> torch.Tensor:
-        if self.augmentation is None:
-            return audio_tensor
-        
-        try:
-            # Ensure proper shape: (batch, channels, samples)
-            while audio_tensor.dim() < 3:
-                audio_tensor = audio_tensor.unsqueeze(0)
-            
-            augmented = self.augmentation(audio_tensor, sample_rate=self.sample_rate)
-            return augmented.squeeze() if augmented.dim() > 1 else augmented.squeeze()
-        except Exception as e:
-            print(f"⚠️ Augmentation failed: {e}")
-            return audio_tensor.squeeze()
-
-
 class RabbitMQManager:
     """RabbitMQ connection and queue management"""
     
@@ -508,12 +434,16 @@ class AudioProcessingWorker:
                     data = json.loads(message.body.decode())
                     client_id = data["client_id"]
                     audio_base64 = data["audio_data"]
+                    codec = data.get("codec", "pcm16")
+                    vad_done = data.get("vad_done", False)
+                    augment = data.get("augment", False)
                     request_id = data["request_id"]
                     
                     print(f"[{client_id}] 🎵 Processing audio from queue...")
                     
                     # Process audio transcription directly (no RabbitMQ for results)
-                    transcript = await AudioTranscriber.transcribe(audio_base64, client_id)
+                    transcript = await AudioTranscriber.transcribe(audio_base64, client_id, codec, vad_done,
+                                                                   augment=augment)
                     
                     # Store result in memory (for simplicity)
                     # In production, you might want to use Redis or database
@@ -571,7 +501,7 @@ class LLMProcessingWorker:
                     # Process LLM request
                     full_reply = ""
                     try:
-                        stream_response = client.chat.completions.create(
+                        stream_response = await client.chat.completions.create(
                             model="gpt-4o-mini",
                             messages=messages,
                             stream=True,
@@ -580,7 +510,7 @@ class LLMProcessingWorker:
                             presence_penalty=0.1
                         )
 
-                        for chunk in stream_response:
+                        async for chunk in stream_response:
                             if chunk.choices[0].delta.content:
                                 token = chunk.choices[0].delta.content
                                 full_reply += token
@@ -622,133 +552,371 @@ class LLMProcessingWorker:
 
 
 
+def preprocess_pcm_audio(audio_bytes, client_id: str, vad_done: bool = False, augment: bool = False):
+    """
+    CPU-bound part of transcription: VAD, WAV encode, plus
+    augmentation when the turn asked for it (``augment``). Runs inside the
+    audio executor. Returns (WAV bytes or None if no speech was found, audio
+    fingerprint for the STT cache or None for augmented audio, per-stage
+    durations in seconds).
+    """
+    timings = {}
+
+    # Speech segments stay views into the received PCM until the WAV is built;
+    # float32 samples are only made for VAD and augmentation
+    pcm = np.frombuffer(audio_bytes, dtype=PCM16)
+    segments = [pcm]
+
+    if ENABLE_VAD and not vad_done and vad_model and vad_model.model is not None:
+        stage_start = time.perf_counter()
+        samples = pcm16_to_float32(pcm)
+        timings["pcm_decode"] = time.perf_counter() - stage_start
+
+        print(f"[{client_id}] 🎤 Applying VAD...")
+        stage_start = time.perf_counter()
+        segments = vad_model.extract_speech_segments(samples, pcm)
+        timings["vad"] = time.perf_counter() - stage_start
+        
+        if not segments:
+            return None, None, timings
+    
+    if augment and audio_augmentation and audio_augmentation.augmentation is not None:
+        print(f"[{client_id}] 🎨 Applying audio augmentation...")
+        stage_start = time.perf_counter()
+        speech = np.empty(sum(len(segment) for segment in segments), dtype=np.float32)
+        position = 0
+        for segment in segments:
+            pcm16_to_float32(segment, out=speech[position:position + len(segment)])
+            position += len(segment)
+        augmented = audio_augmentation.augment(torch.from_numpy(speech))
+        segments = [float32_to_pcm16(augmented.numpy())]
+        timings["augmentation"] = time.perf_counter() - stage_start
+    
+    stage_start = time.perf_counter()
+    wav_bytes = encode_wav(segments, RATE)
+    # Augmentation is random, so augmented audio never matches a cached upload
+    fingerprint = None if augment else audio_fingerprint(wav_bytes)
+    timings["wav_encode"] = time.perf_counter() - stage_start
+    return wav_bytes, fingerprint, timings
+
+
+def _init_audio_process_worker(vad_backend: str, onnx_model_path: str, vad_threads: int,
+                               enable_augmentation: bool, torch_threads: int):
+    """Load the audio models inside a process-pool worker"""
+    global vad_model, audio_augmentation
+    torch.set_num_threads(torch_threads)
+    if ENABLE_VAD:
+        vad_model = SileroVAD(backend=vad_backend, onnx_model_path=onnx_model_path, num_threads=vad_threads)
+        vad_model.load_model()
+    if enable_augmentation:
+        audio_augmentation = AudioAugmentation(sample_rate=RATE)
+        audio_augmentation.create_pipeline()
+
+
+class AudioExecutorBusy(RuntimeError):
+    """Raised when the audio executor queue is full"""
+
+
+class AudioPreprocessingExecutor:
+    """
+    Runs CPU-bound audio preprocessing off the event loop.
+
+    ``mode`` is "thread" (shares the loaded models, torch limited to
+    ``torch_threads``) or "process" (each worker loads its own models).
+    At most ``max_workers`` jobs run at once; up to ``max_queue`` more wait
+    for a slot, beyond that new jobs are rejected with AudioExecutorBusy.
+    """
+
+    MODES = ("thread", "process")
+
+    def __init__(self, mode: str = "thread", max_workers: int = 2, max_queue: int = 32,
+                 torch_threads: int = 1):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown audio executor mode '{mode}', expected one of {self.MODES}")
+        self.mode = mode
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.torch_threads = torch_threads
+        self.executor = None
+        self._semaphore = asyncio.Semaphore(max_workers)
+        self.active = 0
+        self.queued = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def start(self):
+        if self.mode == "process":
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_audio_process_worker,
+                initargs=(Config.VAD_BACKEND, Config.VAD_ONNX_MODEL_PATH, Config.VAD_NUM_THREADS,
+                          ENABLE_AUGMENTATION, self.torch_threads)
+            )
+        else:
+            torch.set_num_threads(self.torch_threads)
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                               thread_name_prefix="audio-preprocess")
+        print(f"✅ Audio executor started ({self.mode}, {self.max_workers} workers)")
+
+    async def run(self, fn, *args):
+        if self._semaphore.locked() and self.queued >= self.max_queue:
+            self.rejected += 1
+            raise AudioExecutorBusy(f"Audio executor queue full ({self.queued} waiting)")
+
+        self.queued += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+
+        self.active += 1
+        try:
+            if self.mode == "process":
+                # memoryviews cannot be pickled across the process boundary
+                args = tuple(bytes(a) if isinstance(a, memoryview) else a for a in args)
+            result = await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+            self.completed += 1
+            return result
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "workers": self.max_workers,
+            "active": self.active,
+            "queued": self.queued,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected
+        }
+
+    def shutdown(self):
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
 class AudioTranscriber:
     """Handles audio transcription with VAD and augmentation"""
     
     @staticmethod
-    async def transcribe(audio_base64: str, client_id: str):
-        """Transcribe base64 encoded audio with VAD preprocessing"""
+    async def transcribe(audio, client_id: str, codec: str = "pcm16", vad_done: bool = False,
+                         trace: Optional[TurnTrace] = None, augment: bool = False):
+        """
+        Transcribe audio with VAD preprocessing.
+
+        ``audio`` is either the base64 string from a JSON ``audio_data`` message
+        or a bytes-like payload (usually a memoryview) from a binary frame.
+        ``vad_done`` skips VAD for audio already endpointed by StreamingAudioSession.
+        ``augment`` runs the augmentation pipeline on it (off unless requested).
+        Stage timings are recorded on ``trace`` when one is given.
+        """
         try:
             print(f"[{client_id}] 🎵 Starting transcription...")
             
-            if not audio_base64 or len(audio_base64) < 100:
-                print(f"[{client_id}] ❌ Audio data too short or empty")
-                return None
-            if len(audio_base64) > MAX_AUDIO_SIZE * 1.33:  # base64 overhead
-                print(f"[{client_id}] ❌ Audio exceeds max size")
-                return None
-            audio_bytes = base64.b64decode(audio_base64)
+            if isinstance(audio, str):
+                if not audio or len(audio) < 100:
+                    print(f"[{client_id}] ❌ Audio data too short or empty")
+                    return None
+                if len(audio) > MAX_AUDIO_SIZE * 1.33:  # base64 overhead
+                    print(f"[{client_id}] ❌ Audio exceeds max size")
+                    return None
+                decode_start = time.perf_counter()
+                audio_bytes = base64.b64decode(audio)
+                if trace:
+                    trace.add_span("decode", time.perf_counter() - decode_start, decode_start)
+            else:
+                audio_bytes = audio
+                # Binary frames were size-checked by parse_frame: the payload is
+                # whatever follows the FRAME_HEADER, so only its contents need checking
+                if not audio_bytes:
+                    print(f"[{client_id}] ❌ Audio data empty")
+                    return None
+                if codec == "pcm16" and len(audio_bytes) % PCM16.itemsize:
+                    print(f"[{client_id}] ❌ PCM payload of {len(audio_bytes)} bytes is not whole 16-bit samples")
+                    return None
+                if len(audio_bytes) > MAX_AUDIO_SIZE:
+                    print(f"[{client_id}] ❌ Audio exceeds max size")
+                    return None
+
+            if codec == "opus":
+                # Compressed audio goes straight to the transcription model
+                return await AudioTranscriber._transcribe_container(audio_bytes, client_id, trace)
             
             # Convert PCM to WAV for better Whisper compatibility
             try:
-                # Assume it's PCM data from VAD
-                audio_array = np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32) / 32768.0
-                audio_tensor = torch.from_numpy(audio_array)
-                
-                if ENABLE_VAD and vad_model and vad_model.model is not None:
-                    print(f"[{client_id}] 🎤 Applying VAD...")
-                    speech_audio = vad_model.extract_speech_segments(audio_tensor)
-                    
-                    if len(speech_audio) == 0:
-                        print(f"[{client_id}] ⚠️ No speech detected in audio")
-                        return None
-                    
-                    audio_tensor = speech_audio
-                
-                if ENABLE_AUGMENTATION and audio_augmentation and audio_augmentation.augmentation is not None:
-                    print(f"[{client_id}] 🎨 Applying audio augmentation...")
-                    audio_tensor = audio_augmentation.augment(audio_tensor)
+                preprocess_start = time.perf_counter()
+                if audio_executor:
+                    wav_bytes, fingerprint, timings = await audio_executor.run(
+                        preprocess_pcm_audio, audio_bytes, client_id, vad_done, augment
+                    )
+                else:
+                    wav_bytes, fingerprint, timings = preprocess_pcm_audio(audio_bytes, client_id, vad_done, augment)
                 
-                # Convert to WAV
-                audio_np = (audio_tensor.numpy() * 32768.0).astype(np.int16)
-                processed_bytes = audio_np.tobytes()
+                if trace:
+                    for stage, duration in timings.items():
+                        trace.add_span(stage, duration)
+                    # Whatever the stages don't account for was spent waiting for a worker
+                    waited = time.perf_counter() - preprocess_start - sum(timings.values())
+                    trace.add_span("preprocess_queue", max(0.0, waited), preprocess_start)
                 
-                wav_io = io.BytesIO()
-                with wave.open(wav_io, 'wb') as wav_file:
-                    wav_file.setnchannels(1)
-                    wav_file.setsampwidth(2)
-                    wav_file.setframerate(16000)
-                    wav_file.writeframes(processed_bytes)
+                if wav_bytes is None:
+                    print(f"[{client_id}] ⚠️ No speech detected in audio")
+                    return None
                 
-                wav_io.seek(0)
+                cache_key = AudioTranscriber._cache_key(client_id, fingerprint)
+                cached = stt_cache.get(cache_key) if cache_key else None
+                if cached is not None:
+                    print(f"[{client_id}] ♻️ Same audio as a recent upload, reusing its transcript")
+                    return cached
                 
                 print(f"[{client_id}] 🤖 Sending to Whisper...")
-                transcript = client.audio.transcriptions.create(
-                    model="gpt-4o-transcribe",
-                    file=("audio.wav", wav_io.read(), "audio/wav"),
-                    language="en",
-                    timeout=30
-                )
+                with trace.span("stt") if trace else nullcontext():
+                    transcript = await client.audio.transcriptions.create(
+                        model=STT_MODEL,
+                        file=("audio.wav", wav_bytes, "audio/wav"),
+                        language=STT_LANGUAGE,
+                        timeout=30
+                    )
                 
                 result = transcript.text.strip()
                 
                 if result:
                     print(f"[{client_id}] ✅ Transcription successful: '{result}'")
+                    if cache_key:
+                        stt_cache.put(cache_key, result)
                 else:
                     print(f"[{client_id}] ⚠️ Transcription returned empty result")
                     
                 return result
                 
+            except AudioExecutorBusy as busy_error:
+                print(f"[{client_id}] ❌ {busy_error}")
+                return None
             except Exception as conversion_error:
                 print(f"[{client_id}] ⚠️ PCM conversion failed: {conversion_error}")
                 # Fallback: try direct WebM processing
-                try:
-                    audio_io = io.BytesIO(audio_bytes)
-                    transcript = client.audio.transcriptions.create(
-                        model="gpt-4o-transcribe",
-                        file=("audio.webm", audio_io.read(), "audio/webm"),
-                        language="en",
-                        timeout=30
-                    )
-                    result = transcript.text.strip()
-                    if result:
-                        print(f"[{client_id}] ✅ WebM transcription successful: '{result}'")
-                    return result
-                except Exception as webm_error:
-                    print(f"[{client_id}] ❌ WebM processing failed: {webm_error}")
-                    return None
+                return await AudioTranscriber._transcribe_container(audio_bytes, client_id, trace)
 
         except Exception as e:
             print(f"[{client_id}] ❌ Transcription error: {e}")
             return None
 
-from pybreaker import CircuitBreaker, CircuitBreakerListener
+    @staticmethod
+    def _cache_key(client_id: str, fingerprint: Optional[bytes]) -> Optional[bytes]:
+        if stt_cache is None or fingerprint is None:
+            return None
+        return make_stt_cache_key(client_id, STT_MODEL, STT_LANGUAGE, fingerprint)
+
+    @staticmethod
+    async def _transcribe_container(audio_bytes, client_id: str, trace: Optional[TurnTrace] = None):
+        """Send containerized audio (WebM/Ogg Opus) to the transcription model as-is"""
+        try:
+            cache_key = AudioTranscriber._cache_key(client_id, audio_fingerprint(audio_bytes))
+            cached = stt_cache.get(cache_key) if cache_key else None
+            if cached is not None:
+                print(f"[{client_id}] ♻️ Same audio as a recent upload, reusing its transcript")
+                return cached
+            with trace.span("stt") if trace else nullcontext():
+                transcript = await client.audio.transcriptions.create(
+                    model=STT_MODEL,
+                    file=("audio.webm", bytes(audio_bytes), "audio/webm"),
+                    language=STT_LANGUAGE,
+                    timeout=30
+                )
+            result = transcript.text.strip()
+            if result:
+                print(f"[{client_id}] ✅ WebM transcription successful: '{result}'")
+                if cache_key:
+                    stt_cache.put(cache_key, result)
+            return result
+        except Exception as webm_error:
+            print(f"[{client_id}] ❌ WebM processing failed: {webm_error}")
+            return None
+
+# Shared by every session, so latency and error statistics are process-wide
+tts_router = TTSRouter(
+    Config.TTS_PROVIDERS,
+    last_resort=Config.TTS_LAST_RESORT_PROVIDERS,
+    hedge_after=Config.TTS_HEDGE_AFTER_MS / 1000,
+    window=Config.TTS_ROUTER_WINDOW,
+    fail_max=Config.TTS_PROVIDER_FAIL_MAX,
+    max_error_rate=Config.TTS_PROVIDER_MAX_ERROR_RATE,
+    cooldown=Config.TTS_PROVIDER_COOLDOWN_SECONDS
+)
+
+# TTS output formats a connection can negotiate with ?tts_format=, with the
+# frame codec and the matching format name at each provider
+TTS_OUTPUT_FORMATS = {
+    "opus": {"codec": CODEC_OPUS, "elevenlabs": "opus_48000_64", "openai": "opus", "mime": "audio/ogg"},
+    "mp3": {"codec": CODEC_MP3, "elevenlabs": "mp3_44100_128", "openai": "mp3", "mime": "audio/mpeg"},
+    "pcm": {"codec": CODEC_PCM16_24K, "elevenlabs": "pcm_24000", "openai": "pcm", "mime": "audio/pcm"},
+}
 
 
-elevenlabs_breaker = CircuitBreaker(
-        fail_max=5,
-        reset_timeout=60,
-        listeners=[CircuitBreakerListener()]
-    )
 class StreamingTTSService:
-    """Sequential streaming TTS with ElevenLabs"""
+    """
+    Pipelined streaming TTS over the providers chosen by tts_router.
+
+    Each flushed sentence starts synthesis right away (at most
+    ``max_in_flight`` provider requests at a time), while a single delivery
+    loop sends the results strictly in task_id order. Audio is read from the
+    provider as it streams in: with ``binary_audio`` every sub-chunk is
+    forwarded as a KIND_TTS_AUDIO frame immediately, otherwise each sentence
+    goes out as one base64 ``tts_audio_chunk`` message. ``output_format`` is
+    a key of TTS_OUTPUT_FORMATS and is requested from every provider.
+    """
     
-    def __init__(self, client_id: str, personality_type: str = "entj_commander"):
+    def __init__(self, client_id: str, personality_type: str = "entj_commander",
+                 max_in_flight: int = Config.TTS_MAX_IN_FLIGHT, binary_audio: bool = False,
+                 http_client: Optional[httpx.AsyncClient] = None,
+                 output_format: str = Config.TTS_OUTPUT_FORMAT):
         self.client_id = client_id
         self.personality_type = personality_type
         self.websocket = None
-        self.buffer = ""
-        self.task_queue = []
+        self.binary_audio = binary_audio
+        self.output_format = output_format
+        self.output = TTS_OUTPUT_FORMATS[output_format]
+        self.frame_sequence = 0  # Sequence number of outgoing binary audio frames
+        self.segmenter = SentenceSegmenter(self._segmentation_policy(personality_type))
+        self.task_queue = asyncio.Queue()  # (task_id, generation, synthesis task, chunk queue) in delivery order
         self.task_counter = 0
-        self.is_processing = False
-        self.http_client = httpx.AsyncClient(
-            timeout=30.0,
-            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
-        )
-
-        self.processing_lock = asyncio.Lock()
+        self.delivering = None  # Queue item the delivery worker is currently sending
+        self.delivery_worker = None
+        # Borrow the process-wide pool; only build a private one when running without lifespan
+        self.http_client = http_client or tts_http_client
+        self._owns_http_client = self.http_client is None
+        if self._owns_http_client:
+            self.http_client = create_tts_http_client()
+
+        self.synthesis_slots = asyncio.Semaphore(max(1, max_in_flight))
+        self.generation = 0  # Bumped by cancel_all; results from older generations are dropped
         self.should_stop = False
+        self.trace = None  # TurnTrace of the turn currently being spoken
         print(f"[{client_id}] 🎵 TTS Service created for {personality_type}")
 
     async def cancel_all(self):
         """Completely cancel all TTS tasks and clear state"""
-        async with self.processing_lock:
-            self.should_stop = True
-            self.task_queue.clear()
-            self.buffer = ""
-            self.task_counter = 0
-            self.is_processing = False
-            print(f"[{self.client_id}] 🚫 All TTS tasks cancelled and state cleared")
+        self.should_stop = True
+        self.generation += 1
+        if self.delivering:
+            _, _, synthesis, chunks = self.delivering
+            synthesis.cancel()
+            chunks.put_nowait(None)  # Wake the delivery worker even if the task never ran
+        while not self.task_queue.empty():
+            _, _, synthesis, _ = self.task_queue.get_nowait()
+            synthesis.cancel()
+            self.task_queue.task_done()
+        self.segmenter.reset()
+        self.task_counter = 0
+        print(f"[{self.client_id}] 🚫 All TTS tasks cancelled and state cleared")
 
     async def stop_current_playback(self):
         """Stop current playback and prepare for new TTS"""
@@ -761,6 +929,12 @@ class StreamingTTSService:
 
     def set_personality(self, personality_type: str):
         self.personality_type = personality_type
+        self.segmenter.policy = self._segmentation_policy(personality_type)
+
+    @staticmethod
+    def _segmentation_policy(personality_type: str) -> SegmentationPolicy:
+        profile = PERSONALITY_PROFILES.get(personality_type, PERSONALITY_PROFILES["entj_commander"])
+        return profile.get("segmentation") or SegmentationPolicy()
 
     async def safe_send(self, message: dict):
         if not self.websocket:
@@ -772,170 +946,273 @@ class StreamingTTSService:
             print(f"[{self.client_id}] ⚠️ Send failed: {e}")
             return False
 
-    def should_flush(self, text: str) -> tuple[bool, str, str]:
-        if not text or len(text.strip()) < 20:
-            return False, "", text
-        
-        # Check for sentence endings (more efficient)
-        for i, char in enumerate(text):
-            if char in '.?!' and i + 1 < len(text) and text[i + 1] == ' ':
-                chunk = text[:i + 1].strip()
-                remaining = text[i + 2:].strip()
-                return True, chunk, remaining
-        
-        if len(text) > 300:
-            idx = text.rfind(' ')
-            return True, text[:idx].strip(), text[idx:].strip()
-        
-        return False, "", text
+    async def safe_send_frame(self, codec: int, payload: bytes, flags: int = 0):
+        if not self.websocket:
+            return False
+        try:
+            frame = build_frame(KIND_TTS_AUDIO, payload, codec, self.frame_sequence, flags)
+            self.frame_sequence = (self.frame_sequence + 1) & 0xFFFFFFFF
+            await self.websocket.send_bytes(frame)
+            return True
+        except Exception as e:
+            print(f"[{self.client_id}] ⚠️ Send failed: {e}")
+            return False
 
     async def add_token(self, token: str):
         if not ENABLE_SERVER_TTS:
             return
         
-        self.buffer += token
-        should_send, chunk, remaining = self.should_flush(self.buffer)
-        
-        if should_send and chunk:
-            self.buffer = remaining
-            
-            if chunk and len(chunk.strip()) > 5:
-                self.task_counter += 1
-                task_id = self.task_counter
-                self.task_queue.append((task_id, chunk))
-                
-                if not self.is_processing:
-                    asyncio.create_task(self._process_queue())
+        for chunk in self.segmenter.push(token):
+            if len(chunk) > 5:
+                self._enqueue(chunk)
 
     async def flush_remaining(self):
-        if self.buffer.strip():
-            chunk = self.buffer.strip()
-            self.buffer = ""
-            
-            if chunk and len(chunk) > 5:
-                self.task_counter += 1
-                task_id = self.task_counter
-                self.task_queue.append((task_id, chunk))
+        chunk = self.segmenter.flush()
+        if len(chunk) > 5:
+            self._enqueue(chunk)
         
-        while self.task_queue or self.is_processing:
-            await asyncio.sleep(0.1)
+        # Resolves as soon as the last queued chunk has been delivered (or cancelled)
+        await self.task_queue.join()
         
         print(f"[{self.client_id}] ✅ All TTS complete ({self.task_counter} total)")
 
-    async def _process_queue(self):
-        async with self.processing_lock:
-            if self.is_processing or self.should_stop:
-                return
-            self.is_processing = True
-
+    def _enqueue(self, text: str):
+        """Start synthesizing a chunk now; delivery happens in order in _delivery_loop"""
+        self.task_counter += 1
+        task_id = self.task_counter
+        chunks = asyncio.Queue()
+        synthesis = asyncio.create_task(self._synthesize(text, task_id, chunks, self.trace))
+        self.task_queue.put_nowait((task_id, self.generation, synthesis, chunks))
+        
+        if self.delivery_worker is None or self.delivery_worker.done():
+            self.delivery_worker = asyncio.create_task(self._delivery_loop())
+
+    async def _synthesize(self, text: str, task_id: int, chunks: asyncio.Queue,
+                          trace: Optional[TurnTrace] = None):
+        """
+        Stream audio for one chunk into ``chunks`` as (codec, bytes) items,
+        bounded by the in-flight limit. A final None marks the end. Timings
+        go to ``trace``, the turn the chunk was queued for.
+        """
         try:
-            while True:
-                async with self.processing_lock:
-                    if not self.task_queue or self.should_stop:
-                        self.is_processing = False
-                        return
-                    task_id, text = self.task_queue.pop(0)
-                
-                await self._generate_and_send(text, task_id)
+            async with self.synthesis_slots:
+                if self.should_stop:
+                    return
+                print(f"[{self.client_id}] 🎵 Generating TTS for task {task_id}")
+                started = time.perf_counter()
+                first_byte = True
+                with trace.span("tts_request") if trace else nullcontext():
+                    async for _, codec, chunk in self._stream_audio(text):
+                        if first_byte and trace:
+                            trace.add_span("tts_first_byte", time.perf_counter() - started, started)
+                        first_byte = False
+                        chunks.put_nowait((codec, chunk))
         except Exception as e:
-            async with self.processing_lock:
-                self.is_processing = False
-            raise
-    async def _generate_and_send(self, text: str, task_id: int):
-        """Generate TTS with interruption check"""
-        # Check if we should stop before starting this task
-        if self.should_stop:
-            print(f"[{self.client_id}] ⏹️ Task {task_id} skipped due to interruption")
-            return
+            print(f"[{self.client_id}] ❌ Task {task_id} error: {e}")
+        finally:
+            chunks.put_nowait(None)
 
-        try:
-            print(f"[{self.client_id}] 🎵 Generating TTS for task {task_id}")
-            audio_data = await self._generate_elevenlabs(text)
-            
-            # Check again if we should stop after generation
-            if self.should_stop:
-                print(f"[{self.client_id}] ⏹️ Task {task_id} cancelled after generation")
+    async def _delivery_loop(self):
+        """Deliver queued tasks one at a time, for the lifetime of the service"""
+        while True:
+            item = await self.task_queue.get()
+            self.delivering = item
+            task_id, generation, _, chunks = item
+            try:
+                if not self._interrupted(generation):
+                    await self._deliver(task_id, generation, chunks)
+            except Exception as e:
+                print(f"[{self.client_id}] ❌ Task {task_id} delivery error: {e}")
+            finally:
+                self.delivering = None
+                self.task_queue.task_done()
+
+    def _interrupted(self, generation: int) -> bool:
+        return self.should_stop or generation != self.generation
+
+    async def _deliver(self, task_id: int, generation: int, chunks: asyncio.Queue):
+        """Send one task's audio as it streams in, unless it gets interrupted"""
+        trace = self.trace
+        audio = bytearray()
+        codec = None
+        sent = False
+
+        while (item := await chunks.get()) is not None:
+            if self._interrupted(generation):
+                print(f"[{self.client_id}] ⏹️ Task {task_id} cancelled during generation")
                 return
-                
-            if audio_data:
-                success = await self.safe_send({
-                    "type": "tts_audio_chunk",
-                    "audio_data": base64.b64encode(audio_data).decode("utf-8"),
-                    "format": "mp3"
-                })
-                if success:
-                    print(f"[{self.client_id}] ✅ Task {task_id} sent")
-                else:
-                    print(f"[{self.client_id}] ⚠️ Task {task_id} send failed")
+            codec, chunk = item
+            if self.binary_audio:
+                if await self.safe_send_frame(codec, chunk):
+                    if trace and not sent:
+                        trace.mark("first_tts_audio")
+                    sent = True
             else:
-                print(f"[{self.client_id}] ⚠️ Task {task_id} generation failed")
+                audio += chunk
 
-        except Exception as e:
-            print(f"[{self.client_id}] ❌ Task {task_id} error: {e}")
+        if self._interrupted(generation):
+            print(f"[{self.client_id}] ⏹️ Task {task_id} cancelled after generation")
+            return
+        if codec is None:
+            print(f"[{self.client_id}] ⚠️ Task {task_id} generation failed")
+            return
 
-    
-    @elevenlabs_breaker
-    async def _generate_elevenlabs(self, text: str):
-        try:
-            if not ELEVENLABS_API_KEY:
-                return await self._generate_openai(text)
-            
+        if self.binary_audio:
+            sent = await self.safe_send_frame(codec, b"", FLAG_END_OF_SEGMENT) and sent
+        else:
+            with trace.span("tts_send") if trace else nullcontext():
+                sent = await self.send_audio(codec, audio)
+            if sent and trace:
+                trace.mark("first_tts_audio")
 
-            voice_settings = VOICE_ASSIGNMENTS.get(self.personality_type, VOICE_ASSIGNMENTS["entj_commander"])
+        if sent:
+            print(f"[{self.client_id}] ✅ Task {task_id} sent")
+        else:
+            print(f"[{self.client_id}] ⚠️ Task {task_id} send failed")
+
+    def _elevenlabs_voice(self) -> tuple:
+        """(voice_id, model_id, voice_settings) for the current personality"""
+        voice_settings = VOICE_ASSIGNMENTS.get(self.personality_type, VOICE_ASSIGNMENTS["entj_commander"])
+        return voice_settings["voice_id"], voice_settings["model"], {
+            "stability": voice_settings["stability"],
+            "similarity_boost": voice_settings["similarity_boost"],
+            "use_speaker_boost": voice_settings.get("use_speaker_boost", True)
+        }
 
-            url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_settings['voice_id']}/stream"
+    def _openai_voice(self) -> str:
+        voice_settings = VOICE_ASSIGNMENTS.get(self.personality_type, VOICE_ASSIGNMENTS["entj_commander"])
+        return voice_settings["openai_voice"]
+
+    def _local_voice(self) -> str:
+        voice_settings = VOICE_ASSIGNMENTS.get(self.personality_type, VOICE_ASSIGNMENTS["entj_commander"])
+        return voice_settings["local_voice"]
+
+    def _provider_codec(self, provider: str) -> int:
+        if provider == "local" and self.output_format != "pcm":
+            return CODEC_WAV  # No local MP3/Opus encoder; WAV decodes everywhere
+        return self.output["codec"]
+
+    def _cache_key(self, provider: str, text: str) -> bytes:
+        if provider == "elevenlabs":
+            voice_id, model_id, settings = self._elevenlabs_voice()
+            return make_tts_cache_key("elevenlabs", voice_id, model_id, settings,
+                                      self.output["elevenlabs"], text)
+        if provider == "local":
+            return make_tts_cache_key("local", self._local_voice(), "piper", {},
+                                      CODEC_NAMES[self._provider_codec(provider)], text)
+        return make_tts_cache_key("openai", self._openai_voice(), "tts-1", {}, self.output["openai"], text)
+
+    def _provider_streams(self, text: str) -> dict:
+        """Stream factories for the providers usable right now, by name"""
+        streams = {"openai": lambda: self._stream_openai(text)}
+        if ELEVENLABS_API_KEY:
+            streams["elevenlabs"] = lambda: self._stream_elevenlabs(text)
+        if local_tts and local_tts.has_voice(self._local_voice()):
+            streams["local"] = lambda: self._stream_local(text)
+        return streams
+
+    async def send_audio(self, codec: int, audio: bytes) -> bool:
+        """Send one complete piece of audio (e.g. a pre-synthesized opener)"""
+        if self.binary_audio:
+            return (await self.safe_send_frame(codec, audio)
+                    and await self.safe_send_frame(codec, b"", FLAG_END_OF_SEGMENT))
+        return await self.safe_send({
+            "type": "tts_audio_chunk",
+            "audio_data": base64.b64encode(audio).decode("utf-8"),
+            "format": CODEC_NAMES[codec]
+        })
+
+    async def synthesize(self, text: str) -> tuple:
+        """
+        Synthesize a whole utterance (TTS cache included); returns
+        (provider, codec, bytes), provider being the one that served it
+        """
+        audio = bytearray()
+        provider = codec = None
+        async for provider, codec, chunk in self._stream_audio(text):
+            audio += chunk
+        return provider, codec, bytes(audio)
+
+    async def _stream_audio(self, text: str):
+        """
+        Yield (provider, codec, bytes) for ``text``: from the TTS cache when
+        the provider tts_router ranks first has it, otherwise streamed from the
+        router. Complete results are cached under the provider that served
+        them, so audio from a fallback is reused while that fallback leads.
+        """
+        streams = self._provider_streams(text)
+        ranked = tts_router.rank(list(streams))
+        preferred = ranked[0] if ranked else None
+        cached = tts_cache.get(self._cache_key(preferred, text)) if tts_cache and preferred else None
+        if cached:
+            print(f"[{self.client_id}] 💾 TTS cache hit ({preferred}, {len(cached.data)} bytes)")
+            yield preferred, cached.codec, cached.data
+            return
 
-            headers = {
-                "xi-api-key": ELEVENLABS_API_KEY,
-                "Content-Type": "application/json",
-                "Accept": "audio/mpeg"
-            }
+        provider = None
+        audio = bytearray()
+        try:
+            async for provider, chunk in tts_router.stream(streams):
+                if tts_cache:
+                    audio += chunk
+                yield provider, self._provider_codec(provider), chunk
+        except Exception as e:
+            # Part of the sentence was already delivered; don't repeat it elsewhere
+            print(f"[{self.client_id}] ❌ TTS stream from {provider} broke off: {e}")
+            return
+        if provider and tts_cache:
+            tts_cache.put(self._cache_key(provider, text), self._provider_codec(provider), audio)
 
-            data = {
-                "text": text,
-                "model_id": voice_settings["model"],
-                "voice_settings": {
-                    "stability": voice_settings["stability"],
-                    "similarity_boost": voice_settings["similarity_boost"],
-                    "use_speaker_boost": voice_settings.get("use_speaker_boost", True)
-                }
-            }
+    async def _stream_elevenlabs(self, text: str):
+        """Yield audio bytes in the negotiated format from the ElevenLabs streaming endpoint"""
+        voice_id, model_id, settings = self._elevenlabs_voice()
 
-            response = await self.http_client.post(url, json=data, headers=headers)
+        url = f"{ELEVENLABS_BASE_URL}/v1/text-to-speech/{voice_id}/stream"
+        params = {"output_format": self.output["elevenlabs"]}
 
-            if response.status_code == 200:
-                audio_content = response.content
-                return audio_content
-            else:
-                return await self._generate_openai(text)
-            
-        except Exception as e:
-            print(f"[{self.client_id}] ❌ ElevenLabs error: {e}")
-            return await self._generate_openai(text)
+        headers = {
+            "xi-api-key": ELEVENLABS_API_KEY,
+            "Content-Type": "application/json",
+            "Accept": self.output["mime"]
+        }
 
-    async def _generate_openai(self, text: str):
-        try:
-            voice_mapping = {
-                "entj_commander": "nova",
-                "istj_operator": "onyx", 
-                "enfp_visionary": "nova",
-                "esfj_caregiver": "onyx"
-            }
-            voice = voice_mapping.get(self.personality_type, "nova")
-            
-            response = client.audio.speech.create(
-                model="tts-1",
-                voice=voice,
-                input=text,
-                response_format="wav"
-            )
-            audio_data = b""
-            for chunk in response.iter_bytes(chunk_size=1024):
-                audio_data += chunk
-            return audio_data
-        except Exception as e:
-            print(f"[{self.client_id}] ❌ OpenAI error: {e}")
-            return None
+        data = {
+            "text": text,
+            "model_id": model_id,
+            "voice_settings": settings
+        }
+
+        async with self.http_client.stream("POST", url, params=params, json=data, headers=headers) as response:
+            if response.status_code != 200:
+                await response.aread()
+                raise RuntimeError(f"HTTP {response.status_code}: {response.text[:200]}")
+            async for chunk in response.aiter_bytes():
+                if chunk:
+                    yield chunk
+
+    async def _stream_openai(self, text: str):
+        """Yield audio bytes in the negotiated format from OpenAI speech as they arrive"""
+        async with client.audio.speech.with_streaming_response.create(
+            model="tts-1",
+            voice=self._openai_voice(),
+            input=text,
+            response_format=self.output["openai"]
+        ) as response:
+            async for chunk in response.iter_bytes():
+                if chunk:
+                    yield chunk
+
+    async def _stream_local(self, text: str):
+        """Yield the whole sentence from the local Piper engine (24 kHz PCM or WAV)"""
+        voice = self._local_voice()
+        samples = await local_tts.synthesize(voice, text)
+        if samples.size == 0:
+            return
+        sample_rate = local_tts.sample_rate(voice)
+        if self.output_format == "pcm":
+            yield resample_pcm16(samples, sample_rate, 24000).tobytes()
+        else:
+            yield encode_wav([samples], sample_rate)
 
     # async def cancel_all(self):
     #     self.task_queue.clear()
@@ -944,7 +1221,67 @@ class StreamingTTSService:
     #     self.is_processing = False
 
     async def close(self):
-        await self.http_client.aclose()
+        if self.delivering or not self.task_queue.empty():
+            await self.cancel_all()
+        if self.delivery_worker:
+            self.delivery_worker.cancel()
+        if self._owns_http_client:
+            await self.http_client.aclose()
+
+
+def build_system_prompt(personality_type: str, scenario: str, custom_scenario: str = "") -> str:
+    """System prompt for a personality in a scenario"""
+    profile = PERSONALITY_PROFILES.get(personality_type, PERSONALITY_PROFILES["entj_commander"])
+    scenario_data = SCENARIOS.get(scenario, SCENARIOS["role_shift"])
+    
+    if scenario == "custom" and custom_scenario:
+        scenario_context = custom_scenario
+    else:
+        scenario_context = scenario_data["context"]
+    
+    return profile["prompt_template"].format(
+        name=profile["name"],
+        title=profile["title"],
+        scenario_context=scenario_context
+    )
+
+
+SUMMARY_INSTRUCTION = (
+    "You maintain the running summary of a workplace coaching call between a manager "
+    "(the assistant) and an employee (the user). Update the summary with the new "
+    "exchanges: keep names, facts, commitments, open questions and the emotional tone. "
+    "Write at most 150 words of plain prose."
+)
+
+
+async def summarize_conversation(previous_summary: str, messages: list) -> str:
+    """Fold ``messages`` into ``previous_summary`` (ConversationContext summarizer)"""
+    transcript = "\n".join(
+        f"{'Manager' if message['role'] == 'assistant' else 'Employee'}: {message['content']}"
+        for message in messages
+    )
+    response = await client.chat.completions.create(
+        model=MODEL,
+        messages=[
+            {"role": "system", "content": SUMMARY_INSTRUCTION},
+            {"role": "user", "content": f"Summary so far:\n{previous_summary or '(none)'}\n\n"
+                                        f"New exchanges:\n{transcript}"}
+        ],
+        temperature=0.2,
+        max_tokens=Config.CONTEXT_SUMMARY_MAX_TOKENS,
+        timeout=30
+    )
+    return response.choices[0].message.content or ""
+
+
+async def _content_tokens(stream_response):
+    """Text tokens of a streamed chat completion; closing this closes the upstream stream"""
+    try:
+        async for chunk in stream_response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    finally:
+        await stream_response.close()
 
 
 class ConversationManager:
@@ -956,88 +1293,115 @@ class ConversationManager:
         
         profile = PERSONALITY_PROFILES.get(personality_type, PERSONALITY_PROFILES["entj_commander"])
         scenario_data = SCENARIOS.get(scenario, SCENARIOS["role_shift"])
-        
-        if scenario == "custom" and custom_scenario:
-            scenario_context = custom_scenario
-        else:
-            scenario_context = scenario_data["context"]
-        
-        system_prompt = profile["prompt_template"].format(
-            name=profile["name"],
-            title=profile["title"],
-            scenario_context=scenario_context
-        )
+        system_prompt = build_system_prompt(personality_type, scenario, custom_scenario)
 
-        self.messages = [
-            {
-                "role": "system",
-                "content": system_prompt
-            }
-        ]
+        self.context = self._new_context(system_prompt)
         self.conversation_active = True
         self.tts_service = tts_service
         
         print(f"[{client_id}] 🎭 Initialized: {profile['name']} | Scenario: {scenario_data['name']}")
+
+    async def _create_stream(self, messages: list):
+        return await client.chat.completions.create(
+            model=MODEL,
+            messages=messages,
+            stream=True,
+            temperature=0.85,
+            max_tokens=250,
+            presence_penalty=0.1,
+            timeout=30  # Add timeout
+        )
+
+    @staticmethod
+    def _new_context(system_prompt: str) -> ConversationContext:
+        return ConversationContext(
+            system_prompt,
+            token_budget=Config.CONTEXT_TOKEN_BUDGET,
+            keep_turns=Config.CONTEXT_KEEP_TURNS
+        )
+
+    def context_marker(self) -> tuple:
+        """Identifies the conversation state; changes when a message is added or the conversation is reset"""
+        return self.context, self.context.version
+
+    async def speculate(self, transcript: str):
+        """Start the reply to an interim transcript without touching the history; returns its tokens"""
+        return _content_tokens(await self._create_stream(self.context.messages(transcript)))
+
     from tenacity import retry, stop_after_attempt, wait_exponential
     @retry(
     stop=stop_after_attempt(3),
     wait=wait_exponential(multiplier=1, min=2, max=10)
     )
-    async def get_streaming_response(self, user_input: str, websocket):
-        self.messages.append({"role": "user", "content": user_input})
+    async def get_streaming_response(self, user_input: str, websocket, trace: Optional[TurnTrace] = None,
+                                     speculation: Optional[SpeculativeReply] = None):
+        """
+        Stream the reply to ``user_input`` to the client and TTS. A committed
+        ``speculation`` (already started from a matching interim transcript)
+        supplies the tokens instead of a new LLM request.
+        """
+        self.context.append("user", user_input)
+        self.tts_service.trace = trace
         
         try:
             print(f"[{self.client_id}] 🤖 Processing LLM request...")
+            llm_start = time.perf_counter()
             
-            # Use direct processing for now (simpler)
-            try:
-                stream_response = client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=self.messages,
-                    stream=True,
-                    temperature=0.85,
-                    max_tokens=250,
-                    presence_penalty=0.1,
-                    timeout=30  # Add timeout
-                )
-            except TimeoutError:
-                await websocket.send_text(json.dumps({
-                    "type": "error",
-                    "message": "Response timeout - please try again"
-                }))
-                return True
-
-
-            full_reply = ""
-            await websocket.send_text(json.dumps({"type": "llm_response_start"}))
-
-            for chunk in stream_response:
-                if chunk.choices[0].delta.content:
-                    token = chunk.choices[0].delta.content
-                    full_reply += token
-
-                    # Send token for display
+            if speculation is not None:
+                print(f"[{self.client_id}] ⚡ Using the speculative reply ({len(speculation.tokens)} tokens ready)")
+                tokens = speculation.commit()
+            else:
+                try:
+                    tokens = _content_tokens(await self._create_stream(self.context.messages()))
+                except (TimeoutError, APITimeoutError):
                     await websocket.send_text(json.dumps({
-                        "type": "llm_response_token",
-                        "token": token
+                        "type": "error",
+                        "message": "Response timeout - please try again"
                     }))
+                    return True
 
-                    # Send to TTS
-                    if ENABLE_SERVER_TTS:
-                        await self.tts_service.add_token(token)
 
-                    await asyncio.sleep(0.01)
+            full_reply = ""
+            try:
+                await websocket.send_text(json.dumps({"type": "llm_response_start"}))
+                async for token in tokens:
+                    if token:
+                        full_reply += token
+                        if trace:
+                            trace.mark("first_llm_token")
+
+                        # Send token for display
+                        await websocket.send_text(json.dumps({
+                            "type": "llm_response_token",
+                            "token": token
+                        }))
 
-            # Flush remaining TTS
-            if ENABLE_SERVER_TTS:
-                await self.tts_service.flush_remaining()
+                        # Send to TTS
+                        if ENABLE_SERVER_TTS:
+                            await self.tts_service.add_token(token)
+
+                if trace:
+                    trace.add_span("llm_stream", time.perf_counter() - llm_start, llm_start)
+
+                # Flush remaining TTS
+                if ENABLE_SERVER_TTS:
+                    with trace.span("tts_flush") if trace else nullcontext():
+                        await self.tts_service.flush_remaining()
+            except asyncio.CancelledError:
+                # Barge-in: drop the upstream connection instead of reading the rest of the reply
+                await tokens.aclose()
+                if full_reply.strip():
+                    self.context.append("assistant", full_reply.strip())
+                print(f"[{self.client_id}] ✋ Reply interrupted after {len(full_reply)} chars")
+                raise
 
             conversation_ended = "[END_CONVERSATION]" in full_reply
             if conversation_ended:
                 full_reply = full_reply.replace("[END_CONVERSATION]", "").strip()
                 self.conversation_active = False
 
-            self.messages.append({"role": "assistant", "content": full_reply})
+            self.context.append("assistant", full_reply)
+            self.context.maybe_summarize(summarize_conversation)
 
             await websocket.send_text(json.dumps({
                 "type": "llm_response_end",
@@ -1064,34 +1428,124 @@ class ConversationManager:
         
         profile = PERSONALITY_PROFILES.get(self.personality_type, PERSONALITY_PROFILES["entj_commander"])
         scenario_data = SCENARIOS.get(self.scenario, SCENARIOS["role_shift"])
-        
-        if self.scenario == "custom" and custom_scenario:
-            scenario_context = custom_scenario
-        else:
-            scenario_context = scenario_data["context"]
-        
-        system_prompt = profile["prompt_template"].format(
-            name=profile["name"],
-            title=profile["title"],
-            scenario_context=scenario_context
-        )
-        self.messages = [
-            {
-                "role": "system",
-                "content": system_prompt
-            }
-        ]
+        system_prompt = build_system_prompt(self.personality_type, self.scenario, custom_scenario)
+        self.context.close()
+        self.context = self._new_context(system_prompt)
         self.conversation_active = True
         
         print(f"[{self.client_id}] 🔄 Reset: {profile['name']} | Scenario: {scenario_data['name']}")
 
 
+OPENER_INSTRUCTION = (
+    "The call is just starting and the employee has not said anything yet. "
+    "Open the conversation in character: greet them and raise the situation "
+    "in one or two short, natural sentences."
+)
+
+
+@functools.lru_cache(maxsize=None)
+def opener_fingerprint_for(personality_type: str, scenario: str, output_format: str) -> str:
+    """Fingerprint of the opener for a catalogue pair (the catalogues don't change at runtime)"""
+    return opener_fingerprint(
+        build_system_prompt(personality_type, scenario),
+        OPENER_INSTRUCTION,
+        VOICE_ASSIGNMENTS.get(personality_type),
+        output_format,
+        TTS_OUTPUT_FORMATS[output_format]
+    )
+
+
+def opener_pairs():
+    """
+    (personality, scenario, output format, fingerprint) for every catalogue
+    combination, in every output format; the default format comes first so
+    it is ready soonest.
+    """
+    formats = sorted(TTS_OUTPUT_FORMATS, key=lambda name: name != Config.TTS_OUTPUT_FORMAT)
+    for output_format in formats:
+        for personality_type in PERSONALITY_PROFILES:
+            for scenario in SCENARIOS:
+                yield (personality_type, scenario, output_format,
+                       opener_fingerprint_for(personality_type, scenario, output_format))
+
+
+async def generate_opener_text(personality_type: str, scenario: str) -> str:
+    response = await client.chat.completions.create(
+        model=MODEL,
+        messages=[
+            {"role": "system", "content": build_system_prompt(personality_type, scenario)},
+            {"role": "user", "content": OPENER_INSTRUCTION}
+        ],
+        temperature=0.7,
+        max_tokens=80,
+        timeout=30
+    )
+    return (response.choices[0].message.content or "").strip()
+
+
+async def synthesize_opener(personality_type: str, text: str, output_format: str) -> tuple:
+    """
+    Synthesize a whole opener through the normal TTS path (and TTS cache).
+    Openers are stored for good, so audio from a fallback provider is
+    dropped (no audio returned) and the opener is retried on a later warmup.
+    """
+    tts_service = StreamingTTSService("opener-warmup", personality_type, output_format=output_format)
+    try:
+        provider, codec, audio = await tts_service.synthesize(text)
+        preferred = tts_router.preferred(list(tts_service._provider_streams(text)))
+        if audio and provider != preferred:
+            print(f"⚠️ Opener for {personality_type} came from fallback TTS provider {provider} "
+                  f"instead of {preferred}; not storing it")
+            return codec, b""
+        return codec, audio
+    finally:
+        await tts_service.close()
+
+
+async def send_opener(websocket: WebSocket, client_id: str, client_data: dict) -> bool:
+    """
+    Speak the pre-synthesized opener for this session's personality,
+    scenario and TTS output format, if ready. Returns False otherwise, and
+    the conversation starts when the user speaks.
+    """
+    conversation_manager = client_data["conversation_manager"]
+    tts_service = client_data["tts_service"]
+    if not opener_store or conversation_manager.context.has_history:
+        return False
+
+    personality_type = conversation_manager.personality_type
+    scenario = conversation_manager.scenario
+    output_format = tts_service.output_format
+    opener = None
+    if personality_type in PERSONALITY_PROFILES and scenario in SCENARIOS:
+        opener = opener_store.get(personality_type, scenario, output_format,
+                                  opener_fingerprint_for(personality_type, scenario, output_format))
+    if opener is None:
+        print(f"[{client_id}] ℹ️ No opener ready for {personality_type}/{scenario} ({output_format})")
+        return False
+
+    await websocket.send_text(json.dumps({"type": "llm_response_start"}))
+    await websocket.send_text(json.dumps({"type": "llm_response_token", "token": opener.text}))
+    await websocket.send_text(json.dumps({"type": "llm_response_end", "conversation_active": True}))
+    await tts_service.send_audio(opener.codec, opener.audio)
+
+    conversation_manager.context.append("assistant", opener.text)
+    conversation_history[client_id]["messages"].append({
+        "role": "assistant",
+        "content": opener.text,
+        "timestamp": time.time()
+    })
+    print(f"[{client_id}] 👋 Opener sent ({len(opener.audio)} bytes of audio)")
+    return True
+
+
 class ConnectionManager:
     def __init__(self):
         self.active_connections = {}
 
     async def connect(self, websocket: WebSocket, client_id: str, personality_type: str = "entj_commander",
-                     scenario: str = "role_shift", custom_scenario: str = ""):
+                     scenario: str = "role_shift", custom_scenario: str = "",
+                     tts_transport: str = "json", tts_format: str = Config.TTS_OUTPUT_FORMAT):
         # If client already exists, disconnect the old connection first
         if client_id in self.active_connections:
             print(f"[{client_id}] ⚠️ Client already connected, cleaning up old connection...")
@@ -1100,14 +1554,21 @@ class ConnectionManager:
         # Note: websocket.accept() should be called before this method
         # This allows authentication to happen before connection is established
         
-        tts_service = StreamingTTSService(client_id, personality_type)
+        tts_service = StreamingTTSService(client_id, personality_type,
+                                          binary_audio=(tts_transport == "binary"),
+                                          output_format=tts_format)
         tts_service.set_websocket(websocket)
         
         self.active_connections[client_id] = {
             "websocket": websocket,
             "tts_service": tts_service,
             "conversation_manager": ConversationManager(tts_service, client_id, personality_type, scenario, custom_scenario),
-            "transcriber": AudioTranscriber()
+            "transcriber": AudioTranscriber(),
+            "audio_stream": StreamingAudioSession(
+                client_id, vad_model if ENABLE_VAD else None, RATE,
+                pause_ms=Config.SPECULATIVE_PAUSE_MS if Config.ENABLE_SPECULATIVE_LLM else None
+            ),
+            "turn_task": None
         }
         
         print(f"[{client_id}] ✅ Connected. Total: {len(self.active_connections)}")
@@ -1115,6 +1576,8 @@ class ConnectionManager:
     async def disconnect(self, client_id: str):
         if client_id in self.active_connections:
             connection_data = self.active_connections[client_id]
+
+            _stop_session_work(connection_data)
         
             # Cancel TTS operations
             tts_service = connection_data.get("tts_service")
@@ -1198,18 +1661,77 @@ RATE = 16000
 CHANNELS = 1
 MODEL = "gpt-4o-mini"
 ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
+ELEVENLABS_BASE_URL = os.getenv("ELEVENLABS_BASE_URL", "https://api.elevenlabs.io").rstrip("/")
+
+
+def create_tts_http_client() -> httpx.AsyncClient:
+    """
+    Connection pool for the TTS providers. HTTP/2 (when the h2 package is
+    installed) multiplexes every session's requests over a few connections.
+    """
+    http2 = Config.TTS_HTTP2 and importlib.util.find_spec("h2") is not None
+    if Config.TTS_HTTP2 and not http2:
+        print("⚠️ h2 not installed, TTS pool falling back to HTTP/1.1")
+    return httpx.AsyncClient(
+        http2=http2,
+        timeout=httpx.Timeout(30.0, connect=10.0),
+        limits=httpx.Limits(
+            max_connections=Config.TTS_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=Config.TTS_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=Config.TTS_HTTP_KEEPALIVE_EXPIRY
+        )
+    )
+
+
+async def warm_up_http_pool(http_client: httpx.AsyncClient, url: str, connections: int = 1):
+    """Open (TLS-handshake) pooled connections to ``url`` before the first session needs them"""
+    async def touch():
+        try:
+            await http_client.head(url, timeout=5.0)
+        except Exception as e:
+            print(f"⚠️ Warmup request to {url} failed: {e}")
+
+    await asyncio.gather(*(touch() for _ in range(max(1, connections))))
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global client, vad_model, audio_augmentation, rabbitmq_connection, rabbitmq_channel
+    global client, vad_model, audio_augmentation, audio_executor, tts_http_client, tts_cache, stt_cache, opener_store
+    global local_tts
+    global rabbitmq_connection, rabbitmq_channel
     global audio_worker, llm_worker , feedback_generator
     
     print("🚀 Starting server...")
     
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    # One async client for the whole process so every session shares its connection pool
+    openai_http_client = httpx.AsyncClient(
+        timeout=httpx.Timeout(60.0, connect=10.0),
+        limits=httpx.Limits(max_connections=200, max_keepalive_connections=50)
+    )
+    client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=openai_http_client)
     print("✅ OpenAI client initialized!")
     
+    # Shared TTS pool; sessions borrow it instead of opening their own connections
+    tts_http_client = create_tts_http_client()
+    warmups = [warm_up_http_pool(openai_http_client, str(client.base_url), Config.HTTP_WARMUP_CONNECTIONS)]
+    if ELEVENLABS_API_KEY:
+        warmups.append(warm_up_http_pool(tts_http_client, ELEVENLABS_BASE_URL, Config.HTTP_WARMUP_CONNECTIONS))
+    warmup_task = asyncio.gather(*warmups)  # Runs in the background; startup does not wait for it
+    print("✅ TTS connection pool initialized!")
+    
+    if Config.TTS_CACHE_MEMORY_MB > 0:
+        tts_cache = TTSCache(
+            memory_bytes=Config.TTS_CACHE_MEMORY_MB * 1024 * 1024,
+            disk_dir=Config.TTS_CACHE_DIR or None,
+            disk_bytes=Config.TTS_CACHE_DISK_MB * 1024 * 1024,
+            max_entry_bytes=Config.TTS_CACHE_MAX_ENTRY_KB * 1024
+        )
+        print(f"✅ TTS cache initialized: {tts_cache.stats()}")
+    
+    if Config.STT_CACHE_MAX_ENTRIES > 0 and Config.STT_CACHE_TTL_SECONDS > 0:
+        stt_cache = STTCache(max_entries=Config.STT_CACHE_MAX_ENTRIES, ttl=Config.STT_CACHE_TTL_SECONDS)
+        print(f"✅ STT cache initialized: {stt_cache.stats()}")
+    
     feedback_generator = FeedbackGenerator()
     print("✅ Feedback system initialized!")
     # Initialize RabbitMQ (optional)
@@ -1231,16 +1753,52 @@ async def lifespan(app: FastAPI):
         print("ℹ️ RabbitMQ disabled, running in direct mode")
     
     if ENABLE_VAD:
-        vad_model = SileroVAD()
+        vad_model = SileroVAD(
+            backend=Config.VAD_BACKEND,
+            onnx_model_path=Config.VAD_ONNX_MODEL_PATH,
+            num_threads=Config.VAD_NUM_THREADS
+        )
         vad_model.load_model()
     
     if ENABLE_AUGMENTATION:
         audio_augmentation = AudioAugmentation(sample_rate=RATE)
         audio_augmentation.create_pipeline()
+
+    audio_executor = AudioPreprocessingExecutor(
+        mode=Config.AUDIO_EXECUTOR,
+        max_workers=Config.AUDIO_EXECUTOR_WORKERS,
+        max_queue=Config.AUDIO_EXECUTOR_MAX_QUEUE,
+        torch_threads=Config.AUDIO_TORCH_THREADS
+    )
+    audio_executor.start()
+    
+    if "local" in Config.TTS_PROVIDERS:
+        local_tts = PiperTTS(Config.LOCAL_TTS_MODEL_DIR, max_concurrency=Config.LOCAL_TTS_MAX_CONCURRENCY)
+        local_tts.load(voice["local_voice"] for voice in VOICE_ASSIGNMENTS.values())
+    
+    opener_task = None
+    if Config.ENABLE_OPENERS:
+        opener_store = OpenerStore(Config.OPENER_CACHE_DIR or None)
+        opener_task = asyncio.create_task(warm_openers(
+            opener_store,
+            list(opener_pairs()),
+            generate_opener_text,
+            synthesize_opener,
+            requests_per_minute=Config.OPENER_WARMUP_REQUESTS_PER_MINUTE
+        ))
+        print("✅ Opener warmup started in background")
     
     yield
     
     print("👋 Shutting down...")
+    warmup_task.cancel()
+    if opener_task:
+        opener_task.cancel()
+    audio_executor.shutdown()
+    await tts_http_client.aclose()
+    if tts_cache:
+        tts_cache.close()
+    await client.close()
     if rabbitmq_connection:
         await rabbitmq_manager.close()
 
@@ -1324,13 +1882,274 @@ async def validate_websocket_token(token: str, db: Session) -> models.User:
     
     return user
 
+async def _handle_audio_turn(websocket: WebSocket, client_id: str, client_data: dict,
+                             audio, codec: str = "pcm16", vad_done: bool = False,
+                             received_at: Optional[float] = None, generation: Optional[int] = None,
+                             augment: bool = False):
+    """
+    Run one user turn: interrupt TTS, transcribe, stream the LLM reply.
+    ``audio`` is a base64 string (JSON clients) or a memoryview (binary frames).
+    ``vad_done`` skips VAD for utterances already endpointed by the server;
+    ``augment`` runs the augmentation pipeline on the audio before STT.
+    ``received_at`` is the perf_counter time the audio arrived, used as the
+    start of the turn trace. ``generation`` is the value of
+    client_data["turn_generation"] when the turn was dispatched; if a newer
+    turn arrives while this one is transcribing, it does not reply.
+    """
+    client_data["turn_counter"] = client_data.get("turn_counter", 0) + 1
+    trace = TurnTrace(client_id, client_data["turn_counter"], received_at)
+    if received_at is not None:
+        trace.add_span("receive", time.perf_counter() - received_at, received_at)
+    speculation = _claim_speculation(client_data)
+    outcome = "error"
+    try:
+        outcome = await _run_audio_turn(websocket, client_id, client_data, audio, codec, vad_done,
+                                        trace, generation, augment, speculation)
+    except asyncio.CancelledError:
+        outcome = "interrupted"
+        raise
+    finally:
+        client_data["turn_responding"] = False
+        if speculation is not None:
+            speculation.discard("discarded")  # No-op if the turn committed it
+        tts_service = client_data["tts_service"]
+        if tts_service.trace is trace:
+            tts_service.trace = None
+        trace.finish(outcome)
+
+
+def _claim_speculation(client_data: dict) -> Optional[SpeculativeReply]:
+    """Take the session's speculative reply for this turn, if it was started from the current history"""
+    speculation = client_data.pop("speculation", None)
+    if speculation is None:
+        return None
+    if speculation.context != client_data["conversation_manager"].context_marker():
+        speculation.discard("discarded")
+        return None
+    return speculation
+
+
+async def _run_audio_turn(websocket: WebSocket, client_id: str, client_data: dict,
+                          audio, codec: str, vad_done: bool, trace: TurnTrace,
+                          generation: Optional[int] = None, augment: bool = False,
+                          speculation: Optional[SpeculativeReply] = None) -> str:
+    """Body of _handle_audio_turn; returns the turn outcome for metrics"""
+    conversation_manager = client_data["conversation_manager"]
+    tts_service = client_data["tts_service"]
+    transcriber = client_data["transcriber"]
+
+    # 🔥 CRITICAL: Stop current TTS playback when new audio is detected
+    print(f"[{client_id}] ⏹️ Interrupting current TTS for new user speech")
+    await tts_service.stop_current_playback()
+    
+    await websocket.send_text(json.dumps({"type": "processing"}))
+    
+    transcript = None
+    if (speculation is not None and codec == "pcm16" and not isinstance(audio, str)
+            and speculation.matches_audio(np.frombuffer(audio, dtype=PCM16))):
+        # Endpointed right where the user paused: the interim transcript is the final one
+        with trace.span("stt"):
+            transcript = await speculation.wait_transcript()
+    
+    # Use RabbitMQ if available, otherwise direct processing
+    if transcript:
+        print(f"[{client_id}] ⚡ Utterance unchanged since the pause, reusing its transcript")
+    elif rabbitmq_channel:
+        request_id = str(uuid.uuid4())
+        audio_data = {
+            "client_id": client_id,
+            "audio_data": audio if isinstance(audio, str) else base64.b64encode(audio).decode("utf-8"),
+            "codec": codec,
+            "vad_done": vad_done,
+            "augment": augment,
+            "request_id": request_id
+        }
+        
+        # Send to audio processing queue
+        await rabbitmq_channel.default_exchange.publish(
+            aio_pika.Message(
+                body=json.dumps(audio_data).encode(),
+            ),
+            routing_key="audio_processing"
+        )
+        
+        # Wait for result with timeout
+        with trace.span("stt_queue"):
+            transcript = await _wait_for_processing_result(request_id, client_id, timeout=30)
+    else:
+        # Direct processing
+        transcript = await transcriber.transcribe(audio, client_id, codec, vad_done, trace, augment)
+    
+    if transcript:
+        await websocket.send_text(json.dumps({
+            "type": "transcript",
+            "text": transcript,
+            "role": "user"
+        }))
+        
+        # Store user message in history
+        conversation_history[client_id]["messages"].append({
+            "role": "user",
+            "content": transcript,
+            "timestamp": time.time()
+        })
+        
+        if generation is not None and client_data.get("turn_generation") != generation:
+            # The user kept talking; the newer turn answers both utterances
+            conversation_manager.context.append("user", transcript)
+            return "superseded"
+        # From here on a newer utterance barges in instead of waiting for this
+        # turn; set before the next await so no utterance slips in between
+        client_data["turn_responding"] = True
+        
+        if speculation is not None:
+            interim = await speculation.wait_transcript()
+            if speculation.failed:
+                speculation.discard("discarded")
+                speculation = None
+            elif not transcripts_match(interim, transcript, Config.SPECULATIVE_MATCH_THRESHOLD):
+                print(f"[{client_id}] ⚡ Speculative reply dropped: heard '{interim}', final '{transcript}'")
+                speculation.discard("mismatch")
+                speculation = None
+        
+        await websocket.send_text(json.dumps({"type": "llm_thinking"}))
+        
+        still_active = await conversation_manager.get_streaming_response(
+            transcript, websocket, trace, speculation
+        )
+        
+        # Store assistant response in history
+        last_message = conversation_manager.context.last
+        if last_message:
+            if last_message["role"] == "assistant":
+                conversation_history[client_id]["messages"].append({
+                    "role": "assistant", 
+                    "content": last_message["content"],
+                    "timestamp": time.time()
+                })
+        
+        if not still_active:
+            print(f"[{client_id}] 🏁 Conversation ended")
+            await websocket.send_text(json.dumps({
+                "type": "conversation_ended"
+            }))
+        return "ok"
+    else:
+        await websocket.send_text(json.dumps({
+            "type": "error",
+            "message": "Transcription failed - no text detected"
+        }))
+        return "no_transcript"
+
+
+async def _cancel_turn(client_data: dict):
+    """Cancel the running turn (LLM stream included) and wait for it to unwind"""
+    client_data["turn_generation"] = client_data.get("turn_generation", 0) + 1
+    _discard_speculation(client_data)
+    turn_task = client_data.get("turn_task")
+    if turn_task and not turn_task.done():
+        turn_task.cancel()
+        await asyncio.wait([turn_task])
+
+
+def _start_speculation(client_id: str, client_data: dict, audio: np.ndarray):
+    """
+    Start a speculative reply to the utterance so far (the user paused). Only
+    done between turns: while a turn is running the history is about to change.
+    """
+    turn_task = client_data.get("turn_task")
+    conversation_manager = client_data["conversation_manager"]
+    if (turn_task and not turn_task.done()) or not conversation_manager.conversation_active:
+        return
+    _discard_speculation(client_data, "discarded")
+    print(f"[{client_id}] ⚡ Pause after {len(audio) / RATE:.2f}s of speech, starting a speculative reply")
+    augment = client_data.get("augment", False)
+    client_data["speculation"] = SpeculativeReply(
+        audio,
+        transcribe=lambda: client_data["transcriber"].transcribe(
+            memoryview(audio).cast("B"), client_id, "pcm16", vad_done=True, augment=augment
+        ),
+        start_stream=conversation_manager.speculate,
+        context=conversation_manager.context_marker()
+    )
+
+
+def _discard_speculation(client_data: dict, result: Optional[str] = None):
+    speculation = client_data.pop("speculation", None)
+    if speculation is not None:
+        speculation.discard(result)
+
+
+def _stop_session_work(connection_data: dict):
+    """
+    Stop what a session still has running when it goes away: the streamed
+    turn, any speculative reply and a pending conversation summary. Shared by the endpoint's own cleanup and
+    ConnectionManager.disconnect so the two can't drift apart.
+    """
+    turn_task = connection_data.get("turn_task")
+    if turn_task and not turn_task.done():
+        turn_task.cancel()
+    _discard_speculation(connection_data, "discarded")
+    conversation_manager = connection_data.get("conversation_manager")
+    if conversation_manager:
+        conversation_manager.context.close()
+
+
+def _augmentation_allowed(client_id: str, requested) -> bool:
+    """Clients may only ask for augmentation when the server loaded the pipeline"""
+    if requested and not ENABLE_AUGMENTATION:
+        print(f"[{client_id}] ⚠️ Augmentation requested but ENABLE_AUGMENTATION is off; ignoring")
+        return False
+    return bool(requested)
+
+
+def _dispatch_turn(websocket: WebSocket, client_id: str, client_data: dict,
+                   audio, codec: str = "pcm16", vad_done: bool = False,
+                   received_at: Optional[float] = None, augment: Optional[bool] = None):
+    """
+    Start a turn without blocking message ingestion. ``augment`` defaults to
+    the connection's ``augment`` setting.
+
+    Turns run one at a time, in the order they arrive. A turn that is already
+    replying is interrupted (barge-in): its LLM stream and in-flight TTS
+    requests are cancelled. A turn that is still transcribing is left to
+    finish, but will not reply.
+    """
+    previous_turn = client_data.get("turn_task")
+    if augment is None:
+        augment = client_data.get("augment", False)
+    client_data["turn_generation"] = generation = client_data.get("turn_generation", 0) + 1
+    barge_in = bool(previous_turn and not previous_turn.done() and client_data.get("turn_responding"))
+
+    async def run_turn():
+        if barge_in:
+            print(f"[{client_id}] ✋ Barge-in: cancelling the current reply")
+            previous_turn.cancel()
+            await client_data["tts_service"].cancel_all()
+        if previous_turn and not previous_turn.done():
+            await asyncio.wait([previous_turn])
+        try:
+            await _handle_audio_turn(websocket, client_id, client_data, audio, codec, vad_done,
+                                     received_at=received_at, generation=generation, augment=augment)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"[{client_id}] ❌ Turn error: {e}")
+
+    client_data["turn_task"] = asyncio.create_task(run_turn())
+
+
 @app.websocket("/ws/{client_id}")
 async def websocket_endpoint(
     websocket: WebSocket, 
     client_id: str, 
     token: str = Query(None),
     personality: str = Query("entj_commander"), 
-    scenario: str = Query("role_shift")
+    scenario: str = Query("role_shift"),
+    tts_transport: str = Query("json"),  # "binary" streams TTS audio as KIND_TTS_AUDIO frames
+    tts_format: str = Query(None),  # "opus", "mp3" or "pcm"; Config.TTS_OUTPUT_FORMAT if omitted
+    opener: bool = Query(False),  # Speak the pre-synthesized opener right after connecting
+    augment: bool = Query(False)  # Augment this session's audio before STT (needs ENABLE_AUGMENTATION)
 ):
     # Accept the WebSocket connection first
     await websocket.accept()
@@ -1362,10 +2181,16 @@ async def websocket_endpoint(
         db.close()
     
     # Continue with normal WebSocket connection
-    await manager.connect(websocket, client_id, personality, scenario)
+    if tts_format not in TTS_OUTPUT_FORMATS:
+        if tts_format:
+            print(f"[{client_id}] ⚠️ Unknown tts_format '{tts_format}', using {Config.TTS_OUTPUT_FORMAT}")
+        tts_format = Config.TTS_OUTPUT_FORMAT
+    await manager.connect(websocket, client_id, personality, scenario,
+                          tts_transport=tts_transport, tts_format=tts_format)
     
     # Store initial conversation data with user information
     client_data = manager.get_client_data(client_id)
+    client_data["augment"] = _augmentation_allowed(client_id, augment)
     if client_id not in conversation_history:
         conversation_history[client_id] = {
             "user_id": user.user_id,
@@ -1403,14 +2228,79 @@ async def websocket_endpoint(
         client_data = manager.get_client_data(client_id)
         if not client_data:
             return
+        
+        if opener:
+            await send_opener(websocket, client_id, client_data)
             
         conversation_manager = client_data["conversation_manager"]
         tts_service = client_data["tts_service"]
-        transcriber = client_data["transcriber"]
 
         while True:
-            data = await websocket.receive_text()
-            message = json.loads(data)
+            frame = await websocket.receive()
+            received_at = time.perf_counter()
+            if frame["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(frame.get("code", 1000))
+
+            if frame.get("bytes") is not None:
+                try:
+                    audio_frame = parse_frame(frame["bytes"])
+                except FrameError as e:
+                    print(f"[{client_id}] ⚠️ Invalid binary frame: {e}")
+                    await websocket.send_text(json.dumps({
+                        "type": "error",
+                        "message": f"Invalid audio frame: {e}"
+                    }))
+                    continue
+
+                try:
+                    check_input_codec(audio_frame)
+                except FrameError as e:
+                    await websocket.send_text(json.dumps({
+                        "type": "error",
+                        "message": str(e)
+                    }))
+                    continue
+
+                if audio_frame.kind != KIND_AUDIO_CHUNK:
+                    print(f"[{client_id}] 📨 Received binary frame kind={audio_frame.kind} "
+                          f"codec={audio_frame.codec_name} ({len(audio_frame.payload)} bytes)")
+
+                if audio_frame.kind == KIND_AUDIO_UTTERANCE:
+                    if not audio_frame.payload:
+                        await websocket.send_text(json.dumps({
+                            "type": "error",
+                            "message": "Empty audio frame"
+                        }))
+                        continue
+                    _dispatch_turn(websocket, client_id, client_data,
+                                   audio_frame.payload, audio_frame.codec_name,
+                                   received_at=received_at)
+                elif audio_frame.kind == KIND_AUDIO_CHUNK:
+                    audio_stream = client_data["audio_stream"]
+                    try:
+                        utterance = audio_stream.feed(
+                            audio_frame.payload,
+                            end_of_utterance=bool(audio_frame.flags & FLAG_END_OF_UTTERANCE)
+                        )
+                    except ValueError as e:
+                        print(f"[{client_id}] ⚠️ Bad audio chunk: {e}")
+                        continue
+                    if audio_stream.speech_resumed:
+                        # The pause was not the end of the turn
+                        audio_stream.speech_resumed = False
+                        _discard_speculation(client_data, "discarded")
+                    pause_utterance = audio_stream.take_pause_utterance()
+                    if pause_utterance is not None:
+                        _start_speculation(client_id, client_data, pause_utterance)
+                    if utterance is not None:
+                        _dispatch_turn(websocket, client_id, client_data,
+                                       memoryview(utterance).cast("B"), "pcm16", vad_done=True,
+                                       received_at=received_at)
+                else:
+                    print(f"[{client_id}] ⚠️ Unknown binary frame kind: {audio_frame.kind}")
+                continue
+
+            message = json.loads(frame["text"])
             msg_type = message.get("type")
             
             print(f"[{client_id}] 📨 Received message type: '{msg_type}'")
@@ -1426,80 +2316,19 @@ async def websocket_endpoint(
                     }))
                     continue
                 
-                # 🔥 CRITICAL: Stop current TTS playback when new audio is detected
-                print(f"[{client_id}] ⏹️ Interrupting current TTS for new user speech")
-                await tts_service.stop_current_playback()
-                
-                await websocket.send_text(json.dumps({"type": "processing"}))
-                
-                # Use RabbitMQ if available, otherwise direct processing
-                if rabbitmq_channel:
-                    request_id = str(uuid.uuid4())
-                    audio_data = {
-                        "client_id": client_id,
-                        "audio_data": audio_base64,
-                        "request_id": request_id
-                    }
-                    
-                    # Send to audio processing queue
-                    await rabbitmq_channel.default_exchange.publish(
-                        aio_pika.Message(
-                            body=json.dumps(audio_data).encode(),
-                        ),
-                        routing_key="audio_processing"
-                    )
-                    
-                    # Wait for result with timeout
-                    transcript = await _wait_for_processing_result(request_id, client_id, timeout=30)
-                else:
-                    # Direct processing
-                    transcript = await transcriber.transcribe(audio_base64, client_id)
-                
-                if transcript:
-                    await websocket.send_text(json.dumps({
-                        "type": "transcript",
-                        "text": transcript,
-                        "role": "user"
-                    }))
-                    
-                    # Store user message in history
-                    conversation_history[client_id]["messages"].append({
-                        "role": "user",
-                        "content": transcript,
-                        "timestamp": time.time()
-                    })
-                    
-                    await websocket.send_text(json.dumps({"type": "llm_thinking"}))
-                    
-                    still_active = await conversation_manager.get_streaming_response(
-                        transcript, websocket
-                    )
-                    
-                    # Store assistant response in history
-                    if conversation_manager.messages:
-                        last_message = conversation_manager.messages[-1]
-                        if last_message["role"] == "assistant":
-                            conversation_history[client_id]["messages"].append({
-                                "role": "assistant", 
-                                "content": last_message["content"],
-                                "timestamp": time.time()
-                            })
-                    
-                    if not still_active:
-                        print(f"[{client_id}] 🏁 Conversation ended")
-                        await websocket.send_text(json.dumps({
-                            "type": "conversation_ended"
-                        }))
-                else:
-                    await websocket.send_text(json.dumps({
-                        "type": "error",
-                        "message": "Transcription failed - no text detected"
-                    }))
+                # An "augment" field overrides the connection setting for this turn
+                turn_augment = message.get("augment")
+                if turn_augment is not None:
+                    turn_augment = _augmentation_allowed(client_id, turn_augment)
+                _dispatch_turn(websocket, client_id, client_data, audio_base64,
+                               received_at=received_at, augment=turn_augment)
 
             elif msg_type == "reset_conversation":
                 print(f"[{client_id}] 🔄 Resetting conversation...")
                 
+                await _cancel_turn(client_data)
                 await tts_service.cancel_all()
+                client_data["audio_stream"].reset()
                 
                 conversation_manager.reset(conversation_manager.personality_type,
                             conversation_manager.scenario,)
@@ -1522,6 +2351,7 @@ async def websocket_endpoint(
                 
                 print(f"[{client_id}] 🎭 Changing config - Personality: {new_personality}, Scenario: {new_scenario}")
                 
+                await _cancel_turn(client_data)
                 await tts_service.cancel_all()
                 
                 conversation_manager.reset(new_personality, new_scenario, custom_scenario)
@@ -1543,8 +2373,13 @@ async def websocket_endpoint(
                     "scenario_name": scenario_data["name"],
                     "message": f"Changed to {profile['name']} in {scenario_data['name']}"
                 }))
+            elif msg_type == "play_opener":
+                # Lets browsers ask for the opener once a user gesture allows audio playback
+                await send_opener(websocket, client_id, client_data)
+
             elif msg_type == "end_call":
                 print(f"[{client_id}] 📞 Call ended by user.")
+                await _cancel_turn(client_data)
                 await tts_service.cancel_all()
                 # Don't close here - let the finally block handle it
                 break
@@ -1563,6 +2398,8 @@ async def websocket_endpoint(
             
             # Check if this is still the same websocket (not replaced by a new connection)
             if connection_data.get("websocket") == websocket:
+                _stop_session_work(connection_data)
+
                 # Cancel TTS operations
                 tts_service = connection_data.get("tts_service")
                 if tts_service:
@@ -1817,7 +2654,7 @@ async def _generate_fallback_feedback(client_id: str) -> dict:
     
     try:
         print("🤖 Calling LLM for fallback feedback...")
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "You are an expert communication coach providing constructive feedback for professional development in workplace scenarios."},
@@ -1904,10 +2741,33 @@ async def health_check():
     return {
         "status": "healthy",
         "active_connections": len(manager.active_connections),
-        "rabbitmq_connected": rabbitmq_connection is not None
+        "rabbitmq_connected": rabbitmq_connection is not None,
+        "audio_executor": audio_executor.stats() if audio_executor else None,
+        "tts_cache": tts_cache.stats() if tts_cache else None,
+        "stt_cache": stt_cache.stats() if stt_cache else None,
+        "tts_providers": tts_router.snapshot()
     }
 
 
+ACTIVE_CONNECTIONS = REGISTRY.gauge("voice_active_connections", "Open voice WebSocket sessions")
+AUDIO_EXECUTOR_JOBS = REGISTRY.gauge(
+    "voice_audio_executor_jobs",
+    "Audio preprocessing executor jobs by state",
+    ["state"]
+)
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus-style metrics: per-stage latency histograms and pipeline gauges"""
+    ACTIVE_CONNECTIONS.set(len(manager.active_connections))
+    if audio_executor:
+        stats = audio_executor.stats()
+        for state in ("active", "queued", "completed", "failed", "rejected"):
+            AUDIO_EXECUTOR_JOBS.set(stats[state], state=state)
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/config")
 async def get_config():
     return {
@@ -0,0 +1,211 @@
+"""
+Audio augmentation (torch-audiomentations)
+Colored noise, small pitch shifts and gain changes, for building evaluation
+and training sets from stored utterances. This is an offline job: the live
+transcription path only augments a turn when the client explicitly asks for
+it, since it costs CPU (PitchShift resamples) and can only make the audio
+harder to transcribe.
+
+Run from the repository root:
+
+    python -m services.augmentation recordings/ augmented/ --variants 4
+    python -m services.augmentation recordings/ augmented/ --batch-size 32 --seed 7
+
+Every 16-bit PCM .wav under the input directory is read, converted to 16 kHz
+mono and augmented in batches; each variant is written as
+``<name>_aug<k>.wav`` alongside a manifest.jsonl mapping outputs to sources.
+"""
+
+import argparse
+import json
+import os
+import sys
+import wave
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+import torch
+import torchaudio
+from torch_audiomentations import Compose, AddColoredNoise, PitchShift, Gain
+
+SAMPLE_RATE = 16000
+MANIFEST_FILE = "manifest.jsonl"
+
+
+class AudioAugmentation:
+    """Audio augmentation pipeline using torch-audiomentations"""
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.augmentation = None
+
+    def create_pipeline(self):
+        """Create audio augmentation pipeline"""
+        try:
+            print("🎵 Creating audio augmentation pipeline...")
+            self.augmentation = Compose([
+                AddColoredNoise(
+                    min_snr_in_db=10.0,
+                    max_snr_in_db=30.0,
+                    min_f_decay=-2.0,
+                    max_f_decay=2.0,
+                    p=0.3,
+                    sample_rate=self.sample_rate
+                ),
+                PitchShift(
+                    min_transpose_semitones=-1.0,
+                    max_transpose_semitones=1.0,
+                    p=0.2,
+                    sample_rate=self.sample_rate
+                ),
+                Gain(
+                    min_gain_in_db=-6.0,
+                    max_gain_in_db=6.0,
+                    p=0.3
+                )
+            ])
+            print("✅ Audio augmentation pipeline created")
+            return True
+        except Exception as e:
+            print(f"❌ Failed to create augmentation pipeline: {e}")
+            return False
+
+    def augment(self, audio_tensor: torch.Tensor) -> torch.Tensor:
+        """Augment one mono utterance (any of (samples,), (1, samples), (1, 1, samples))"""
+        if self.augmentation is None:
+            return audio_tensor
+
+        try:
+            # Ensure proper shape: (batch, channels, samples)
+            while audio_tensor.dim() < 3:
+                audio_tensor = audio_tensor.unsqueeze(0)
+
+            augmented = self.augmentation(audio_tensor, sample_rate=self.sample_rate)
+            return augmented.squeeze()
+        except Exception as e:
+            print(f"⚠️ Augmentation failed: {e}")
+            return audio_tensor.squeeze()
+
+    def augment_batch(self, batch: torch.Tensor) -> torch.Tensor:
+        """
+        Augment a (batch, 1, samples) tensor in one call. Transforms are drawn
+        per example, so every row gets its own noise, pitch and gain.
+        """
+        if self.augmentation is None:
+            return batch
+        return self.augmentation(batch, sample_rate=self.sample_rate)
+
+
+def load_wav(path: str, sample_rate: int = SAMPLE_RATE) -> torch.Tensor:
+    """16-bit PCM WAV as a float mono tensor at ``sample_rate``"""
+    with wave.open(path, "rb") as wav_file:
+        if wav_file.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected 16-bit PCM")
+        channels = wav_file.getnchannels()
+        rate = wav_file.getframerate()
+        frames = wav_file.readframes(wav_file.getnframes())
+
+    samples = np.frombuffer(frames, dtype="<i2").reshape(-1, channels).mean(axis=1)
+    audio = torch.from_numpy((samples / 32768.0).astype(np.float32))
+    if rate != sample_rate:
+        audio = torchaudio.functional.resample(audio, rate, sample_rate)
+    return audio
+
+
+def write_wav(path: str, audio: torch.Tensor, sample_rate: int = SAMPLE_RATE):
+    samples = (audio.clamp(-1.0, 32767 / 32768).numpy() * 32768.0).astype("<i2")
+    with wave.open(path, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(samples.tobytes())
+
+
+def find_utterances(directory: str) -> List[str]:
+    return sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(directory)
+        for name in names
+        if name.lower().endswith(".wav")
+    )
+
+
+def batches(utterances: List[Tuple[str, torch.Tensor]], batch_size: int) -> Iterator[List[Tuple[str, torch.Tensor]]]:
+    """
+    Group utterances of similar length so padding stays small. Padding is
+    silence, which lowers the level AddColoredNoise measures its SNR against,
+    so batches of very different lengths would get noisier than intended.
+    """
+    ordered = sorted(utterances, key=lambda item: item[1].numel())
+    for start in range(0, len(ordered), batch_size):
+        yield ordered[start:start + batch_size]
+
+
+def pad_batch(audios: List[torch.Tensor]) -> torch.Tensor:
+    """Stack mono utterances into a zero-padded (batch, 1, samples) tensor"""
+    batch = torch.zeros(len(audios), 1, max(audio.numel() for audio in audios))
+    for row, audio in enumerate(audios):
+        batch[row, 0, :audio.numel()] = audio
+    return batch
+
+
+def export_augmented(input_dir: str, output_dir: str, variants: int = 4, batch_size: int = 16,
+                     seed: Optional[int] = None) -> int:
+    """Write ``variants`` augmented copies of every utterance in ``input_dir``; returns files written"""
+    if seed is not None:
+        torch.manual_seed(seed)
+
+    augmentation = AudioAugmentation(sample_rate=SAMPLE_RATE)
+    if not augmentation.create_pipeline():
+        return 0
+
+    utterances = []
+    for path in find_utterances(input_dir):
+        try:
+            utterances.append((path, load_wav(path)))
+        except (OSError, ValueError, wave.Error) as e:
+            print(f"⚠️ Skipping {path}: {e}")
+    print(f"🎵 Augmenting {len(utterances)} utterance(s) x {variants} variant(s)")
+
+    os.makedirs(output_dir, exist_ok=True)
+    written = 0
+    with open(os.path.join(output_dir, MANIFEST_FILE), "w", encoding="utf-8") as manifest:
+        for group in batches(utterances, batch_size):
+            lengths = [audio.numel() for _, audio in group]
+            batch = pad_batch([audio for _, audio in group])
+            for variant in range(variants):
+                augmented = augmentation.augment_batch(batch)
+                for (path, _), length, audio in zip(group, lengths, augmented):
+                    relative = os.path.relpath(path, input_dir)
+                    stem = os.path.splitext(relative)[0]
+                    output = os.path.join(output_dir, f"{stem}_aug{variant}.wav")
+                    os.makedirs(os.path.dirname(output), exist_ok=True)
+                    write_wav(output, audio[0, :length])
+                    manifest.write(json.dumps({
+                        "source": relative,
+                        "variant": variant,
+                        "output": os.path.relpath(output, output_dir)
+                    }) + "\n")
+                    written += 1
+
+    print(f"✅ Wrote {written} augmented file(s) to {output_dir}")
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write augmented variants of stored utterances")
+    parser.add_argument("input_dir", help="Directory of 16-bit PCM .wav utterances (searched recursively)")
+    parser.add_argument("output_dir")
+    parser.add_argument("--variants", type=int, default=4, help="Augmented copies per utterance")
+    parser.add_argument("--batch-size", type=int, default=16, help="Utterances augmented per call")
+    parser.add_argument("--seed", type=int, help="Seed torch for reproducible output")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.input_dir):
+        parser.error(f"{args.input_dir} is not a directory")
+    written = export_augmented(args.input_dir, args.output_dir, args.variants, args.batch_size, args.seed)
+    return 0 if written else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
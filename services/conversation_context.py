@@ -0,0 +1,153 @@
+"""
+Bounded conversation context for the LLM
+Keeps what is sent with every request within a token budget: the system
+prompt, a rolling summary of older turns, and the most recent turns
+verbatim. Once the history outgrows the budget, the older turns are folded
+into the summary by a background task between turns, so no reply waits for
+it.
+
+The system prompt always comes first and never changes within a session, and
+the summary only changes when turns are folded, so consecutive requests share
+a long identical prefix that provider-side prompt caching can reuse.
+"""
+
+import asyncio
+import importlib.util
+from typing import Awaitable, Callable, List, Optional
+
+SUMMARY_PREFIX = "Summary of the conversation so far:\n"
+MESSAGE_OVERHEAD_TOKENS = 4  # Role and separators the chat format adds per message
+
+# (previous summary, messages to fold in) -> new summary
+Summarizer = Callable[[str, List[dict]], Awaitable[str]]
+
+
+def _load_encoding():
+    if importlib.util.find_spec("tiktoken") is None:
+        return None
+    import tiktoken
+
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        print(f"⚠️ tiktoken encoding unavailable, estimating token counts: {e}")
+        return None
+
+
+_encoding = None
+_encoding_loaded = False
+
+
+def count_tokens(text: str) -> int:
+    """Tokens in ``text`` with tiktoken when it is installed, otherwise ~4 characters per token"""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding = _load_encoding()
+        _encoding_loaded = True
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+class ConversationContext:
+    """
+    System prompt + rolling summary + recent turns. ``token_budget`` bounds
+    the summary and history (not the system prompt); the last ``keep_turns``
+    user turns, and the replies to them, are never summarized. If
+    summarization keeps failing, the oldest turns are dropped once the
+    history reaches twice the budget.
+    """
+
+    def __init__(self, system_prompt: str, token_budget: int = 3000, keep_turns: int = 4):
+        self.system_prompt = system_prompt
+        self.token_budget = token_budget
+        self.keep_turns = keep_turns
+        self.summary = ""
+        self.summary_tokens = 0
+        self.turns: List[dict] = []
+        self._turn_tokens: List[int] = []
+        self.history_tokens = 0
+        self.version = 0  # Messages added so far; folding and dropping leave it alone
+        self._summary_task: Optional[asyncio.Task] = None
+
+    @property
+    def tokens(self) -> int:
+        return self.summary_tokens + self.history_tokens
+
+    @property
+    def has_history(self) -> bool:
+        return bool(self.turns or self.summary)
+
+    @property
+    def last(self) -> Optional[dict]:
+        return self.turns[-1] if self.turns else None
+
+    def append(self, role: str, content: str):
+        self.turns.append({"role": role, "content": content})
+        tokens = count_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+        self._turn_tokens.append(tokens)
+        self.history_tokens += tokens
+        self.version += 1
+        if self.token_budget > 0 and self.tokens > 2 * self.token_budget:
+            self._drop(self._foldable())
+
+    def messages(self, user_input: Optional[str] = None) -> List[dict]:
+        """The request messages, optionally with a new user message that is not recorded"""
+        messages = [{"role": "system", "content": self.system_prompt}]
+        if self.summary:
+            messages.append({"role": "system", "content": SUMMARY_PREFIX + self.summary})
+        messages.extend(self.turns)
+        if user_input is not None:
+            messages.append({"role": "user", "content": user_input})
+        return messages
+
+    def _foldable(self) -> int:
+        """Number of leading messages that are older than the last ``keep_turns`` user turns"""
+        user_turns = 0
+        for index in range(len(self.turns) - 1, -1, -1):
+            if self.turns[index]["role"] == "user":
+                user_turns += 1
+                if user_turns == self.keep_turns:
+                    return index
+        return 0
+
+    def _drop(self, count: int):
+        if count <= 0:
+            return
+        print(f"⚠️ Conversation context over twice its budget, dropping {count} old message(s)")
+        self.history_tokens -= sum(self._turn_tokens[:count])
+        del self.turns[:count]
+        del self._turn_tokens[:count]
+
+    def maybe_summarize(self, summarize: Summarizer):
+        """Fold older turns into the summary in the background if the context is over budget"""
+        if self.token_budget <= 0 or self.tokens <= self.token_budget:
+            return
+        if self._summary_task and not self._summary_task.done():
+            return
+        count = self._foldable()
+        if count:
+            self._summary_task = asyncio.create_task(self._summarize(summarize, count))
+
+    async def _summarize(self, summarize: Summarizer, count: int):
+        folded = self.turns[:count]
+        try:
+            summary = (await summarize(self.summary, folded)).strip()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️ Conversation summary failed, keeping turns verbatim: {e}")
+            return
+        if not summary or self.turns[:count] != folded:
+            return  # Turns were dropped meanwhile; try again after the next turn
+
+        self.summary = summary
+        self.summary_tokens = count_tokens(SUMMARY_PREFIX + summary) + MESSAGE_OVERHEAD_TOKENS
+        self.history_tokens -= sum(self._turn_tokens[:count])
+        del self.turns[:count]
+        del self._turn_tokens[:count]
+        print(f"📝 Folded {count} message(s) into the conversation summary ({self.tokens} tokens of history)")
+
+    def close(self):
+        if self._summary_task and not self._summary_task.done():
+            self._summary_task.cancel()
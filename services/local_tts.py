@@ -0,0 +1,89 @@
+"""
+Local CPU-only TTS with Piper (ONNX voices)
+Last-resort provider when the cloud providers are unreachable, and a free,
+deterministic engine for development, load tests and CI. Needs the optional
+``piper-tts`` package and one ``<voice>.onnx`` + ``<voice>.onnx.json`` pair
+per voice in the model directory; without them the engine reports itself
+unavailable and the router simply never picks it.
+"""
+
+import asyncio
+import importlib.util
+import os
+import threading
+from typing import Dict, Iterable
+
+import numpy as np
+
+
+class PiperTTS:
+    """Loads Piper voices from ``model_dir`` and synthesizes int16 PCM off the event loop"""
+
+    def __init__(self, model_dir: str, max_concurrency: int = 2):
+        self.model_dir = model_dir
+        self.installed = importlib.util.find_spec("piper") is not None
+        self.voices: Dict[str, object] = {}
+        self._load_lock = threading.Lock()
+        self._slots = asyncio.Semaphore(max(1, max_concurrency))
+
+    def _model_path(self, voice: str) -> str:
+        return os.path.join(self.model_dir, f"{voice}.onnx")
+
+    def has_voice(self, voice: str) -> bool:
+        return voice in self.voices or (self.installed and os.path.exists(self._model_path(voice)))
+
+    def load(self, voices: Iterable[str]):
+        """Load voices up front so the first sentence doesn't pay for it"""
+        if not self.installed:
+            print("⚠️ Local TTS unavailable: piper-tts is not installed")
+            return
+        for voice in set(voices):
+            if not os.path.exists(self._model_path(voice)):
+                print(f"⚠️ Local TTS voice not found: {self._model_path(voice)}")
+                continue
+            try:
+                self._voice(voice)
+                print(f"✅ Local TTS voice loaded: {voice}")
+            except Exception as e:
+                print(f"❌ Local TTS voice {voice} failed to load: {e}")
+
+    def _voice(self, voice: str):
+        with self._load_lock:
+            if voice not in self.voices:
+                from piper import PiperVoice
+
+                self.voices[voice] = PiperVoice.load(self._model_path(voice), use_cuda=False)
+            return self.voices[voice]
+
+    def sample_rate(self, voice: str) -> int:
+        return self._voice(voice).config.sample_rate
+
+    def _synthesize(self, voice: str, text: str, length_scale: float) -> np.ndarray:
+        from piper import SynthesisConfig
+
+        piper_voice = self._voice(voice)
+        parts = [
+            chunk.audio_int16_array
+            for chunk in piper_voice.synthesize(text, syn_config=SynthesisConfig(length_scale=length_scale))
+        ]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int16)
+
+    async def synthesize(self, voice: str, text: str, length_scale: float = 1.0) -> np.ndarray:
+        """Mono int16 samples at sample_rate(voice)"""
+        async with self._slots:
+            return await asyncio.to_thread(self._synthesize, voice, text, length_scale)
+
+
+def resample_pcm16(samples: np.ndarray, from_rate: int, to_rate: int) -> np.ndarray:
+    """
+    Linear-interpolation resample of int16 PCM. Piper voices are 16-22.05 kHz
+    and this only converts them up to the 24 kHz of CODEC_PCM16_24K, so no
+    anti-aliasing filter is needed.
+    """
+    if from_rate == to_rate or samples.size == 0:
+        return samples
+    duration = samples.size / from_rate
+    target = np.arange(int(round(duration * to_rate))) / to_rate
+    source = np.arange(samples.size) / from_rate
+    return np.interp(target, source, samples).astype(np.int16)
+
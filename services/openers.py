@@ -0,0 +1,150 @@
+"""
+Pre-synthesized conversation openers
+Keeps the manager's opening line (text + audio) for every personality x
+scenario pair, in each TTS output format clients can negotiate, so a session
+can start speaking as soon as it connects. Openers are generated in the
+background at startup, rate-limited, and persisted to disk so restarts don't
+pay for them again.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+from typing import Awaitable, Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+
+INDEX_FILE = "openers.json"
+
+
+class Opener(NamedTuple):
+    text: str
+    codec: int      # utils.audio_frames CODEC_*
+    audio: bytes
+
+
+def opener_fingerprint(*parts) -> str:
+    """
+    Hash of everything an opener was generated from (prompt, voice settings...).
+    A stored opener is only used while its fingerprint still matches.
+    """
+    material = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.blake2b(material.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def _audio_file(personality: str, scenario: str, output_format: str) -> str:
+    return f"{personality}__{scenario}__{output_format}.audio"
+
+
+class OpenerStore:
+    """
+    Openers by (personality, scenario, output format), optionally persisted
+    under ``directory``
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory
+        self._openers: Dict[Tuple[str, str, str], Tuple[str, Opener]] = {}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._load()
+
+    def _load(self):
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        if not os.path.exists(index_path):
+            return
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            for key, entry in index.items():
+                parts = tuple(key.split("/"))
+                if len(parts) != 3:
+                    continue  # Written before openers were kept per output format
+                with open(os.path.join(self.directory, entry["audio_file"]), "rb") as audio_file:
+                    audio = audio_file.read()
+                self._openers[parts] = (
+                    entry["fingerprint"], Opener(entry["text"], entry["codec"], audio)
+                )
+            print(f"✅ Loaded {len(self._openers)} opener(s) from {self.directory}")
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Could not load openers from {self.directory}: {e}")
+
+    def _save(self):
+        index = {
+            "/".join(key): {
+                "fingerprint": fingerprint,
+                "text": opener.text,
+                "codec": opener.codec,
+                "audio_file": _audio_file(*key)
+            }
+            for key, (fingerprint, opener) in self._openers.items()
+        }
+        tmp_path = os.path.join(self.directory, INDEX_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, os.path.join(self.directory, INDEX_FILE))
+
+    def get(self, personality: str, scenario: str, output_format: str, fingerprint: str) -> Optional[Opener]:
+        entry = self._openers.get((personality, scenario, output_format))
+        if entry is None or entry[0] != fingerprint:
+            return None
+        return entry[1]
+
+    def put(self, personality: str, scenario: str, output_format: str, fingerprint: str, opener: Opener):
+        self._openers[(personality, scenario, output_format)] = (fingerprint, opener)
+        if not self.directory:
+            return
+        try:
+            audio_path = os.path.join(self.directory, _audio_file(personality, scenario, output_format))
+            with open(audio_path + ".tmp", "wb") as f:
+                f.write(opener.audio)
+            os.replace(audio_path + ".tmp", audio_path)
+            self._save()
+        except OSError as e:
+            print(f"⚠️ Could not persist opener {personality}/{scenario}/{output_format}: {e}")
+
+    def __len__(self) -> int:
+        return len(self._openers)
+
+
+async def warm_openers(
+    store: OpenerStore,
+    pairs: Iterable[Tuple[str, str, str, str]],
+    generate_text: Callable[[str, str], Awaitable[str]],
+    synthesize: Callable[[str, str, str], Awaitable[Tuple[int, bytes]]],
+    requests_per_minute: float = 20.0
+):
+    """
+    Fill ``store`` for every (personality, scenario, output format,
+    fingerprint) that is missing or stale. Runs one entry at a time and
+    spaces out provider calls so warmup never competes with live sessions
+    for rate limits. The text is generated once per personality and
+    scenario and synthesized in each format. Entries ``synthesize`` returns
+    no audio for are skipped and tried again on the next warmup.
+    """
+    interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+    generated = 0
+    texts: Dict[Tuple[str, str], str] = {}
+
+    for personality, scenario, output_format, fingerprint in pairs:
+        if store.get(personality, scenario, output_format, fingerprint):
+            continue
+        try:
+            text = texts.get((personality, scenario))
+            if text is None:
+                text = await generate_text(personality, scenario)
+                await asyncio.sleep(interval)
+                if not text:
+                    continue
+                texts[(personality, scenario)] = text
+            codec, audio = await synthesize(personality, text, output_format)
+            await asyncio.sleep(interval)
+            if not audio:
+                continue
+            store.put(personality, scenario, output_format, fingerprint, Opener(text, codec, audio))
+            generated += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️ Opener warmup failed for {personality}/{scenario}/{output_format}: {e}")
+
+    print(f"✅ Opener warmup complete ({generated} generated, {len(store)} available)")
@@ -0,0 +1,126 @@
+"""
+Speculative LLM replies
+When the user pauses mid-stream, the audio so far is transcribed and the
+reply to it is started right away, while endpointing is still waiting to be
+sure the user has finished. The reply's tokens are held back. When the turn's
+final transcript arrives, the speculative reply is either committed (the two
+transcripts match closely enough) and its buffered tokens are released, or it
+is discarded and the reply is generated normally.
+"""
+
+import asyncio
+import difflib
+import re
+from typing import AsyncIterator, Awaitable, Callable, List, Optional
+
+import numpy as np
+
+from utils.metrics import REGISTRY
+
+SPECULATIONS = REGISTRY.counter(
+    "voice_llm_speculations_total",
+    "Speculative LLM replies by result (committed, mismatch, discarded)",
+    ["result"]
+)
+
+_WORD = re.compile(r"[\w']+")
+
+
+def transcript_words(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def transcripts_match(interim: Optional[str], final: Optional[str], threshold: float = 0.9) -> bool:
+    """Whether two transcripts say the same thing, ignoring case and punctuation"""
+    if not interim or not final:
+        return False
+    interim_words, final_words = transcript_words(interim), transcript_words(final)
+    if interim_words == final_words:
+        return True
+    return difflib.SequenceMatcher(None, interim_words, final_words).ratio() >= threshold
+
+
+class SpeculativeReply:
+    """
+    One speculative reply for ``audio`` (int16 samples). ``transcribe`` returns
+    the interim transcript; ``start_stream`` starts the LLM for a transcript
+    and returns its text tokens. ``context`` identifies the conversation state
+    the reply was started from, so a stale one is never committed.
+    """
+
+    def __init__(self, audio: np.ndarray,
+                 transcribe: Callable[[], Awaitable[Optional[str]]],
+                 start_stream: Callable[[str], Awaitable[AsyncIterator[str]]],
+                 context=None):
+        self.audio = audio
+        self.context = context
+        self.transcript: Optional[str] = None
+        self.tokens: List[str] = []
+        self.settled = False  # Committed or discarded, as counted in SPECULATIONS
+        self._transcribed = asyncio.Event()
+        self._changed = asyncio.Event()
+        self._transcribe = transcribe
+        self._start_stream = start_stream
+        self.task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        try:
+            self.transcript = await self._transcribe()
+        finally:
+            self._transcribed.set()
+        if not self.transcript:
+            return
+        stream = await self._start_stream(self.transcript)
+        try:
+            async for token in stream:
+                self.tokens.append(token)
+                self._changed.set()
+        finally:
+            await stream.aclose()
+            self._changed.set()
+
+    def matches_audio(self, audio: np.ndarray) -> bool:
+        return len(audio) == len(self.audio) and np.array_equal(audio, self.audio)
+
+    async def wait_transcript(self) -> Optional[str]:
+        await self._transcribed.wait()
+        return self.transcript
+
+    @property
+    def failed(self) -> bool:
+        return self.task.done() and not self.task.cancelled() and self.task.exception() is not None
+
+    async def stream(self) -> AsyncIterator[str]:
+        """Tokens produced so far, then the rest as they arrive (after commit)"""
+        position = 0
+        try:
+            while True:
+                if position < len(self.tokens):
+                    position += 1
+                    yield self.tokens[position - 1]
+                    continue
+                if self.task.done():
+                    self.task.result()  # Raise what the upstream stream failed with
+                    return
+                self._changed.clear()
+                await self._changed.wait()
+        finally:
+            self.discard()
+
+    def commit(self) -> AsyncIterator[str]:
+        self.settled = True
+        SPECULATIONS.inc(result="committed")
+        return self.stream()
+
+    def discard(self, result: Optional[str] = None):
+        """
+        Stop the reply (closing its LLM stream). ``result`` is counted in the
+        metrics unless the speculation was already committed or discarded.
+        """
+        if not self.task.done():
+            self.task.cancel()
+        elif not self.task.cancelled():
+            self.task.exception()  # Mark as retrieved
+        if result and not self.settled:
+            self.settled = True
+            SPECULATIONS.inc(result=result)
@@ -0,0 +1,228 @@
+"""
+TTS provider routing
+Keeps rolling first-byte latency and error statistics per provider, sends
+each request to the fastest healthy one and falls back to the others in
+order. Optionally hedges: if the chosen provider has not produced its first
+byte within ``hedge_after`` seconds, the next one is asked as well and
+whichever answers first is used.
+
+A provider that keeps failing is taken out of rotation for a cooldown period
+(the job the pybreaker circuit breaker used to do), then gets another try.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+
+from utils.metrics import REGISTRY
+
+FIRST_BYTE_SECONDS = REGISTRY.histogram(
+    "voice_tts_first_byte_seconds",
+    "Time from TTS request to first audio byte, by provider",
+    ["provider"]
+)
+PROVIDER_REQUESTS = REGISTRY.counter(
+    "voice_tts_provider_requests_total",
+    "TTS provider requests by result (ok, error, abandoned)",
+    ["provider", "result"]
+)
+HEDGES = REGISTRY.counter(
+    "voice_tts_hedges_total",
+    "Hedged TTS requests by provider that won",
+    ["winner"]
+)
+
+# Returns a fresh async iterator of audio bytes for one request
+StreamFactory = Callable[[], AsyncIterator[bytes]]
+
+
+async def _first_chunk(stream: AsyncIterator[bytes]) -> Optional[bytes]:
+    try:
+        return await stream.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class ProviderStats:
+    """Rolling first-byte latency and outcome window for one provider"""
+
+    def __init__(self, window: int = 100):
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)  # True = ok, False = error
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+
+    def record_latency(self, seconds: float):
+        self.latencies.append(seconds)
+
+    def record_success(self):
+        self.outcomes.append(True)
+        self.consecutive_failures = 0
+
+    def record_failure(self):
+        self.outcomes.append(False)
+        self.consecutive_failures += 1
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        return _percentile(sorted(self.latencies), fraction)
+
+    def snapshot(self) -> dict:
+        p50, p95 = self.percentile(0.5), self.percentile(0.95)
+        return {
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "error_rate": round(self.error_rate, 3),
+            "samples": len(self.latencies),
+            "cooling_down": self.cooldown_until > time.monotonic(),
+        }
+
+
+class TTSRouter:
+    """
+    Chooses and races TTS providers. ``providers`` is the preference order
+    used while there is no latency data (and to break ties). Providers in
+    ``last_resort`` (e.g. a local engine) are only used once the others have
+    failed, however fast they are, and are never hedged to.
+    """
+
+    def __init__(self, providers: List[str], hedge_after: float = 0.0, window: int = 100,
+                 fail_max: int = 5, max_error_rate: float = 0.5, min_samples: int = 10,
+                 cooldown: float = 60.0, last_resort: Iterable[str] = ()):
+        self.providers = list(providers)
+        self.last_resort = set(last_resort)
+        self.hedge_after = hedge_after
+        self.fail_max = fail_max
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        self.cooldown = cooldown
+        self.stats: Dict[str, ProviderStats] = {name: ProviderStats(window) for name in self.providers}
+
+    def healthy(self, name: str) -> bool:
+        return self.stats[name].cooldown_until <= time.monotonic()
+
+    def rank(self, available: List[str]) -> List[str]:
+        """Healthy before cooling down, then fastest p50; unmeasured providers keep preference order"""
+        def key(name):
+            p50 = self.stats[name].percentile(0.5)
+            return (name in self.last_resort, not self.healthy(name), p50 is None, p50 or 0.0,
+                    self.providers.index(name))
+        return sorted((name for name in self.providers if name in available), key=key)
+
+    def preferred(self, available: List[str]) -> Optional[str]:
+        """The provider ``rank`` puts first with no latency or failure data"""
+        names = [name for name in self.providers if name in available]
+        names.sort(key=lambda name: name in self.last_resort)
+        return names[0] if names else None
+
+    def _failed(self, name: str):
+        stats = self.stats[name]
+        stats.record_failure()
+        PROVIDER_REQUESTS.inc(provider=name, result="error")
+        too_many = stats.consecutive_failures >= self.fail_max
+        error_rate_high = len(stats.outcomes) >= self.min_samples and stats.error_rate > self.max_error_rate
+        if too_many or error_rate_high:
+            stats.cooldown_until = time.monotonic() + self.cooldown
+            stats.outcomes.clear()
+            print(f"⚠️ TTS provider {name} unhealthy (error rate {stats.error_rate:.0%}, "
+                  f"{stats.consecutive_failures} consecutive failures); cooling down {self.cooldown:.0f}s")
+
+    async def stream(self, factories: Dict[str, StreamFactory]) -> AsyncIterator[Tuple[str, bytes]]:
+        """
+        Yield (provider, chunk) from the best provider in ``factories``.
+        Once a provider has produced audio the request is committed to it;
+        a failure after that point is raised rather than restarting the
+        sentence elsewhere. Yields nothing if every provider failed.
+        """
+        candidates = self.rank(list(factories))
+        pending: Dict[asyncio.Future, Tuple[str, AsyncIterator[bytes], float]] = {}
+
+        def start(name: str):
+            stream = factories[name]()
+            task = asyncio.create_task(_first_chunk(stream))
+            pending[task] = (name, stream, time.perf_counter())
+
+        winner = None
+        hedged = False
+        try:
+            while winner is None:
+                if not pending:
+                    if not candidates:
+                        return
+                    start(candidates.pop(0))
+                hedge = self.hedge_after if candidates and candidates[0] not in self.last_resort else None
+                done, _ = await asyncio.wait(pending, timeout=hedge or None,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    name = candidates[0]
+                    print(f"⏱️ No TTS audio after {self.hedge_after * 1000:.0f} ms; hedging with {name}")
+                    start(candidates.pop(0))
+                    hedged = True
+                    continue
+                for task in done:
+                    name, stream, started = pending.pop(task)
+                    try:
+                        first_chunk = task.result()
+                    except Exception as e:
+                        print(f"❌ TTS provider {name} error: {e}")
+                        self._failed(name)
+                        continue
+                    if first_chunk is None:
+                        print(f"⚠️ TTS provider {name} returned no audio")
+                        self._failed(name)
+                        continue
+                    if winner is None:
+                        winner = (name, stream, time.perf_counter() - started, first_chunk)
+                    else:
+                        pending[task] = (name, stream, started)  # Lost a same-tick race
+        finally:
+            await self._abandon(pending, lost=winner is not None)
+
+        name, stream, latency, first_chunk = winner
+        self.stats[name].record_latency(latency)
+        FIRST_BYTE_SECONDS.observe(latency, provider=name)
+        if hedged:
+            HEDGES.inc(winner=name)
+
+        try:
+            yield name, first_chunk
+            async for chunk in stream:
+                yield name, chunk
+        except Exception:
+            self._failed(name)
+            raise
+        finally:
+            await stream.aclose()
+        self.stats[name].record_success()
+        PROVIDER_REQUESTS.inc(provider=name, result="ok")
+
+    async def _abandon(self, pending: dict, lost: bool):
+        """Cancel requests that lost a hedge race (or were interrupted) and close their streams"""
+        for task, (name, stream, started) in list(pending.items()):
+            task.cancel()
+            await asyncio.wait([task])
+            if not task.cancelled():
+                task.exception()  # Mark as retrieved; the outcome no longer matters
+            await stream.aclose()
+            if lost:
+                # The loser's latency is only known to exceed this; recording the lower
+                # bound keeps a slow provider's percentiles from looking better than they are
+                self.stats[name].record_latency(time.perf_counter() - started)
+            PROVIDER_REQUESTS.inc(provider=name, result="abandoned")
+        pending.clear()
+
+    def snapshot(self) -> dict:
+        return {name: self.stats[name].snapshot() for name in self.providers}
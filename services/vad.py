@@ -0,0 +1,352 @@
+"""
+Voice activity detection
+Silero VAD, run either from the bundled ONNX model with onnxruntime or as the
+torch.hub JIT model, with a streaming front end (VADStream) that keeps state
+per connection, and server-side endpointing of streamed PCM
+(StreamingAudioSession). Without a loaded model, streams fall back to a
+simple energy detector.
+"""
+
+import threading
+from typing import Iterator, NamedTuple, Optional
+
+import numpy as np
+
+from utils.audio_buffer import PCMRingBuffer, segment_views
+
+
+class SpeechEvent(NamedTuple):
+    """Speech boundary emitted by VADStream (absolute sample indices, padded)"""
+    kind: str                  # "start", "end", or "pause" / "resume" (see VADStream)
+    start: int
+    end: Optional[int] = None  # Only set on "end" and "pause" events
+
+
+class TorchHubVADBackend:
+    """Silero JIT model loaded through torch.hub (needs network or a warm hub cache)"""
+
+    # Model attributes that hold the RNN state between calls
+    _STATE_ATTRS = ("_state", "_context", "_last_sr", "_last_batch_size")
+
+    def __init__(self, sample_rate: int = 16000):
+        self.sample_rate = sample_rate
+        self.model = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        import torch
+
+        self.model, _ = torch.hub.load(
+            repo_or_dir='snakers4/silero-vad',
+            model='silero_vad',
+            force_reload=False,
+            onnx=False
+        )
+
+    def infer(self, window: np.ndarray, state):
+        import torch
+
+        # The JIT model keeps its RNN state internally, so it is swapped in
+        # and out under a lock to let many streams share one model
+        with self._lock:
+            if state is None:
+                self.model.reset_states()
+            else:
+                for attr, value in state.items():
+                    setattr(self.model, attr, value)
+            prob = self.model(torch.from_numpy(window), self.sample_rate).item()
+            new_state = {
+                attr: getattr(self.model, attr)
+                for attr in self._STATE_ATTRS if hasattr(self.model, attr)
+            }
+        return prob, new_state
+
+
+class OnnxVADBackend:
+    """Bundled Silero ONNX model run with onnxruntime (no network, no torch)"""
+
+    CONTEXT_SAMPLES = 64  # Silero v5 prepends the tail of the previous window at 16 kHz
+
+    def __init__(self, model_path: str, num_threads: int = 1, sample_rate: int = 16000):
+        self.model_path = model_path
+        self.num_threads = num_threads
+        self.sample_rate = sample_rate
+        self.model = None
+        self._sr = np.array(sample_rate, dtype=np.int64)
+
+    def load(self):
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = self.num_threads
+        options.inter_op_num_threads = 1
+        self.model = onnxruntime.InferenceSession(
+            self.model_path,
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+
+    def infer(self, window: np.ndarray, state):
+        # State is passed explicitly, so no lock is needed around the session
+        if state is None:
+            rnn_state = np.zeros((2, 1, 128), dtype=np.float32)
+            context = np.zeros(self.CONTEXT_SAMPLES, dtype=np.float32)
+        else:
+            rnn_state, context = state
+        x = np.concatenate((context, window))[np.newaxis, :]
+        output, rnn_state = self.model.run(None, {"input": x, "state": rnn_state, "sr": self._sr})
+        return float(output[0][0]), (rnn_state, x[0, -self.CONTEXT_SAMPLES:])
+
+
+class SileroVAD:
+    """Silero VAD for voice activity detection"""
+
+    BACKENDS = ("onnx", "torch")
+    
+    def __init__(self, backend: str = "onnx", onnx_model_path: str = None, num_threads: int = 1):
+        self.model = None
+        self.sample_rate = 16000
+        self.threshold = 0.5
+        self.window_size_samples = 512
+        self.min_speech_duration_ms = 600
+        self.min_silence_duration_ms = 1200
+        self.speech_pad_ms = 150
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown VAD backend '{backend}', expected one of {self.BACKENDS}")
+        self.backend_name = backend
+        if backend == "onnx":
+            self.backend = OnnxVADBackend(onnx_model_path, num_threads, self.sample_rate)
+        else:
+            self.backend = TorchHubVADBackend(self.sample_rate)
+    
+    def load_model(self):
+        """Load Silero VAD model"""
+        try:
+            print(f"🎤 Loading Silero VAD model ({self.backend_name})...")
+            self.backend.load()
+            self.model = self.backend.model
+            print("✅ Silero VAD loaded successfully")
+            return True
+        except Exception as e:
+            print(f"❌ Failed to load Silero VAD: {e}")
+            return False
+    
+    def open_stream(self) -> "VADStream":
+        """Open a streaming VAD with its own model state (one per connection)"""
+        return VADStream(self)
+    
+    def infer(self, window: np.ndarray, state):
+        """
+        Speech probability for one 512-sample float32 window.
+        ``state`` is the caller's RNN state (None for a fresh stream); the
+        updated state is returned alongside the probability.
+        """
+        return self.backend.infer(window, state)
+    
+    def detect_speech(self, samples: np.ndarray) -> list:
+        """Detect speech segments in float32 samples"""
+        if self.model is None:
+            return []
+        
+        try:
+            total = len(samples)
+            min_speech = self.min_speech_duration_ms * self.sample_rate // 1000
+            stream = self.open_stream()
+            speech_timestamps = []
+            for event in stream.feed(samples):
+                if event.kind == "end" and event.end - event.start >= min_speech:
+                    speech_timestamps.append({"start": event.start, "end": min(event.end, total)})
+            if stream.triggered and total - stream.speech_start >= min_speech:
+                speech_timestamps.append({"start": stream.speech_start, "end": total})
+            return speech_timestamps
+        except Exception as e:
+            print(f"❌ VAD detection error: {e}")
+            return []
+    
+    def extract_speech_segments(self, samples: np.ndarray, source: Optional[np.ndarray] = None) -> list:
+        """
+        Speech parts of ``source`` (default: ``samples``) as a list of views,
+        found by running VAD on the float32 ``samples``. Nothing is copied;
+        encode_wav joins them when the audio is uploaded.
+        """
+        speech_timestamps = self.detect_speech(samples)
+        
+        if not speech_timestamps:
+            print("⚠️ No speech detected in audio")
+            return []
+        
+        segments = segment_views(samples if source is None else source, speech_timestamps)
+        duration = sum(len(segment) for segment in segments) / self.sample_rate
+        print(f"✅ Extracted {len(segments)} speech segments, total duration: {duration:.2f}s")
+        return segments
+
+
+class VADStream:
+    """
+    Streaming VAD for one connection.
+
+    Keeps its own RNN state and window remainder, so audio can be pushed in
+    arbitrarily sized pieces as it arrives while many streams share one
+    SileroVAD model. ``feed`` yields SpeechEvent("start") as soon as speech
+    begins and SpeechEvent("end") once it has been followed by enough silence.
+    With ``pause_silence`` set, a shorter silence first yields
+    SpeechEvent("pause") with the same bounds the "end" event would have, and
+    SpeechEvent("resume") if speech then continues instead.
+    Without a loaded model it falls back to a simple RMS energy detector.
+    """
+
+    ENERGY_THRESHOLD = 0.01
+
+    def __init__(self, vad: Optional[SileroVAD]):
+        self.vad = vad
+        self.sample_rate = vad.sample_rate if vad else 16000
+        self.window_size = vad.window_size_samples if vad else 512
+        self.threshold = vad.threshold if vad else 0.5
+        self.min_silence = (vad.min_silence_duration_ms if vad else 1200) * self.sample_rate // 1000
+        self.speech_pad = (vad.speech_pad_ms if vad else 150) * self.sample_rate // 1000
+        self.pause_silence = None  # Samples of silence before a "pause" event; None = no pause events
+        self._window = np.zeros(self.window_size, dtype=np.float32)
+        self.reset()
+
+    def reset(self):
+        """Forget all state; sample positions restart at zero"""
+        self.position = 0
+        self._state = None
+        self._pending = 0
+        self.triggered = False
+        self.speech_start = None
+        self._silence_start = None
+        self._paused = False
+
+    def end_speech(self):
+        """Drop the current speech segment (e.g. after a client-forced endpoint)"""
+        self.triggered = False
+        self.speech_start = None
+        self._silence_start = None
+        self._paused = False
+
+    def _score(self, window: np.ndarray) -> float:
+        if self.vad is not None and self.vad.model is not None:
+            prob, self._state = self.vad.infer(window, self._state)
+            return prob
+        return 1.0 if float(np.sqrt(np.mean(window * window))) >= self.ENERGY_THRESHOLD else 0.0
+
+    def _process_window(self, window_end: int) -> Optional[SpeechEvent]:
+        prob = self._score(self._window)
+
+        if prob >= self.threshold:
+            self._silence_start = None
+            if not self.triggered:
+                self.triggered = True
+                self.speech_start = max(0, window_end - self.window_size - self.speech_pad)
+                return SpeechEvent("start", self.speech_start)
+            if self._paused:
+                self._paused = False
+                return SpeechEvent("resume", self.speech_start)
+            return None
+
+        # Hysteresis: once in speech, only drop out well below the threshold
+        if self.triggered and prob < self.threshold - 0.15:
+            if self._silence_start is None:
+                self._silence_start = window_end - self.window_size
+            if window_end - self._silence_start >= self.min_silence:
+                event = SpeechEvent("end", self.speech_start, self._silence_start + self.speech_pad)
+                self.end_speech()
+                return event
+            if (self.pause_silence is not None and not self._paused
+                    and window_end - self._silence_start >= self.pause_silence):
+                self._paused = True
+                return SpeechEvent("pause", self.speech_start, self._silence_start + self.speech_pad)
+        return None
+
+    def feed(self, samples: np.ndarray) -> Iterator[SpeechEvent]:
+        """Push float32 samples in [-1, 1]; yields speech events as windows complete"""
+        offset = 0
+        total = len(samples)
+        while offset < total:
+            take = min(self.window_size - self._pending, total - offset)
+            self._window[self._pending:self._pending + take] = samples[offset:offset + take]
+            self._pending += take
+            offset += take
+            self.position += take
+
+            if self._pending == self.window_size:
+                self._pending = 0
+                event = self._process_window(self.position)
+                if event is not None:
+                    yield event
+
+
+class StreamingAudioSession:
+    """
+    Per-connection ingestion of streamed PCM chunks with server-side endpointing.
+    ``vad`` is the shared SileroVAD (None: energy detection only).
+
+    Chunks are written into a ring buffer and pushed through the connection's
+    VADStream as they arrive. Once speech has been followed by enough silence,
+    the utterance is returned from ``feed`` so the caller can dispatch it
+    immediately.
+
+    With ``pause_ms`` set, a shorter pause in the speech leaves the utterance
+    so far in ``pause_utterance`` (for a speculative reply), and
+    ``speech_resumed`` is set if the user then keeps talking.
+    """
+
+    MAX_UTTERANCE_SECONDS = 30
+
+    def __init__(self, client_id: str, vad: Optional[SileroVAD] = None, sample_rate: int = 16000,
+                 pause_ms: Optional[int] = None):
+        self.client_id = client_id
+        self.sample_rate = sample_rate
+        self.buffer = PCMRingBuffer(sample_rate * self.MAX_UTTERANCE_SECONDS)
+        self.vad_stream = vad.open_stream() if vad else VADStream(None)
+        self.min_speech = (vad.min_speech_duration_ms if vad else 600) * sample_rate // 1000
+        if pause_ms:
+            # The pause utterance must already be fully buffered, trailing pad included
+            self.vad_stream.pause_silence = max(pause_ms * sample_rate // 1000, self.vad_stream.speech_pad)
+        self.pause_utterance = None
+        self.speech_resumed = False
+
+    def feed(self, payload, end_of_utterance: bool = False):
+        """
+        Add a PCM chunk. Returns the utterance as int16 samples once
+        end-of-speech is detected (or forced by the client), otherwise None.
+        """
+        samples = np.frombuffer(payload, dtype=np.int16)
+        self.buffer.write(samples)
+
+        utterance = None
+        for event in self.vad_stream.feed(samples.astype(np.float32) / 32768.0):
+            if event.kind == "end":
+                utterance = self._take_utterance(event.start, event.end)
+            elif event.kind == "pause" and event.end - event.start >= self.min_speech:
+                self.pause_utterance = self.buffer.read(event.start, event.end)
+            elif event.kind == "resume":
+                self.pause_utterance = None
+                self.speech_resumed = True
+
+        if utterance is None and self.vad_stream.triggered:
+            speech_start = self.vad_stream.speech_start
+            if end_of_utterance or self.buffer.end - speech_start >= self.buffer.capacity:
+                self.vad_stream.end_speech()
+                utterance = self._take_utterance(speech_start, self.buffer.end)
+        return utterance
+
+    def _take_utterance(self, start: int, end: int):
+        if end - start < self.min_speech:
+            print(f"[{self.client_id}] ⚠️ Speech too short ({(end - start) / self.sample_rate:.2f}s), ignoring")
+            return None
+
+        utterance = self.buffer.read(start, end)
+        print(f"[{self.client_id}] ✂️ Endpoint detected: {len(utterance) / self.sample_rate:.2f}s utterance")
+        return utterance
+
+    def take_pause_utterance(self):
+        utterance, self.pause_utterance = self.pause_utterance, None
+        return utterance
+
+    def reset(self):
+        self.buffer.clear()
+        self.vad_stream.reset()
+        self.pause_utterance = None
+        self.speech_resumed = False
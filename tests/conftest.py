@@ -0,0 +1,9 @@
+"""
+Shared test setup. Importing ``utils`` or ``services`` pulls in the database
+module, which refuses to start without DATABASE_URL outside development, so
+the tests run against an in-memory SQLite URL unless one is configured.
+"""
+import os
+
+os.environ.setdefault("ENVIRONMENT", "development")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
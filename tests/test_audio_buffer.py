@@ -0,0 +1,98 @@
+import io
+import wave
+
+import numpy as np
+
+from utils.audio_buffer import (
+    PCM16, WAV_HEADER, PCMRingBuffer, encode_wav, float32_to_pcm16, pcm16_to_float32, segment_views
+)
+
+
+def samples(start: int, end: int) -> np.ndarray:
+    return np.arange(start, end, dtype=np.int16)
+
+
+def test_reads_use_absolute_positions_across_wrap_around():
+    buffer = PCMRingBuffer(8)
+    buffer.write(samples(0, 6))
+    buffer.write(samples(6, 11))  # Wraps: slots 6, 7, then 0..2
+
+    assert (buffer.start, buffer.end, len(buffer)) == (3, 11, 8)
+    np.testing.assert_array_equal(buffer.read(3, 11), samples(3, 11))
+    np.testing.assert_array_equal(buffer.read(5, 9), samples(5, 9))
+
+
+def test_overwritten_samples_are_clipped_from_reads():
+    buffer = PCMRingBuffer(8)
+    for start in range(0, 20, 3):
+        buffer.write(samples(start, start + 3))
+
+    assert buffer.start == 13
+    np.testing.assert_array_equal(buffer.read(0, 100), samples(13, 21))
+    assert len(buffer.read(2, 10)) == 0
+
+
+def test_write_larger_than_capacity_keeps_the_newest_samples():
+    buffer = PCMRingBuffer(4)
+    buffer.write(samples(0, 2))
+    buffer.write(samples(2, 12))
+
+    assert buffer.end == 12
+    np.testing.assert_array_equal(buffer.read(0, 12), samples(8, 12))
+
+
+def test_reads_are_copies():
+    buffer = PCMRingBuffer(4)
+    buffer.write(samples(0, 4))
+    chunk = buffer.read(0, 4)
+    buffer.write(samples(10, 14))
+    np.testing.assert_array_equal(chunk, samples(0, 4))
+
+
+def test_clear_restarts_positions():
+    buffer = PCMRingBuffer(4)
+    buffer.write(samples(0, 3))
+    buffer.clear()
+    assert (buffer.start, buffer.end, len(buffer)) == (0, 0, 0)
+    buffer.write(samples(5, 7))
+    np.testing.assert_array_equal(buffer.read(0, 2), samples(5, 7))
+
+
+def test_float32_to_pcm16_clips_instead_of_wrapping():
+    floats = np.array([-2.0, -1.0, -0.5, 0.0, 0.5, 1.0, 2.0], dtype=np.float32)
+    pcm = float32_to_pcm16(floats.copy())
+    np.testing.assert_array_equal(pcm, [-32768, -32768, -16384, 0, 16384, 32767, 32767])
+    assert pcm.dtype == PCM16
+
+
+def test_pcm16_round_trip_into_preallocated_arrays():
+    pcm = np.array([-32768, -1, 0, 1, 12345, 32767], dtype=np.int16)
+    floats = np.empty(len(pcm), dtype=np.float32)
+    assert pcm16_to_float32(pcm, out=floats) is floats
+    assert floats.min() >= -1.0 and floats.max() < 1.0
+
+    out = np.empty(len(pcm), dtype=PCM16)
+    assert float32_to_pcm16(floats, out=out) is out
+    np.testing.assert_array_equal(out, pcm)
+
+
+def test_segment_views_share_memory():
+    pcm = samples(0, 100)
+    views = segment_views(pcm, [{"start": 10, "end": 20}, {"start": 50, "end": 55}])
+    assert [len(view) for view in views] == [10, 5]
+    assert all(np.shares_memory(view, pcm) for view in views)
+
+
+def test_encode_wav_matches_the_wave_module():
+    pcm = samples(-500, 500)
+    segments = segment_views(pcm, [{"start": 0, "end": 300}, {"start": 600, "end": 1000}])
+
+    expected = io.BytesIO()
+    with wave.open(expected, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(16000)
+        wav_file.writeframes(np.concatenate(segments).astype("<i2").tobytes())
+
+    assert encode_wav(segments, 16000) == expected.getvalue()
+    assert len(encode_wav([], 16000)) == WAV_HEADER.size
@@ -0,0 +1,62 @@
+import pytest
+
+from utils.audio_frames import (
+    CODEC_MP3, CODEC_OPUS, CODEC_PCM16, FLAG_END_OF_UTTERANCE, FRAME_HEADER, KIND_AUDIO_CHUNK,
+    KIND_AUDIO_UTTERANCE, FrameError, build_frame, check_input_codec, parse_frame
+)
+
+
+def test_frame_round_trip():
+    payload = bytes(range(256)) * 4
+    frame = build_frame(KIND_AUDIO_CHUNK, payload, CODEC_PCM16, sequence=0xFFFFFFFF,
+                        flags=FLAG_END_OF_UTTERANCE)
+    assert len(frame) == FRAME_HEADER.size + len(payload)
+
+    parsed = parse_frame(frame)
+    assert (parsed.kind, parsed.codec, parsed.flags, parsed.sequence) == (
+        KIND_AUDIO_CHUNK, CODEC_PCM16, FLAG_END_OF_UTTERANCE, 0xFFFFFFFF
+    )
+    assert parsed.codec_name == "pcm16"
+    assert bytes(parsed.payload) == payload
+
+
+def test_payload_is_a_view_into_the_frame():
+    frame = bytearray(build_frame(KIND_AUDIO_UTTERANCE, b"\x01\x02", CODEC_OPUS))
+    parsed = parse_frame(frame)
+    frame[-1] = 0x7F
+    assert bytes(parsed.payload) == b"\x01\x7f"
+
+
+def test_header_only_frame_has_an_empty_payload():
+    parsed = parse_frame(build_frame(KIND_AUDIO_CHUNK, b"", flags=FLAG_END_OF_UTTERANCE))
+    assert parsed.payload.nbytes == 0
+
+
+@pytest.mark.parametrize("data, message", [
+    (b"VC\x01", "too short"),
+    (b"XX" + build_frame(KIND_AUDIO_CHUNK, b"")[2:], "magic"),
+    (b"VC\x02" + build_frame(KIND_AUDIO_CHUNK, b"")[3:], "version"),
+    (build_frame(KIND_AUDIO_CHUNK, b"", codec=99), "codec"),
+])
+def test_invalid_frames_are_rejected(data, message):
+    with pytest.raises(FrameError, match=message):
+        parse_frame(data)
+
+
+@pytest.mark.parametrize("kind, codec", [
+    (KIND_AUDIO_UTTERANCE, CODEC_PCM16),
+    (KIND_AUDIO_UTTERANCE, CODEC_OPUS),
+    (KIND_AUDIO_CHUNK, CODEC_PCM16),
+])
+def test_accepted_input_codecs(kind, codec):
+    check_input_codec(parse_frame(build_frame(kind, b"\x00\x00", codec)))
+
+
+@pytest.mark.parametrize("kind, codec, message", [
+    (KIND_AUDIO_CHUNK, CODEC_OPUS, "streamed chunks: opus"),
+    (KIND_AUDIO_UTTERANCE, CODEC_MP3, "Unsupported audio codec: mp3"),
+])
+def test_rejected_input_codecs(kind, codec, message):
+    # An even-length Opus chunk would otherwise be read as PCM samples
+    with pytest.raises(FrameError, match=message):
+        check_input_codec(parse_frame(build_frame(kind, b"\x1a\x45\xdf\xa3", codec)))
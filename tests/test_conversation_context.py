@@ -0,0 +1,114 @@
+import asyncio
+
+from services.conversation_context import SUMMARY_PREFIX, ConversationContext
+
+TURN = "word " * 40
+
+
+def fill(context, turns, start=0):
+    for index in range(start, start + turns):
+        context.append("user", f"{index} {TURN}")
+        context.append("assistant", f"reply {index} {TURN}")
+
+
+def context_over_budget(keep_turns=2):
+    """Five exchanges against a budget that three of them exactly fill"""
+    context = ConversationContext("system", token_budget=0, keep_turns=keep_turns)
+    fill(context, 3)
+    context.token_budget = context.tokens
+    fill(context, 2, start=3)
+    return context
+
+
+def test_messages_start_with_the_system_prompt():
+    context = ConversationContext("You are a manager.")
+    context.append("user", "Hi")
+    context.append("assistant", "Hello.")
+    assert context.messages("How are you?") == [
+        {"role": "system", "content": "You are a manager."},
+        {"role": "user", "content": "Hi"},
+        {"role": "assistant", "content": "Hello."},
+        {"role": "user", "content": "How are you?"},
+    ]
+    assert context.last == {"role": "assistant", "content": "Hello."}
+    assert len(context.turns) == 2  # The new user message is not recorded
+
+
+def test_over_budget_history_is_folded_into_a_summary():
+    calls = []
+
+    async def summarize(previous, messages):
+        calls.append((previous, [message["content"] for message in messages]))
+        return "They discussed the first turns."
+
+    async def run():
+        context = ConversationContext("system", token_budget=0, keep_turns=2)
+        fill(context, 3)
+        context.token_budget = context.tokens
+        context.maybe_summarize(summarize)
+        assert context._summary_task is None  # Within budget
+
+        fill(context, 2, start=3)
+        version = context.version
+        context.maybe_summarize(summarize)
+        await context._summary_task
+        return context, version
+
+    context, version = asyncio.run(run())
+    assert len(calls) == 1
+    previous, folded = calls[0]
+    assert previous == ""
+    assert len(folded) == 6  # Everything before the last two user turns
+    assert [turn["role"] for turn in context.turns] == ["user", "assistant"] * 2
+    assert context.turns[0]["content"].startswith("3 ")
+    assert context.summary == "They discussed the first turns."
+    assert context.messages()[1] == {"role": "system", "content": SUMMARY_PREFIX + context.summary}
+    assert context.version == version  # Folding doesn't change what was said
+    assert context.tokens < context.token_budget
+
+
+def test_failed_summary_keeps_turns_verbatim():
+    async def summarize(previous, messages):
+        raise RuntimeError("rate limited")
+
+    async def run():
+        context = context_over_budget()
+        context.maybe_summarize(summarize)
+        await context._summary_task
+        return context
+
+    context = asyncio.run(run())
+    assert len(context.turns) == 10
+    assert context.summary == ""
+
+
+def test_history_is_dropped_at_twice_the_budget():
+    context = ConversationContext("system", token_budget=0, keep_turns=1)
+    fill(context, 1)
+    context.token_budget = context.tokens * 2
+    fill(context, 9, start=1)
+    assert context.tokens <= 2 * context.token_budget
+    assert len(context.turns) < 20
+    assert context.turns[-1]["content"].startswith("reply 9 ")
+    assert context.version == 20
+
+
+def test_close_cancels_a_pending_summary():
+    async def run():
+        started = asyncio.Event()
+
+        async def summarize(previous, messages):
+            started.set()
+            await asyncio.sleep(60)
+            return "never"
+
+        context = context_over_budget()
+        context.maybe_summarize(summarize)
+        await started.wait()
+        context.close()
+        await asyncio.wait([context._summary_task])
+        return context
+
+    context = asyncio.run(run())
+    assert context._summary_task.cancelled()
+    assert context.summary == ""
@@ -0,0 +1,47 @@
+from utils import stt_cache
+from utils.stt_cache import STTCache, audio_fingerprint, make_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def key(name: str, client_id: str = "client"):
+    return make_key(client_id, "gpt-4o-transcribe", "en", audio_fingerprint(name.encode()))
+
+
+def test_key_depends_on_session_and_audio():
+    assert key("a") == key("a")
+    assert key("a") != key("b")
+    assert key("a") != key("a", client_id="other")
+    assert audio_fingerprint(memoryview(b"pcm")) == audio_fingerprint(b"pcm")
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(stt_cache.time, "monotonic", clock)
+    cache = STTCache(max_entries=4, ttl=30.0)
+    cache.put(key("a"), "hello")
+
+    clock.now += 29.9
+    assert cache.get(key("a")) == "hello"
+    clock.now += 0.1
+    assert cache.get(key("a")) is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = STTCache(max_entries=2, ttl=300.0)
+    cache.put(key("a"), "first")
+    cache.put(key("b"), "second")
+    assert cache.get(key("a")) == "first"  # "b" is now least recently used
+    cache.put(key("c"), "third")
+
+    assert cache.get(key("b")) is None
+    assert cache.get(key("a")) == "first"
+    assert cache.get(key("c")) == "third"
+    assert cache.stats()["entries"] == 2
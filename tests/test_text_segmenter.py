@@ -0,0 +1,92 @@
+import pytest
+
+from utils.text_segmenter import SegmentationPolicy, SentenceSegmenter
+
+# Every sentence boundary is eligible: isolates boundary detection from chunk sizing
+EAGER = SegmentationPolicy(first_min_chars=1, min_chars=1, first_clause_split=False)
+
+
+def segment(tokens, policy=EAGER):
+    segmenter = SentenceSegmenter(policy)
+    chunks = []
+    for token in tokens:
+        chunks.extend(segmenter.push(token))
+    rest = segmenter.flush()
+    if rest:
+        chunks.append(rest)
+    return chunks
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Hello there. How are you?", ["Hello there.", "How are you?"]),
+    ("Talk to Dr. Smith about it. Then call me.", ["Talk to Dr. Smith about it.", "Then call me."]),
+    ("Bring snacks, e.g. fruit. Thanks.", ["Bring snacks, e.g. fruit.", "Thanks."]),
+    ("Ask J. Smith first. Then go.", ["Ask J. Smith first.", "Then go."]),
+    ("The U.S. team won. Great news.", ["The U.S. team won.", "Great news."]),
+    ("It grew 3.5 percent. Good.", ["It grew 3.5 percent.", "Good."]),
+    ("1. First item\n2. Second item", ["1. First item", "2. Second item"]),
+    ("Wait! What?! No.", ["Wait!", "What?!", "No."]),
+    ('He said "stop." Then left.', ['He said "stop."', "Then left."]),
+])
+def test_sentence_boundaries(text, expected):
+    assert segment([text]) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "Talk to Dr. Smith about it. Then call me.",
+    "It grew 3.5 percent. The U.S. team won.",
+])
+def test_tokenization_does_not_change_chunks(text):
+    assert segment(list(text)) == segment([text])
+
+
+def test_terminator_at_end_of_buffer_waits_for_more_text():
+    segmenter = SentenceSegmenter(EAGER)
+    assert segmenter.push("It costs 3.") == []
+    assert segmenter.push("5 dollars. Fine") == ["It costs 3.5 dollars."]
+    assert segmenter.flush() == "Fine"
+
+
+def test_first_chunk_splits_at_a_clause():
+    policy = SegmentationPolicy(first_min_chars=10, min_chars=60)
+    chunks = segment(["Well, that is interesting, tell me more about the plan. It sounds good."], policy)
+    assert chunks == ["Well, that is interesting,", "tell me more about the plan. It sounds good."]
+
+
+def test_clause_split_can_be_disabled():
+    policy = SegmentationPolicy(first_min_chars=10, min_chars=60, first_clause_split=False)
+    chunks = segment(["Well, that is interesting, tell me more. Ok."], policy)
+    assert chunks == ["Well, that is interesting, tell me more.", "Ok."]
+
+
+def test_later_chunks_gather_sentences_up_to_min_chars():
+    policy = SegmentationPolicy(first_min_chars=1, min_chars=30, first_clause_split=False)
+    chunks = segment(["Hi. One two. Three four. Five six seven eight. Nine."], policy)
+    assert chunks == ["Hi.", "One two. Three four. Five six seven eight.", "Nine."]
+
+
+def test_force_split_at_max_chars_falls_back_to_word_boundaries():
+    policy = SegmentationPolicy(first_max_chars=40, max_chars=60)
+    chunks = segment(["word " * 30], policy)
+    assert chunks[0] == " ".join(["word"] * 8)
+    assert all(len(chunk) <= 60 for chunk in chunks[1:])
+    assert " ".join(chunks).split() == ["word"] * 30
+
+
+def test_force_split_prefers_the_last_sentence_boundary():
+    # "Okay." is under first_min_chars, so it only becomes a chunk at the limit,
+    # where it wins over the later clause and word boundaries
+    policy = SegmentationPolicy(first_min_chars=20, first_max_chars=30, first_clause_split=False)
+    assert segment(["Okay. Then we go on, and on and on"], policy)[0] == "Okay."
+
+
+def test_flush_and_reset_start_a_new_reply():
+    policy = SegmentationPolicy(first_min_chars=10)
+    segmenter = SentenceSegmenter(policy)
+    segmenter.push("Sure thing. ")
+    assert segmenter.flush() == ""
+    assert segmenter.push("Again, from the top. ") == ["Again, from the top."]
+    segmenter.push("half a sentence")
+    segmenter.reset()
+    assert segmenter.pending == ""
+    assert segmenter.push("Well, hello there, friend. ") == ["Well, hello there,"]
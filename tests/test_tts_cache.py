@@ -0,0 +1,60 @@
+from utils.audio_frames import CODEC_MP3, CODEC_WAV
+from utils.tts_cache import TTSCache, make_key
+
+
+def key(text, voice="voice"):
+    return make_key("openai", voice, "tts-1", {}, "mp3", text)
+
+
+def test_key_ignores_whitespace_but_not_voice_or_text():
+    assert key("Hello  there.\n") == key("Hello there.")
+    assert key("Hello there.") != key("Hello there!")
+    assert key("Hello there.", voice="other") != key("Hello there.")
+
+
+def test_memory_tier_evicts_least_recently_used_by_size():
+    cache = TTSCache(memory_bytes=10)
+    cache.put(key("a"), CODEC_MP3, b"aaaa")
+    cache.put(key("b"), CODEC_MP3, b"bbbb")
+    assert cache.get(key("a")).data == b"aaaa"  # "b" is now least recently used
+    cache.put(key("c"), CODEC_MP3, b"cccc")
+
+    assert cache.get(key("b")) is None
+    assert cache.get(key("a")).data == b"aaaa"
+    assert cache.get(key("c")).codec == CODEC_MP3
+    assert cache.stats()["memory_bytes"] == 8
+
+
+def test_oversized_and_empty_entries_are_not_cached():
+    cache = TTSCache(memory_bytes=1024, max_entry_bytes=8)
+    cache.put(key("big"), CODEC_MP3, b"x" * 9)
+    cache.put(key("empty"), CODEC_MP3, b"")
+    assert key("big") not in cache
+    assert key("empty") not in cache
+
+
+def test_disk_tier_survives_reopening(tmp_path):
+    cache = TTSCache(memory_bytes=1024, disk_dir=str(tmp_path), disk_bytes=1024 * 1024)
+    cache.put(key("hello"), CODEC_WAV, b"RIFF....WAVE")
+    cache.close()
+
+    reopened = TTSCache(memory_bytes=1024, disk_dir=str(tmp_path), disk_bytes=1024 * 1024)
+    try:
+        entry = reopened.get(key("hello"))
+        assert entry.codec == CODEC_WAV
+        assert entry.data == b"RIFF....WAVE"
+        assert reopened.stats()["memory_entries"] == 1  # Promoted to memory on the disk hit
+    finally:
+        reopened.close()
+
+
+def test_disk_tier_drops_oldest_segment_over_budget(tmp_path):
+    cache = TTSCache(memory_bytes=0, disk_dir=str(tmp_path), disk_bytes=300, segment_bytes=100)
+    try:
+        for index in range(8):
+            cache.put(key(str(index)), CODEC_MP3, bytes([index]) * 60)
+        assert cache.get(key("0")) is None
+        assert cache.get(key("7")).data == bytes([7]) * 60
+        assert cache.stats()["disk_bytes"] <= 300
+    finally:
+        cache.close()
@@ -0,0 +1,84 @@
+import asyncio
+
+from services import tts_router as router_module
+from services.tts_router import TTSRouter
+
+
+def stream_of(*chunks, delay: float = 0.0, error: Exception = None):
+    async def stream():
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        for chunk in chunks:
+            yield chunk
+    return stream
+
+
+async def collect(router, factories):
+    return [item async for item in router.stream(factories)]
+
+
+def test_rank_prefers_healthy_fast_providers():
+    router = TTSRouter(["elevenlabs", "openai", "local"], last_resort=["local"])
+    assert router.rank(["local", "openai", "elevenlabs"]) == ["elevenlabs", "openai", "local"]
+
+    router.stats["elevenlabs"].record_latency(0.8)
+    router.stats["openai"].record_latency(0.2)
+    router.stats["local"].record_latency(0.01)
+    assert router.rank(["elevenlabs", "openai", "local"]) == ["openai", "elevenlabs", "local"]
+    assert router.rank(["elevenlabs"]) == ["elevenlabs"]
+
+
+def test_preferred_ignores_latency_and_health():
+    router = TTSRouter(["elevenlabs", "openai", "local"], last_resort=["local"])
+    router.stats["openai"].record_latency(0.1)
+    router.stats["elevenlabs"].cooldown_until = float("inf")
+    assert router.rank(["elevenlabs", "openai"])[0] == "openai"
+    assert router.preferred(["openai", "elevenlabs"]) == "elevenlabs"
+    assert router.preferred(["local", "openai"]) == "openai"
+    assert router.preferred(["local"]) == "local"
+    assert router.preferred([]) is None
+
+
+def test_failed_provider_falls_back_in_order():
+    router = TTSRouter(["elevenlabs", "openai"])
+    chunks = asyncio.run(collect(router, {
+        "elevenlabs": stream_of(error=RuntimeError("HTTP 500")),
+        "openai": stream_of(b"a", b"b"),
+    }))
+    assert chunks == [("openai", b"a"), ("openai", b"b")]
+    assert router.stats["elevenlabs"].consecutive_failures == 1
+    assert router.stats["openai"].latencies
+
+
+def test_empty_stream_counts_as_failure_and_all_failing_yields_nothing():
+    router = TTSRouter(["elevenlabs", "openai"])
+    chunks = asyncio.run(collect(router, {
+        "elevenlabs": stream_of(),
+        "openai": stream_of(error=RuntimeError("down")),
+    }))
+    assert chunks == []
+    assert not router.stats["elevenlabs"].outcomes[-1]
+
+
+def test_repeated_failures_cool_the_provider_down(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(router_module.time, "monotonic", lambda: now[0])
+    router = TTSRouter(["elevenlabs", "openai"], fail_max=2, cooldown=60.0)
+    for _ in range(2):
+        asyncio.run(collect(router, {"elevenlabs": stream_of(error=RuntimeError("429"))}))
+    assert not router.healthy("elevenlabs")
+    assert router.rank(["elevenlabs", "openai"]) == ["openai", "elevenlabs"]
+
+    now[0] += 60.0
+    assert router.healthy("elevenlabs")
+    assert router.rank(["elevenlabs", "openai"]) == ["elevenlabs", "openai"]
+
+
+def test_hedge_uses_whichever_provider_answers_first():
+    router = TTSRouter(["elevenlabs", "openai"], hedge_after=0.01)
+    chunks = asyncio.run(collect(router, {
+        "elevenlabs": stream_of(b"slow", delay=0.5),
+        "openai": stream_of(b"fast"),
+    }))
+    assert chunks == [("openai", b"fast")]
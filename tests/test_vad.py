@@ -0,0 +1,145 @@
+import os
+
+import numpy as np
+import pytest
+
+from services.vad import SileroVAD, StreamingAudioSession, VADStream
+
+RATE = 16000
+CHUNK = 333  # Deliberately not a divisor of the 512-sample VAD window
+MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "models", "silero_vad.onnx")
+
+
+def noise(seconds: float, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).uniform(-0.1, 0.1, int(seconds * RATE)).astype(np.float32)
+
+
+def silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * RATE), dtype=np.float32)
+
+
+def chunks(samples: np.ndarray, size: int = CHUNK):
+    for start in range(0, len(samples), size):
+        yield samples[start:start + size]
+
+
+def feed_in_chunks(stream: VADStream, samples: np.ndarray):
+    return [event for chunk in chunks(samples) for event in stream.feed(chunk)]
+
+
+def to_pcm16(samples: np.ndarray) -> bytes:
+    return (samples * 32767).astype("<i2").tobytes()
+
+
+def test_energy_stream_reports_start_and_end_of_speech():
+    stream = VADStream(None)
+    audio = np.concatenate((silence(0.5), noise(2.0), silence(1.5)))
+    events = feed_in_chunks(stream, audio)
+
+    assert [event.kind for event in events] == ["start", "end"]
+    start, end = events[1].start, events[1].end
+    speech_start, speech_end = int(0.5 * RATE), int(2.5 * RATE)
+    assert speech_start - stream.window_size - stream.speech_pad <= start <= speech_start
+    assert speech_end <= end <= speech_end + stream.window_size + stream.speech_pad
+    assert events[0].start == start
+    assert not stream.triggered
+
+
+def test_events_do_not_depend_on_chunk_size():
+    audio = np.concatenate((silence(0.3), noise(1.0), silence(1.4), noise(0.8, seed=1), silence(1.4)))
+    whole = list(VADStream(None).feed(audio))
+    assert [event.kind for event in whole] == ["start", "end", "start", "end"]
+    assert feed_in_chunks(VADStream(None), audio) == whole
+
+
+def test_short_pause_yields_pause_then_resume():
+    stream = VADStream(None)
+    stream.pause_silence = int(0.3 * RATE)
+    audio = np.concatenate((noise(1.0), silence(0.5), noise(1.0, seed=1), silence(1.5)))
+    events = feed_in_chunks(stream, audio)
+
+    # The final silence is a pause before it is long enough to end the turn
+    assert [event.kind for event in events] == ["start", "pause", "resume", "pause", "end"]
+    first_pause, last_pause, end = events[1], events[3], events[4]
+    assert first_pause.start == end.start
+    assert first_pause.end < int(1.5 * RATE) < end.end
+    assert last_pause == end._replace(kind="pause")
+
+
+def test_reset_restarts_sample_positions():
+    stream = VADStream(None)
+    feed_in_chunks(stream, noise(0.5))
+    assert stream.triggered
+    stream.reset()
+    assert stream.position == 0 and not stream.triggered
+
+
+@pytest.fixture(scope="module")
+def onnx_vad():
+    pytest.importorskip("onnxruntime")
+    vad = SileroVAD(backend="onnx", onnx_model_path=MODEL_PATH)
+    assert vad.load_model()
+    return vad
+
+
+def test_onnx_streams_keep_separate_state(onnx_vad):
+    first_audio, second_audio = noise(1.0), np.sin(np.arange(RATE) * 0.05).astype(np.float32) * 0.3
+
+    alone = onnx_vad.open_stream()
+    list(alone.feed(first_audio))
+
+    first, second = onnx_vad.open_stream(), onnx_vad.open_stream()
+    for first_chunk, second_chunk in zip(chunks(first_audio), chunks(second_audio)):
+        list(first.feed(first_chunk))
+        list(second.feed(second_chunk))
+
+    for expected, actual in zip(alone._state, first._state):
+        np.testing.assert_allclose(actual, expected, rtol=1e-5, atol=1e-6)
+    assert not np.allclose(first._state[0], second._state[0])
+
+
+def test_onnx_vad_finds_no_speech_in_silence(onnx_vad):
+    assert onnx_vad.detect_speech(silence(2.0)) == []
+    assert feed_in_chunks(onnx_vad.open_stream(), silence(2.0)) == []
+
+
+def test_session_returns_the_utterance_at_the_endpoint():
+    session = StreamingAudioSession("test")
+    speech = noise(2.0)
+    pcm = to_pcm16(np.concatenate((silence(0.5), speech, silence(1.5))))
+
+    utterances = [session.feed(chunk) for chunk in chunks(pcm, CHUNK * 2)]
+    found = [utterance for utterance in utterances if utterance is not None]
+    assert len(found) == 1
+    utterance = found[0]
+    assert utterance.dtype == np.int16
+    # The padded utterance contains all of the speech
+    speech_pcm = np.frombuffer(to_pcm16(speech), dtype="<i2")
+    offset = int(np.flatnonzero(utterance)[0])
+    np.testing.assert_array_equal(utterance[offset:offset + len(speech_pcm)], speech_pcm)
+
+
+def test_session_ignores_speech_that_is_too_short():
+    session = StreamingAudioSession("test")
+    pcm = to_pcm16(np.concatenate((noise(0.2), silence(1.5))))
+    assert all(session.feed(chunk) is None for chunk in chunks(pcm, CHUNK * 2))
+
+
+def test_client_endpoint_flushes_the_current_speech():
+    session = StreamingAudioSession("test")
+    assert session.feed(to_pcm16(noise(1.0))) is None
+    utterance = session.feed(b"", end_of_utterance=True)
+    assert utterance is not None and len(utterance) >= RATE
+    assert not session.vad_stream.triggered
+
+
+def test_session_keeps_the_utterance_at_a_pause():
+    session = StreamingAudioSession("test", pause_ms=300)
+    for chunk in chunks(to_pcm16(np.concatenate((noise(1.0), silence(0.5)))), CHUNK * 2):
+        assert session.feed(chunk) is None
+    paused = session.take_pause_utterance()
+    assert paused is not None and len(paused) >= RATE
+    assert session.take_pause_utterance() is None
+
+    session.feed(to_pcm16(noise(0.5, seed=1)))
+    assert session.speech_resumed
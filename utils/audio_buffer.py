@@ -0,0 +1,129 @@
+"""
+Preallocated PCM buffers and conversions for the audio path
+
+The conversions avoid full-buffer temporaries: int16 <-> float32 scaling is
+done in one pass into a caller-supplied (or single new) array, speech
+segments are views into the received PCM, and a WAV file is assembled with
+one copy of the samples, straight from those views, when it is uploaded.
+"""
+import struct
+import sys
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+PCM16 = np.dtype("<i2")
+INT16_SCALE = np.float32(1.0 / 32768.0)
+
+# RIFF header of a canonical 16-bit PCM WAV file:
+# "RIFF" size "WAVE" "fmt " 16 format channels rate byte_rate block_align bits "data" size
+WAV_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI")
+
+
+class PCMRingBuffer:
+    """
+    Fixed-size ring buffer of int16 samples.
+
+    Positions are absolute sample indices since the buffer was created (or
+    last cleared), so callers can remember "speech started at sample N"
+    without worrying about wrap-around.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=np.int16)
+        self._end = 0  # Absolute index one past the newest sample
+
+    @property
+    def end(self) -> int:
+        """Absolute index one past the newest sample"""
+        return self._end
+
+    @property
+    def start(self) -> int:
+        """Absolute index of the oldest sample still held"""
+        return max(0, self._end - self.capacity)
+
+    def __len__(self) -> int:
+        return self._end - self.start
+
+    def write(self, samples: np.ndarray):
+        """Append samples, overwriting the oldest ones when full"""
+        count = len(samples)
+        if count == 0:
+            return
+        if count > self.capacity:
+            samples = samples[-self.capacity:]
+            self._end += count - self.capacity
+            count = self.capacity
+
+        offset = self._end % self.capacity
+        first = min(count, self.capacity - offset)
+        self._data[offset:offset + first] = samples[:first]
+        if first < count:
+            self._data[:count - first] = samples[first:]
+        self._end += count
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        """Copy samples in the absolute range [start, end) out of the buffer"""
+        start = max(start, self.start)
+        end = min(end, self._end)
+        if end <= start:
+            return np.zeros(0, dtype=np.int16)
+
+        offset = start % self.capacity
+        count = end - start
+        if offset + count <= self.capacity:
+            return self._data[offset:offset + count].copy()
+        first = self.capacity - offset
+        return np.concatenate((self._data[offset:], self._data[:count - first]))
+
+    def clear(self):
+        self._end = 0
+
+
+def pcm16_to_float32(pcm: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Scale int16 samples to float32 in [-1, 1) in one pass, into ``out`` if given"""
+    if out is None:
+        out = np.empty(len(pcm), dtype=np.float32)
+    return np.multiply(pcm, INT16_SCALE, out=out)
+
+
+def float32_to_pcm16(samples: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Convert float samples to int16, clipping instead of wrapping at full
+    scale. ``samples`` is used as scratch space and is modified in place.
+    """
+    if out is None:
+        out = np.empty(len(samples), dtype=PCM16)
+    np.clip(samples, -1.0, 32767 / 32768, out=samples)
+    samples *= 32768.0
+    np.copyto(out, samples, casting="unsafe")
+    return out
+
+
+def segment_views(samples: np.ndarray, timestamps: Iterable[dict]) -> List[np.ndarray]:
+    """Slices of ``samples`` for [{"start": ..., "end": ...}] timestamps (views, nothing is copied)"""
+    return [samples[segment["start"]:segment["end"]] for segment in timestamps]
+
+
+def wav_header(num_samples: int, sample_rate: int, channels: int = 1) -> bytes:
+    data_size = num_samples * 2
+    return WAV_HEADER.pack(
+        b"RIFF", WAV_HEADER.size - 8 + data_size, b"WAVE",
+        b"fmt ", 16, 1, channels, sample_rate, sample_rate * channels * 2, channels * 2, 16,
+        b"data", data_size
+    )
+
+
+def encode_wav(segments: Iterable[np.ndarray], sample_rate: int) -> bytes:
+    """
+    16-bit mono WAV file from int16 segments (usually views from
+    segment_views). The samples are copied exactly once, into the result.
+    """
+    if sys.byteorder != "little":
+        segments = [segment.astype(PCM16) for segment in segments]
+    else:
+        segments = [np.ascontiguousarray(segment, dtype=np.int16) for segment in segments]
+    header = wav_header(sum(len(segment) for segment in segments), sample_rate)
+    return b"".join([header, *(memoryview(segment).cast("B") for segment in segments)])
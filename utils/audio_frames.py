@@ -0,0 +1,111 @@
+"""
+Binary WebSocket frame protocol for the voice pipeline
+
+Every binary frame starts with a fixed 10-byte little-endian header followed
+by the raw payload:
+
+    magic    2s   b"VC"
+    version  B    protocol version (currently 1)
+    kind     B    what the payload is (see KIND_*)
+    codec    B    payload encoding (see CODEC_*)
+    flags    B    bit flags (see FLAG_*)
+    sequence I    per-connection frame counter
+
+The header has no length field: WebSocket messages are already delimited, so
+the payload is everything after the header (FRAME_HEADER.size bytes).
+
+Text frames keep carrying the existing JSON messages, so old clients that
+send base64 ``audio_data`` keep working unchanged.
+
+The server uses the same header for synthesized speech (KIND_TTS_AUDIO) when
+the client connects with ``tts_transport=binary``: each sentence is streamed
+as a run of frames, closed by an empty frame flagged FLAG_END_OF_SEGMENT.
+The codec of those frames is the output format negotiated with
+``tts_format`` (opus, mp3 or pcm).
+"""
+import struct
+from typing import NamedTuple, Union
+
+FRAME_MAGIC = b"VC"
+FRAME_VERSION = 1
+FRAME_HEADER = struct.Struct("<2sBBBBI")
+
+# Frame kinds
+KIND_AUDIO_UTTERANCE = 1  # A complete user utterance (replaces JSON audio_data)
+KIND_AUDIO_CHUNK = 2      # A 20-100 ms slice of a continuous PCM stream
+KIND_TTS_AUDIO = 3        # Server -> client: a slice of synthesized speech
+
+# Frame flags
+FLAG_END_OF_UTTERANCE = 0x01  # Client-side endpoint: dispatch what has been streamed
+FLAG_END_OF_SEGMENT = 0x01    # Server audio: last frame of one synthesized sentence
+
+# Payload codecs
+CODEC_PCM16 = 0  # Raw mono int16 little-endian PCM at 16 kHz
+CODEC_OPUS = 1   # Opus in a WebM/Ogg container, as produced by MediaRecorder
+CODEC_MP3 = 2    # MP3 (synthesized speech only)
+CODEC_WAV = 3    # WAV container (synthesized speech only)
+CODEC_PCM16_24K = 4  # Raw mono int16 little-endian PCM at 24 kHz (synthesized speech only)
+
+CODEC_NAMES = {
+    CODEC_PCM16: "pcm16",
+    CODEC_OPUS: "opus",
+    CODEC_MP3: "mp3",
+    CODEC_WAV: "wav",
+    CODEC_PCM16_24K: "pcm16_24k",
+}
+
+# Codecs the server accepts for user audio
+INPUT_CODECS = (CODEC_PCM16, CODEC_OPUS)
+# Streamed chunks go straight into the VAD as samples, so they must be PCM
+CHUNK_CODECS = (CODEC_PCM16,)
+
+
+class FrameError(ValueError):
+    """Raised when a binary frame cannot be parsed"""
+
+
+class AudioFrame(NamedTuple):
+    kind: int
+    codec: int
+    flags: int
+    sequence: int
+    payload: memoryview
+
+    @property
+    def codec_name(self) -> str:
+        return CODEC_NAMES[self.codec]
+
+
+def parse_frame(data: Union[bytes, bytearray, memoryview]) -> AudioFrame:
+    """
+    Parse a binary frame without copying the payload.
+    The returned payload is a memoryview into ``data``.
+    """
+    view = memoryview(data)
+    if view.nbytes < FRAME_HEADER.size:
+        raise FrameError(f"Frame too short: {view.nbytes} bytes")
+
+    magic, version, kind, codec, flags, sequence = FRAME_HEADER.unpack_from(view)
+    if magic != FRAME_MAGIC:
+        raise FrameError("Bad frame magic")
+    if version != FRAME_VERSION:
+        raise FrameError(f"Unsupported frame version: {version}")
+    if codec not in CODEC_NAMES:
+        raise FrameError(f"Unsupported codec: {codec}")
+
+    return AudioFrame(kind, codec, flags, sequence, view[FRAME_HEADER.size:])
+
+
+def check_input_codec(frame: AudioFrame):
+    """Raise FrameError unless the server accepts the frame's codec for its kind"""
+    if frame.kind == KIND_AUDIO_CHUNK and frame.codec not in CHUNK_CODECS:
+        raise FrameError(f"Unsupported audio codec for streamed chunks: {frame.codec_name} (send pcm16)")
+    if frame.codec not in INPUT_CODECS:
+        raise FrameError(f"Unsupported audio codec: {frame.codec_name}")
+
+
+def build_frame(kind: int, payload: Union[bytes, bytearray, memoryview],
+                codec: int = CODEC_PCM16, sequence: int = 0, flags: int = 0) -> bytes:
+    """Build a binary frame (header + payload)"""
+    header = FRAME_HEADER.pack(FRAME_MAGIC, FRAME_VERSION, kind, codec, flags, sequence)
+    return b"".join((header, payload))
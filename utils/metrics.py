@@ -0,0 +1,221 @@
+"""
+In-process metrics and per-turn latency tracing for the voice pipeline
+
+Metrics are kept in a module-level registry and rendered in the Prometheus
+text exposition format by the /metrics endpoint.
+"""
+import json
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Optional, Tuple
+
+# Latency buckets in seconds, from single-digit milliseconds up to slow upstream calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _header(self) -> list:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.type_name}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing value"""
+    type_name = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def render(self) -> list:
+        lines = self._header()
+        for key, value in self.values.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    """Value that can go up and down (usually set at scrape time)"""
+    type_name = "gauge"
+
+    def set(self, value: float, **labels):
+        self.values[self._key(labels)] = float(value)
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram"""
+    type_name = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.counts: Dict[Tuple[str, ...], list] = {}
+        self.sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        counts = self.counts.get(key)
+        if counts is None:
+            counts = self.counts[key] = [0] * (len(self.buckets) + 1)
+            self.sums[key] = 0.0
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+        self.sums[key] += value
+
+    def render(self) -> list:
+        lines = self._header()
+        for key, counts in self.counts.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            cumulative += counts[-1]
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            plain = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{plain} {self.sums[key]}")
+            lines.append(f"{self.name}_count{plain} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds all metrics of the process, in registration order"""
+
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self.metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Iterable[str] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "voice_stage_seconds",
+    "Duration of each voice pipeline stage per turn",
+    ["stage"]
+)
+MILESTONE_SECONDS = REGISTRY.histogram(
+    "voice_turn_milestone_seconds",
+    "Time from the start of a turn to each milestone (first token, first audio, done)",
+    ["milestone"]
+)
+TURNS_TOTAL = REGISTRY.counter(
+    "voice_turns_total",
+    "Completed voice turns",
+    ["outcome"]
+)
+
+
+class TurnTrace:
+    """
+    Monotonic spans and milestones for one conversational turn.
+
+    Spans measure how long a stage took; milestones record the first time
+    something happened, relative to the start of the turn. Both are folded
+    into the registry histograms when the turn finishes; anything recorded
+    after that (e.g. by TTS audio still draining) is ignored.
+    """
+
+    def __init__(self, client_id: str, turn_id: int, started_at: Optional[float] = None):
+        self.client_id = client_id
+        self.turn_id = turn_id
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.spans = []
+        self.milestones = {}
+        self.finished = False
+
+    @contextmanager
+    def span(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(stage, time.perf_counter() - start, start)
+
+    def add_span(self, stage: str, duration: float, started_at: Optional[float] = None):
+        if self.finished:
+            return
+        offset = (started_at - self.started_at) if started_at is not None else None
+        self.spans.append((stage, offset, duration))
+
+    def mark(self, milestone: str):
+        """Record a milestone the first time it happens"""
+        if not self.finished and milestone not in self.milestones:
+            self.milestones[milestone] = time.perf_counter() - self.started_at
+
+    def finish(self, outcome: str = "ok") -> dict:
+        if self.finished:
+            return self.summary()
+        self.mark("done")
+        self.finished = True
+        for stage, _, duration in self.spans:
+            STAGE_SECONDS.observe(duration, stage=stage)
+        for milestone, offset in self.milestones.items():
+            MILESTONE_SECONDS.observe(offset, milestone=milestone)
+        TURNS_TOTAL.inc(outcome=outcome)
+        summary = self.summary()
+        summary["outcome"] = outcome
+        print(f"[{self.client_id}] ⏱️ Turn trace: {json.dumps(summary)}")
+        return summary
+
+    def summary(self) -> dict:
+        return {
+            "client_id": self.client_id,
+            "turn_id": self.turn_id,
+            "spans": [
+                {
+                    "stage": stage,
+                    "offset_ms": round(offset * 1000, 1) if offset is not None else None,
+                    "duration_ms": round(duration * 1000, 1)
+                }
+                for stage, offset, duration in self.spans
+            ],
+            "milestones_ms": {name: round(offset * 1000, 1) for name, offset in self.milestones.items()}
+        }
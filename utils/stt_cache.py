@@ -0,0 +1,69 @@
+"""
+Transcript cache for repeated uploads
+
+Clients that retry after a network hiccup resend the same audio; the
+transcript of the first upload is reused instead of paying for another
+transcription call. Entries are keyed by a hash of the audio actually sent to
+the model (post-VAD PCM, or the container bytes for Opus) together with the
+session and the transcription parameters, expire after ``ttl`` seconds and
+are evicted least recently used beyond ``max_entries``.
+
+The cache is not thread-safe; it is used from the event loop only.
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from utils.metrics import REGISTRY
+
+CACHE_LOOKUPS = REGISTRY.counter(
+    "voice_stt_cache_lookups_total",
+    "STT transcript cache lookups by result (hit, miss, expired)",
+    ["result"]
+)
+
+
+def audio_fingerprint(audio) -> bytes:
+    """16-byte digest of a bytes-like audio payload (read through its buffer, not copied)"""
+    return hashlib.blake2b(audio, digest_size=16).digest()
+
+
+def make_key(client_id: str, model: str, language: str, fingerprint: bytes) -> bytes:
+    material = "\0".join((client_id, model, language)).encode("utf-8")
+    return hashlib.blake2b(material + fingerprint, digest_size=16).digest()
+
+
+class STTCache:
+    """Transcripts by key, with a time-to-live and an LRU bound on the entry count"""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[bytes, Tuple[float, str]]" = OrderedDict()
+
+    def get(self, key: bytes) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            CACHE_LOOKUPS.inc(result="miss")
+            return None
+        expires_at, transcript = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            CACHE_LOOKUPS.inc(result="expired")
+            return None
+        self._entries.move_to_end(key)
+        CACHE_LOOKUPS.inc(result="hit")
+        return transcript
+
+    def put(self, key: bytes, transcript: str):
+        self._entries[key] = (time.monotonic() + self.ttl, transcript)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "max_entries": self.max_entries, "ttl_seconds": self.ttl}
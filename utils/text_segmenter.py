@@ -0,0 +1,166 @@
+"""
+Incremental sentence segmentation for streamed LLM text
+
+Tokens are pushed as they arrive and complete chunks come out as soon as they
+can be spoken. Each character is examined once (a chunk that has to be force
+split is rescanned at most once), so a reply costs O(n) however it is
+tokenized.
+
+Boundaries:
+    - ``.``, ``?``, ``!`` (optionally followed by closing quotes/brackets)
+      followed by whitespace; abbreviations ("Dr.", "e.g."), initials,
+      decimals ("3.5") and list markers ("1.") are not boundaries
+    - newlines
+    - clause punctuation (``,`` ``;`` ``:`` dashes), only used for the first
+      chunk and for force splits
+
+The policy is adaptive: the first chunk of a reply is emitted as early as a
+short clause allows, to get audio started, and later chunks gather whole
+sentences up to a larger size so fewer TTS requests are made per reply.
+"""
+from dataclasses import dataclass
+from typing import List, Optional
+
+TERMINATORS = ".?!"
+CLOSERS = "\"')]}”’"
+CLAUSE_MARKS = ",;:–—"
+
+ABBREVIATIONS = frozenset({
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "mt", "vs", "etc",
+    "e.g", "i.e", "approx", "dept", "inc", "ltd", "corp", "jan", "feb",
+    "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec", "fig",
+    "vol", "a.m", "p.m",
+})
+
+
+@dataclass(frozen=True)
+class SegmentationPolicy:
+    """How eagerly text is cut into TTS requests (see module docstring)"""
+    first_min_chars: int = 12    # Shortest first chunk; it may end at a clause boundary
+    first_max_chars: int = 80    # Force split the first chunk past this
+    min_chars: int = 60          # Later chunks gather sentences until at least this long
+    max_chars: int = 240         # Force split later chunks past this
+    first_clause_split: bool = True  # Allow the first chunk to end at , ; : or a dash
+
+
+class SentenceSegmenter:
+    """Streaming segmenter; push() tokens, flush() at the end of the reply"""
+
+    def __init__(self, policy: Optional[SegmentationPolicy] = None):
+        self.policy = policy or SegmentationPolicy()
+        self.reset()
+
+    def reset(self):
+        """Start a new reply: drop pending text, next chunk is a 'first' chunk again"""
+        self._buffer = ""
+        self._first = True
+        self._restart()
+
+    def _restart(self):
+        self._scan = 0             # Next index of _buffer to examine
+        self._sentence_end = 0     # End of the last sentence boundary in _buffer
+        self._clause_end = 0       # End of the last clause boundary
+        self._space_end = 0        # Position of the last whitespace
+
+    @property
+    def pending(self) -> str:
+        return self._buffer
+
+    def push(self, text: str) -> List[str]:
+        """Add streamed text and return the chunks that are now complete"""
+        self._buffer += text
+        chunks = []
+        while True:
+            chunk = self._next_chunk()
+            if chunk is None:
+                return chunks
+            if chunk:
+                chunks.append(chunk)
+
+    def flush(self) -> str:
+        """Return whatever is left (end of reply) and start over"""
+        rest = self._buffer.strip()
+        self.reset()
+        return rest
+
+    def _limits(self):
+        if self._first:
+            return self.policy.first_min_chars, self.policy.first_max_chars
+        return self.policy.min_chars, self.policy.max_chars
+
+    def _next_chunk(self) -> Optional[str]:
+        buffer = self._buffer
+        size = len(buffer)
+        min_chars, max_chars = self._limits()
+        i = self._scan
+
+        while i < size:
+            char = buffer[i]
+
+            if char == "\n":
+                if buffer[:i].strip():
+                    return self._cut(i + 1)
+                self._space_end = i
+
+            elif char in TERMINATORS:
+                end = i + 1
+                while end < size and (buffer[end] in CLOSERS or buffer[end] in TERMINATORS):
+                    end += 1
+                if end == size:
+                    break  # Can't tell yet whether this ends a sentence
+                if buffer[end].isspace() and not (char == "." and self._is_abbreviation(i)):
+                    self._sentence_end = end
+                    if len(buffer[:end].strip()) >= min_chars:
+                        return self._cut(end)
+                i = end
+                continue
+
+            elif char in CLAUSE_MARKS:
+                if i + 1 == size:
+                    break
+                if buffer[i + 1].isspace():
+                    self._clause_end = i + 1
+                    if (self._first and self.policy.first_clause_split
+                            and len(buffer[:i + 1].strip()) >= min_chars):
+                        return self._cut(i + 1)
+
+            elif char.isspace():
+                self._space_end = i
+
+            if i >= max_chars:
+                # Prefer the latest sentence, then clause, then word boundary
+                end = self._sentence_end or self._clause_end or self._space_end
+                if end:
+                    return self._cut(end)
+
+            i += 1
+
+        self._scan = i
+        return None
+
+    def _cut(self, end: int) -> str:
+        chunk = self._buffer[:end].strip()
+        self._buffer = self._buffer[end:].lstrip()
+        self._restart()
+        if chunk:
+            self._first = False
+        return chunk
+
+    def _is_abbreviation(self, dot: int) -> bool:
+        """Whether the '.' at ``dot`` belongs to the word before it"""
+        buffer = self._buffer
+        start = dot
+        while start > 0 and not buffer[start - 1].isspace() and buffer[start - 1] not in "\"'(“‘":
+            start -= 1
+        word = buffer[start:dot].lower()
+        if not word:
+            return False
+        if word in ABBREVIATIONS:
+            return True
+        if len(word) == 1 and buffer[start].isupper():
+            return True  # Initial, e.g. "J. Smith"
+        if "." in word and all(len(part) == 1 for part in word.split(".")):
+            return True  # Dotted acronym, e.g. "U.S."
+        if word.isdigit() and (start == 0 or buffer[start - 1] == "\n"):
+            return True  # List marker, e.g. "1. "
+        return False
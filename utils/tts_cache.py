@@ -0,0 +1,243 @@
+"""
+Content-addressed cache for synthesized speech
+
+Entries are keyed by a hash of everything that determines the audio: the
+provider, voice, model, voice settings, output format and the normalized
+text. Lookups go to an in-memory LRU first, then (optionally) to an on-disk
+tier of append-only segment files that are read through mmap.
+
+On disk every record is a small header followed by the audio:
+
+    key     16s  blake2b digest of the request
+    codec   B    audio codec (utils.audio_frames CODEC_*)
+    length  I    payload size in bytes
+
+Segments are filled one at a time; when the tier grows past its size budget
+the oldest segment is deleted as a whole. The index is rebuilt by scanning the
+segments at startup, so cached audio survives restarts.
+
+The cache is not thread-safe; it is used from the event loop only.
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional
+
+from utils.metrics import REGISTRY
+
+RECORD_HEADER = struct.Struct("<16sBI")
+SEGMENT_SUFFIX = ".seg"
+
+CACHE_LOOKUPS = REGISTRY.counter(
+    "voice_tts_cache_lookups_total",
+    "TTS cache lookups by tier that answered (memory, disk) or miss",
+    ["result"]
+)
+
+
+class CachedAudio(NamedTuple):
+    codec: int
+    data: bytes
+
+
+class _DiskLocation(NamedTuple):
+    segment: int
+    offset: int   # Offset of the payload within the segment
+    length: int
+    codec: int
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially different renderings share an entry"""
+    return " ".join(text.split())
+
+
+def make_key(provider: str, voice_id: str, model_id: str, settings: dict,
+             output_format: str, text: str) -> bytes:
+    """16-byte digest identifying one synthesis request"""
+    material = json.dumps(
+        [provider, voice_id, model_id, settings, output_format, normalize_text(text)],
+        sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.blake2b(material.encode("utf-8"), digest_size=16).digest()
+
+
+class _SegmentStore:
+    """Append-only segment files with an in-memory index, read through mmap"""
+
+    def __init__(self, directory: str, max_bytes: int, segment_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.segment_bytes = segment_bytes
+        self.index: Dict[bytes, _DiskLocation] = {}
+        self.segment_sizes: "OrderedDict[int, int]" = OrderedDict()  # Oldest first
+        self._maps: Dict[int, mmap.mmap] = {}
+        self._writer = None
+        self._active = None
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(self.segment_sizes.values())
+
+    def _path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"{segment:08d}{SEGMENT_SUFFIX}")
+
+    def _load(self):
+        segments = sorted(
+            int(name[:-len(SEGMENT_SUFFIX)])
+            for name in os.listdir(self.directory)
+            if name.endswith(SEGMENT_SUFFIX) and name[:-len(SEGMENT_SUFFIX)].isdigit()
+        )
+        for segment in segments:
+            self.segment_sizes[segment] = self._scan(segment)
+
+    def _scan(self, segment: int) -> int:
+        """Index the records of one segment; a torn record at the end is cut off"""
+        path = self._path(segment)
+        size = os.path.getsize(path)
+        offset = 0
+        with open(path, "rb") as f:
+            while offset + RECORD_HEADER.size <= size:
+                f.seek(offset)
+                key, codec, length = RECORD_HEADER.unpack(f.read(RECORD_HEADER.size))
+                end = offset + RECORD_HEADER.size + length
+                if end > size:
+                    break
+                self.index[key] = _DiskLocation(segment, offset + RECORD_HEADER.size, length, codec)
+                offset = end
+        if offset < size:
+            os.truncate(path, offset)
+        return offset
+
+    def _mapping(self, segment: int, end: int) -> mmap.mmap:
+        mapped = self._maps.get(segment)
+        if mapped is None or len(mapped) < end:
+            if mapped is not None:
+                mapped.close()
+            with open(self._path(segment), "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[segment] = mapped
+        return mapped
+
+    def get(self, key: bytes) -> Optional[CachedAudio]:
+        location = self.index.get(key)
+        if location is None:
+            return None
+        end = location.offset + location.length
+        mapped = self._mapping(location.segment, end)
+        return CachedAudio(location.codec, mapped[location.offset:end])
+
+    def put(self, key: bytes, codec: int, data: bytes):
+        record_size = RECORD_HEADER.size + len(data)
+        if self._writer is None or self.segment_sizes[self._active] + record_size > self.segment_bytes:
+            self._open_segment()
+
+        offset = self.segment_sizes[self._active]
+        self._writer.write(RECORD_HEADER.pack(key, codec, len(data)))
+        self._writer.write(data)
+        self._writer.flush()
+        self.segment_sizes[self._active] = offset + record_size
+        self.index[key] = _DiskLocation(self._active, offset + RECORD_HEADER.size, len(data), codec)
+
+        while self.total_bytes > self.max_bytes and len(self.segment_sizes) > 1:
+            self._evict_oldest()
+
+    def _open_segment(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._active = max(self.segment_sizes, default=0) + 1
+        self.segment_sizes[self._active] = 0
+        self._writer = open(self._path(self._active), "ab")
+
+    def _evict_oldest(self):
+        segment, _ = self.segment_sizes.popitem(last=False)
+        self.index = {key: loc for key, loc in self.index.items() if loc.segment != segment}
+        mapped = self._maps.pop(segment, None)
+        if mapped is not None:
+            mapped.close()
+        try:
+            os.remove(self._path(segment))
+        except OSError as e:
+            print(f"⚠️ Could not remove TTS cache segment {segment}: {e}")
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        for mapped in self._maps.values():
+            mapped.close()
+        self._maps.clear()
+
+
+class TTSCache:
+    """
+    Two-tier TTS audio cache: an LRU bounded by ``memory_bytes`` and an
+    optional on-disk tier in ``disk_dir`` bounded by ``disk_bytes``.
+    Entries larger than ``max_entry_bytes`` are not cached.
+    """
+
+    def __init__(self, memory_bytes: int, disk_dir: Optional[str] = None, disk_bytes: int = 0,
+                 segment_bytes: int = 16 * 1024 * 1024, max_entry_bytes: int = 512 * 1024):
+        self.memory_bytes = memory_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self._memory: "OrderedDict[bytes, CachedAudio]" = OrderedDict()
+        self._memory_used = 0
+        self.disk = _SegmentStore(disk_dir, disk_bytes, segment_bytes) if disk_dir and disk_bytes > 0 else None
+
+    def get(self, key: bytes) -> Optional[CachedAudio]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            CACHE_LOOKUPS.inc(result="memory")
+            return entry
+
+        if self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                self._remember(key, entry)
+                CACHE_LOOKUPS.inc(result="disk")
+                return entry
+
+        CACHE_LOOKUPS.inc(result="miss")
+        return None
+
+    def put(self, key: bytes, codec: int, data: bytes):
+        if not data or len(data) > self.max_entry_bytes:
+            return
+        entry = CachedAudio(codec, bytes(data))
+        self._remember(key, entry)
+        if self.disk is not None and key not in self.disk.index:
+            try:
+                self.disk.put(key, codec, entry.data)
+            except OSError as e:
+                print(f"⚠️ TTS cache disk write failed: {e}")
+
+    def _remember(self, key: bytes, entry: CachedAudio):
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_used -= len(previous.data)
+        self._memory[key] = entry
+        self._memory_used += len(entry.data)
+        while self._memory_used > self.memory_bytes and self._memory:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_used -= len(evicted.data)
+
+    def __contains__(self, key: bytes) -> bool:
+        return key in self._memory or (self.disk is not None and key in self.disk.index)
+
+    def stats(self) -> dict:
+        return {
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_used,
+            "disk_entries": len(self.disk.index) if self.disk else 0,
+            "disk_bytes": self.disk.total_bytes if self.disk else 0,
+        }
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()